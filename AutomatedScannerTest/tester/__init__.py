@@ -1,20 +1,106 @@
 # -*- coding: utf-8 -*-
 """This application runs a series of tests designed to validate the quality of Pangolin Laser System scanners."""
+from functools import lru_cache, wraps
+from itertools import count
 import logging
-from functools import wraps
+import os
+import reprlib
 
 _package_name = "PangolinLaserSystems.AutomatedScannerTest"
 __version__ = "1.1.0"
 __company__ = "Pangolin Laser Systems"
 __application__ = "Automated Scanner Test"
 
+# The environment variable that controls the tracing of member calls: "off" removes the
+# tracing when the classes are imported, an integer N traces one call in N of each member,
+# and anything else, or no value, traces every call while DEBUG logging is enabled.
+_trace_variable = "AUTOMATEDSCANNERTEST_TRACE"
 
+
+class OperationCancelled(Exception):
+    """
+    Raised inside a long operation when cancellation of the test sequence was requested.
+    """
+
+
+def _get_trace_sampling(value: str = None) -> int:
+    """
+    Get how member calls are traced from the tracing environment variable.
+
+    Args:
+        value (str, optional): The value to interpret. Defaults to the environment variable.
+
+    Returns:
+        int: 0 if tracing is off, otherwise trace one call in this many.
+    """
+    if value is None:
+        value = os.environ.get(_trace_variable, "")
+    value = value.strip().lower()
+    if value in ("0", "off", "false", "no"):
+        return 0
+    try:
+        return max(1, int(value))
+    except ValueError:
+        return 1
+
+
+_trace_sampling = _get_trace_sampling()
+
+
+def _setting_to_bool(value) -> bool:
+    """
+    Interpret a setting value as a boolean.
+
+    INI files store booleans as text, so "true" and "1" in any case are read as True.
+
+    Args:
+        value: The setting value, as returned by QSettings.
+
+    Returns:
+        bool: The value as a boolean.
+    """
+    return str(value).strip().lower() in ("true", "1")
+
+
+class _ArgumentRepr(reprlib.Repr):
+    """
+    Size-aware repr for traced arguments and return values.
+
+    Containers are cut after a few items and long strings shortened, and NumPy arrays are
+    described by their shape and type, so tracing a call costs the same whatever the size
+    of its data.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.maxlevel = 3
+        self.maxtuple = self.maxlist = self.maxset = self.maxfrozenset = self.maxdeque = 8
+        self.maxdict = 8
+        self.maxstring = self.maxother = 80
+
+    def repr_ndarray(self, x, level):
+        return f"ndarray(shape={x.shape}, dtype={x.dtype})"
+
+    def repr_memmap(self, x, level):
+        return f"memmap(shape={x.shape}, dtype={x.dtype})"
+
+    def repr_bytes(self, x, level):
+        return f"bytes(len={len(x)})" if len(x) > self.maxstring else repr(x)
+
+    def repr_memoryview(self, x, level):
+        return f"memoryview(nbytes={x.nbytes})"
+
+
+_summarize = _ArgumentRepr().repr
+
+
+@lru_cache(maxsize=None)
 def _get_class_logger(class_):
     """
     Get a logger instance specific to the given class.
 
     The logger is named using the package name, module, and class name, which allows for
-    hierarchical and granular logging control.
+    hierarchical and granular logging control. Loggers are cached per class.
 
     Args:
         class_ (type): The class for which to obtain a logger.
@@ -29,8 +115,11 @@ def _member_logger(func):
     """
     Decorator for class member functions to log entry, arguments, return value, and exceptions.
 
-    This decorator logs the function name, arguments, and keyword arguments before execution,
-    the return value after successful execution, and exception details if an error occurs.
+    This decorator logs the function name and summaries of the arguments and keyword arguments
+    before execution, a summary of the return value after successful execution, and exception
+    details if an error occurs other than a cancellation. Calls are only traced while DEBUG logging is enabled for the
+    class, and as selected by the AUTOMATEDSCANNERTEST_TRACE environment variable; with
+    tracing off the function is returned undecorated.
 
     Args:
         func (callable): The function to be wrapped and logged.
@@ -38,6 +127,11 @@ def _member_logger(func):
     Returns:
         callable: The wrapped function with logging enabled.
     """
+    if not _trace_sampling:
+        return func
+    _sampling = _trace_sampling
+    _calls = count()
+
     @wraps(func)
     def wrapper(self, *args, **kwargs):
         """
@@ -55,20 +149,25 @@ def _member_logger(func):
             Exception: Re-raises any exception thrown by the decorated function after logging.
         """
         logger = _get_class_logger(type(self))
-        if logger.isEnabledFor(logging.DEBUG):
+        _trace = logger.isEnabledFor(logging.DEBUG) and (
+            _sampling == 1 or next(_calls) % _sampling == 0
+        )
+        if _trace:
             logger.debug(
-                "Calling function: %s with arguments: %r and keyword arguments: %r",
+                "Calling function: %s with arguments: %s and keyword arguments: %s",
                 func.__name__,
-                args,
-                kwargs,
+                _summarize(args),
+                _summarize(kwargs),
             )
         try:
             _result = func(self, *args, **kwargs)
-            if logger.isEnabledFor(logging.DEBUG):
-                logger.debug("Function: %s returned: %r", func.__name__, _result)
-            return _result
+        except OperationCancelled:
+            raise
         except Exception as e:
             logger.error("Function: %s failed with error: %s", func.__name__, e, exc_info=True)
             raise
+        if _trace:
+            logger.debug("Function: %s returned: %s", func.__name__, _summarize(_result))
+        return _result
 
     return wrapper
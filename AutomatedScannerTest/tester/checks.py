@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+"""
+Checks of the tester against the simulated MSO5000 oscilloscope.
+
+Every check runs in a temporary settings file with the simulated oscilloscope, so it needs no
+instruments and leaves the station settings alone. Run them all with
+
+    python -m tester.checks
+
+which prints the result of each check and exits with a non-zero status if any failed.
+"""
+import logging
+from pathlib import Path
+import sys
+import tempfile
+import threading
+
+import numpy as np
+import pyvisa
+from PySide6 import QtCore
+
+import tester
+from tester.devices.mso5000 import MSO5000
+from tester.devices.mso5000_simulator import SimulatedMSO5000
+from tester.manager.devices import DeviceManager
+from tester.manager.test_sequence import TestSequence
+from tester.tests import CancelToken
+from tester.tests.bearing_test import BearingTest
+from tester.tests.torque_center_test import TorqueCenterTest
+
+
+class _CancellingMSO5000(SimulatedMSO5000):
+    """
+    A simulated oscilloscope that requests cancellation shortly after it receives a command.
+
+    Once armed, the cancellation is requested after the given number of writes of the command,
+    which places it in a known phase of a test. Queries can be made to fail from then on, so
+    the cancellation lands while the driver backs off between retries.
+    """
+
+    def __init__(self, cancel: CancelToken, realtime: float = 1.0):
+        """
+        Initialize the simulated instrument, disarmed.
+
+        Args:
+            cancel (CancelToken): The token to request cancellation on.
+            realtime (float, optional): How long an acquisition takes compared to the real instrument.
+        """
+        super().__init__(realtime=realtime)
+        self.__cancel = cancel
+        self.__command = None
+        self.__hits = 0
+        self.__delay = 0.0
+        self.__fail = False
+        self.__failing = False
+
+    def arm(self, command: str, hits: int = 1, delay: float = 0.05, fail: bool = False):
+        """
+        Request cancellation after a command has been written a number of times.
+
+        Args:
+            command (str): The short form of the command header, e.g. "SING", or None to disarm.
+            hits (int, optional): The write of the command that requests cancellation.
+            delay (float, optional): The time in seconds from that write to the request.
+            fail (bool, optional): Whether every query fails with an I/O error from that write on.
+        """
+        self.__command = command
+        self.__hits = hits
+        self.__delay = delay
+        self.__fail = fail
+        self.__failing = False
+
+    def write(self, message: str):
+        """
+        Execute a message, requesting cancellation if it holds the armed command.
+
+        Args:
+            message (str): The message.
+        """
+        super().write(message)
+        for _command in message.split(";"):
+            _header = _command.strip().partition(" ")[0]
+            if self.__command is None or _header.endswith("?") or self._short_header(_header) != self.__command:
+                continue
+            self.__hits -= 1
+            if self.__hits == 0:
+                self.__command = None
+                self.__failing = self.__fail
+                threading.Timer(self.__delay, self.__cancel.cancel).start()
+
+    def query(self, message: str) -> str:
+        """
+        Execute a message and read its response, failing once armed to do so.
+
+        Args:
+            message (str): The message.
+
+        Returns:
+            str: The response.
+
+        Raises:
+            pyvisa.errors.VisaIOError: If queries are failing.
+        """
+        if self.__failing:
+            raise pyvisa.errors.VisaIOError(pyvisa.constants.StatusCode.error_io)
+        return super().query(message)
+
+
+def _simulated_settings(directory: str, realtime: float = 0.0) -> QtCore.QSettings:
+    """
+    Create settings that use the simulated oscilloscope and keep all data in a directory.
+
+    Args:
+        directory (str): The directory holding the settings file and the data.
+        realtime (float, optional): How long a simulated acquisition takes compared to the real
+            instrument. Defaults to 0, completing it at once.
+
+    Returns:
+        QtCore.QSettings: The settings.
+    """
+    _settings = QtCore.QSettings(str(Path(directory) / "settings.ini"), QtCore.QSettings.Format.IniFormat)
+    _settings.setValue("Devices/MSO5000/simulated", True)
+    _settings.setValue("Devices/MSO5000/simulated_realtime", realtime)
+    _settings.setValue("DataDirectory", directory)
+    return _settings
+
+
+def check_sweep_modes(torque_centers: tuple = (-0.3, 0.1, 0.4), tolerance: float = 0.02) -> bool:
+    """
+    Check that a Capture mode torque sweep agrees with a Steps mode sweep.
+
+    Both sweeps run on the simulated oscilloscope for every torque center. They must cover the
+    same offsets, find the same torque center, and measure the same RMS current at every
+    offset within the relative tolerance.
+
+    Args:
+        torque_centers (tuple, optional): The torque centers of the simulated scanner in volts.
+        tolerance (float, optional): The largest relative difference of the RMS currents.
+
+    Returns:
+        bool: True if the sweeps agree for every torque center.
+    """
+    _passed = True
+    with tempfile.TemporaryDirectory() as _directory:
+        _settings = _simulated_settings(_directory)
+        _cancel = CancelToken()
+        _devices = DeviceManager(_settings)
+        _test = TorqueCenterTest(_settings, _cancel)
+        _simulator = SimulatedMSO5000(realtime=0.0)
+        _devices.MSO5000.attach(_simulator)
+        for _center in torque_centers:
+            _simulator.torque_center = _center
+            _results = {}
+            for _mode in TorqueCenterTest.SweepMode:
+                _settings.setValue(f"{_test.Name}/SweepMode", _mode.value)
+                _devices.setup(cancel=_cancel)
+                try:
+                    _test.acquire("AA000000", _devices)
+                finally:
+                    _devices.teardown()
+                _test.analyze_results("AA000000")
+                _results[_mode] = (_test.TorqueCenter, np.array(_test.TorqueData))
+            _steps_center, _steps = _results[TorqueCenterTest.SweepMode.Steps]
+            _capture_center, _capture = _results[TorqueCenterTest.SweepMode.Capture]
+            if _steps.shape != _capture.shape or not np.allclose(_steps[:, 0], _capture[:, 0]):
+                print(f"    torque center {_center} V: the sweeps cover different offsets")
+                _passed = False
+                continue
+            _difference = float(np.max(np.abs(_capture[:, 1] / _steps[:, 1] - 1)))
+            _agrees = _capture_center == _steps_center and _difference <= tolerance
+            print(
+                f"    torque center {_center} V: Steps {_steps_center:.2f} deg, Capture "
+                f"{_capture_center:.2f} deg, {len(_steps)} offsets, RMS within {100 * _difference:.2f}%"
+            )
+            _passed = _passed and _agrees
+    return _passed
+
+
+def check_cancel_latency() -> bool:
+    """
+    Check that a cancelled test stops within the cancellation budget of the sequence.
+
+    Cancellation is requested on the simulated oscilloscope in every phase that can take long:
+    the record loop of the bearing test, the steps of the torque sweep, the poll for an
+    acquisition, and the backoff between the retries of a failing query. Each test must raise
+    tester.OperationCancelled, with its teardown done, within TestSequence._cancel_budget of
+    the request.
+
+    Returns:
+        bool: True if every phase stopped within the budget.
+    """
+    _scenarios = (
+        ("Bearing record loop", BearingTest, None, "REC:WREC:OPER", 1, False),
+        ("Torque sweep steps", TorqueCenterTest, TorqueCenterTest.SweepMode.Steps, "SOUR1:VOLT:LEV:IMM:OFFS", 10, False),
+        ("Acquisition poll", TorqueCenterTest, TorqueCenterTest.SweepMode.Capture, "SING", 1, False),
+        ("Retry backoff", TorqueCenterTest, TorqueCenterTest.SweepMode.Steps, "SING", 5, True),
+    )
+    _passed = True
+    with tempfile.TemporaryDirectory() as _directory:
+        _settings = _simulated_settings(_directory, realtime=1.0)
+        _cancel = CancelToken()
+        _devices = DeviceManager(_settings)
+        _simulator = _CancellingMSO5000(_cancel)
+        _devices.MSO5000.attach(_simulator)
+        _policy = _devices.MSO5000.get_io_policy()
+        for _name, _test_class, _mode, _command, _hits, _fail in _scenarios:
+            _test = _test_class(_settings, _cancel)
+            if _mode is not None:
+                _settings.setValue(f"{_test.Name}/SweepMode", _mode.value)
+            if _fail:
+                # Retries far longer than the budget, so only the cancellation can end them in time.
+                _devices.MSO5000.set_io_policy(MSO5000.IoPolicy(backoff=(1.0, 1.0), jitter=0.0))
+            _cancel.reset()
+            _devices.setup(Path(_directory), _cancel)
+            _simulator.arm(_command, _hits, fail=_fail)
+            try:
+                _test.acquire("AA000000", _devices)
+                _latency = None
+            except tester.OperationCancelled:
+                _latency = _cancel.elapsed()
+            finally:
+                _simulator.arm(None)
+                _devices.MSO5000.set_io_policy(_policy)
+                _devices.teardown()
+            if _latency is None:
+                print(f"    {_name}: the test finished without being cancelled")
+                _passed = False
+                continue
+            print(f"    {_name}: stopped {1000 * _latency:.1f} ms after the request")
+            _passed = _passed and _latency < TestSequence._cancel_budget
+    return _passed
+
+
+def main():
+    """
+    Run every check, print its result, and exit with status 1 if any check failed.
+    """
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s - %(message)s", stream=sys.stdout)
+    _failed = 0
+    for _check in (check_sweep_modes, check_cancel_latency):
+        print(f"{_check.__name__}:")
+        _passed = _check()
+        _failed += not _passed
+        print(f"{_check.__name__}: {'passed' if _passed else 'FAILED'}")
+    sys.exit(1 if _failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -46,6 +46,21 @@ class Device(QObject):
         self._settings.endGroup()
         return value
 
+    def _get_bool_setting(self, key: str, default: bool = False) -> bool:
+        """
+        Retrieve a boolean setting value for the device.
+
+        The value is interpreted by tester._setting_to_bool.
+
+        Args:
+            key (str): The key of the setting to retrieve.
+            default (bool): The value to return if the key does not exist.
+
+        Returns:
+            bool: The value of the setting.
+        """
+        return tester._setting_to_bool(self._get_setting(key, default))
+
     def _set_setting(self, key: str, value):
         """
         Set a configuration setting for the device.
@@ -1,12 +1,24 @@
 # -*- coding: utf-8 -*-
+import asyncio
+import hashlib
+import math
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import time
 from PySide6.QtCore import QSettings
+from contextlib import contextmanager
 from ctypes.wintypes import BYTE
 from enum import StrEnum
+from functools import cached_property, partial
+import random
+from typing import NamedTuple
+import numpy as np
 import pyvisa
 
 import tester
 from tester.devices import Device
+from tester.devices.mso5000_simulator import SimulatedMSO5000
+from tester.devices.scpi_statistics import CommandStatistics
+from tester.devices.scpi_trace import RecordingResource, ReplayResource, summarize_trace
 
 
 class MSO5000(Device):
@@ -17,12 +29,257 @@ class MSO5000(Device):
     and function generator control using SCPI commands via PyVISA.
 
     Attributes:
-        __cache (dict): Class-level cache for parameter values.
+        __cache (dict): Per-instance cache of parameter values, governed by __cache_policies.
         Name (str): Device name, set to "MSO5000".
         __instrument: PyVISA instrument instance after successful connection.
     """
 
-    __cache = {}
+    class CachePolicy(StrEnum):
+        """
+        Enumeration of the ways values of a SCPI node are cached by the driver.
+
+        Attributes:
+            Static: Fixed for the connection; kept when the instrument state is reset or recalled.
+            WriteThrough: Cached when written or queried; dropped when the instrument state is reset or recalled.
+            Ttl: Like WriteThrough, but the cached value also expires after a declared time.
+            Never: Never cached; always written to or queried from the instrument.
+        """
+
+        Static = "STATIC"
+        WriteThrough = "WRITE"
+        Ttl = "TTL"
+        Never = "NEVER"
+
+    # Cache policies of the SCPI nodes that are not write-through, keyed by cache attribute,
+    # as (policy, time to live in seconds).
+    __cache_policies = {
+        "_idn": (CachePolicy.Static, None),
+        "_acquire_srate": (CachePolicy.Ttl, 1.0),
+        "_acquire_la_srate": (CachePolicy.Ttl, 1.0),
+        "_acquire_la_mdepth": (CachePolicy.Ttl, 1.0),
+        "_measure_clear": (CachePolicy.Never, None),
+        "_record_wrecord_operate": (CachePolicy.Never, None),
+        "_record_wreplay_fcurrent": (CachePolicy.Never, None),
+        "_save_csv": (CachePolicy.Never, None),
+        "_save_image": (CachePolicy.Never, None),
+        "_save_setup": (CachePolicy.Never, None),
+        "_save_status": (CachePolicy.Never, None),
+        "_save_waveform": (CachePolicy.Never, None),
+        "_system_error_next": (CachePolicy.Never, None),
+        "_trigger_status": (CachePolicy.Never, None),
+        "_waveform_preamble": (CachePolicy.Never, None),
+        "_waveform_xincrement": (CachePolicy.Never, None),
+        "_waveform_xorigin": (CachePolicy.Never, None),
+        "_waveform_xreference": (CachePolicy.Never, None),
+        "_waveform_yincrement": (CachePolicy.Never, None),
+        "_waveform_yorigin": (CachePolicy.Never, None),
+        "_waveform_yreference": (CachePolicy.Never, None),
+    }
+    __default_cache_policy = (CachePolicy.WriteThrough, None)
+
+    # Cached values that depend on other nodes, keyed by the attribute prefix of the nodes
+    # whose writes make them stale.
+    __cache_dependents = {
+        "_acquire_": ("_acquire_srate", "_acquire_la_srate", "_acquire_la_mdepth"),
+        "_timebase_": ("_acquire_srate", "_acquire_la_srate", "_acquire_la_mdepth"),
+    }
+
+    class ErrorCheck(StrEnum):
+        """
+        Enumeration of when the driver drains the instrument error queue.
+
+        Attributes:
+            Never: The error queue is only read on request.
+            Batch: The error queue is drained after every batch of commands.
+            Periodic: The error queue is drained after an exchange once the check interval has elapsed.
+        """
+
+        Never = "NEVER"
+        Batch = "BATCH"
+        Periodic = "PERIODIC"
+
+    class IoPolicy:
+        """
+        Retry, timeout and error-queue policy applied to every SCPI exchange of a device.
+
+        The policy also holds a circuit breaker: once the configured number of consecutive
+        attempts has failed, every exchange fails immediately with ConnectionError until the
+        reset timeout has elapsed, after which a single exchange is tried again as a probe with
+        the shorter probe timeout. A timeout opens the circuit at once and is never retried,
+        since an instrument that did not answer within the timeout is unlikely to answer a
+        retry; only other I/O errors are retried.
+
+        With the defaults a dead instrument therefore costs one timeout plus one device clear,
+        about 4 s, on the first exchange, then fails immediately for 5 s, after which each probe
+        costs the 0.5 s probe timeout plus one device clear, about 1 s. Exchanges with a large
+        payload add their transfer time to each timeout.
+
+        Attributes:
+            retries (int): Attempts made after the first failed attempt of an exchange.
+            backoff (tuple): The first and the largest delay between attempts, in seconds.
+            jitter (float): The fraction of each delay that is randomized.
+            timeout (int): The I/O timeout, in milliseconds, of an exchange with a small payload.
+            probe_timeout (int): The I/O timeout, in milliseconds, of the exchange that probes
+                the instrument once the reset timeout of an open circuit has elapsed.
+            transfer_rate (float): The assumed transfer rate, in bytes per millisecond, used to
+                extend the timeout of an exchange with a large payload.
+            failure_threshold (int): The consecutive failed attempts that open the circuit.
+            reset_timeout (float): The time, in seconds, the circuit stays open.
+            error_check (ErrorCheck): When the instrument error queue is drained.
+            error_check_interval (float): The time, in seconds, between periodic drains.
+            clock (callable): Returns the current time in seconds; the device points it at the
+                recorded clock while a trace is recorded or replayed.
+        """
+
+        def __init__(
+            self,
+            retries: int = 2,
+            backoff: tuple = (0.01, 0.1),
+            jitter: float = 0.5,
+            timeout: int = 2000,
+            probe_timeout: int = 500,
+            transfer_rate: float = 1000.0,
+            failure_threshold: int = 3,
+            reset_timeout: float = 5.0,
+            error_check: str = "BATCH",
+            error_check_interval: float = 10.0,
+        ):
+            assert retries >= 0, "Retries must not be negative."
+            assert failure_threshold >= 1, "Failure threshold must be at least 1."
+            self.retries = retries
+            self.backoff = backoff
+            self.jitter = jitter
+            self.timeout = timeout
+            self.probe_timeout = probe_timeout
+            self.transfer_rate = transfer_rate
+            self.failure_threshold = failure_threshold
+            self.reset_timeout = reset_timeout
+            self.error_check = MSO5000.ErrorCheck(error_check)
+            self.error_check_interval = error_check_interval
+            self.clock = time.monotonic
+            self.__failures = 0
+            self.__opened = 0.0
+            self.__checked = None
+
+        def timeout_for(self, payload: int = 0) -> int:
+            """
+            Get the I/O timeout of an exchange, based on the probe timeout while the circuit is
+            half open.
+
+            Args:
+                payload (int): The expected size of the response in bytes.
+
+            Returns:
+                int: The timeout in milliseconds.
+            """
+            _timeout = self.probe_timeout if self.is_half_open() else self.timeout
+            return _timeout + int(payload / self.transfer_rate)
+
+        def delays(self):
+            """
+            Generate the delays between the attempts of one exchange.
+
+            Yields:
+                float: The next delay in seconds, growing exponentially with random jitter.
+            """
+            _delay, _maximum = self.backoff
+            for _ in range(self.retries):
+                yield _delay * (1 - self.jitter * random.random())
+                _delay = min(_delay * 2, _maximum)
+
+        def is_open(self) -> bool:
+            """
+            Check whether the circuit is open and exchanges must fail fast.
+
+            Returns:
+                bool: True while the failure threshold is reached and the reset timeout has not elapsed.
+            """
+            return (
+                self.__failures >= self.failure_threshold
+                and self.clock() - self.__opened < self.reset_timeout
+            )
+
+        def is_half_open(self) -> bool:
+            """
+            Check whether the circuit has opened and its reset timeout has elapsed, so the next
+            exchange probes the instrument.
+
+            Returns:
+                bool: True while the failure threshold is reached but exchanges may be attempted.
+            """
+            return self.__failures >= self.failure_threshold and not self.is_open()
+
+        def record_success(self):
+            """Close the circuit after a successful attempt."""
+            self.__failures = 0
+
+        def record_failure(self, timed_out: bool = False):
+            """
+            Count a failed attempt, opening the circuit once the threshold is reached.
+
+            Args:
+                timed_out (bool): Whether the attempt timed out, which opens the circuit at once.
+            """
+            self.__failures += 1
+            if timed_out:
+                self.__failures = max(self.__failures, self.failure_threshold)
+            if self.__failures >= self.failure_threshold:
+                self.__opened = self.clock()
+
+        def reset(self):
+            """
+            Close the circuit and restart the periodic error check interval, for example after
+            the instrument has been reconnected or the clock has been replaced.
+            """
+            self.__failures = 0
+            self.__checked = None
+
+        def error_check_due(self) -> bool:
+            """
+            Check whether a periodic drain of the error queue is due, restarting the interval if so.
+
+            Returns:
+                bool: True if the error queue should be drained now.
+            """
+            if self.error_check != MSO5000.ErrorCheck.Periodic:
+                return False
+            _now = self.clock()
+            if self.__checked is None:
+                self.__checked = _now
+            if _now - self.__checked < self.error_check_interval:
+                return False
+            self.__checked = _now
+            return True
+
+    # The largest number of entries read from the instrument error queue in one drain.
+    _error_queue_limit = 32
+
+    # The order in which the subsystems of a declared state are applied: the acquisition and the
+    # channels determine the sample rate the timebase is set against, the trigger refers to the
+    # channels, and measurements refer to everything else. Unlisted setters are applied last.
+    _state_order = (
+        "acquire_",
+        "channel_",
+        "timebase_",
+        "trigger_",
+        "function_generator_",
+        "set_measure_",
+    )
+
+    # The save/recall registers reserved for setup snapshots; the others are left to the operator.
+    _snapshot_registers = range(40, 50)
+    # The number of saved settings queried back to check that a recalled register holds its snapshot.
+    _snapshot_checks = 3
+
+    # The largest message sent to the instrument when a batch of commands is flushed.
+    _batch_message_limit = 1024
+
+    # The first and the largest interval, in seconds, between polls while waiting on the instrument.
+    _poll_interval = (0.005, 0.2)
+
+    # The open and I/O timeout, in milliseconds, and the worker count used while probing VISA resources.
+    _probe_timeout = 500
+    _probe_workers = 8
 
     def __init__(self, settings: QSettings):
         """
@@ -37,6 +294,21 @@ class MSO5000(Device):
         super().__init__(settings)
         self.Name = "MSO5000"
         self.__instrument = None
+        self.__cache = {}
+        self.__cache_hits = 0
+        self.__cache_misses = 0
+        self.__preambles = {}
+        self.__batch = None
+        self.__io_policy = MSO5000.IoPolicy()
+        self.__io_policy.clock = self.__now
+        self.__timeout = None
+        self.__draining = False
+        self.__snapshot = None
+        self.__snapshot_sent = False
+        self.__measure_items = set()
+        self.__statistics = CommandStatistics()
+        self.__cancel = None
+        self.__snapshots = None
 
     def __getattr__(self, name):
         """
@@ -51,46 +323,146 @@ class MSO5000(Device):
         Raises:
             AttributeError: If the attribute is not found.
         """
-        inst = self.__instrument
+        _dict = self.__dict__
+        inst = _dict.get("_MSO5000__instrument")
         if inst is not None:
             try:
                 return getattr(inst, name)
             except AttributeError:
                 pass
-        try:
-            return self.__cache[name]
-        except KeyError:
+        _entry = _dict.get("_MSO5000__cache", {}).get(name)
+        if _entry is None:
             raise AttributeError(f"Attribute {name} not found.")
+        return _entry[1]
+
+    def __now(self) -> float:
+        """
+        Get the time cached values expire and waits time out against.
+
+        While a trace is recorded or replayed the time is read from the trace, so a replay
+        expires the same cached values and drains the error queue at the same exchanges as
+        the recording, however fast it runs.
 
-    def __query(self, message: str) -> str:
+        Returns:
+            float: The time in seconds, from an arbitrary start.
+        """
+        _clock = getattr(self.__instrument, "clock", None)
+        return _clock() if _clock is not None else time.monotonic()
+
+    def __exchange(self, operation, description: str, payload: int = 0, header: str = None, sent: int = 0):
+        """
+        Perform one exchange with the instrument under the I/O policy.
+
+        The I/O timeout is sized to the expected payload, failed attempts are retried with
+        exponential backoff and jitter, a timeout is not retried and opens the circuit, and the
+        exchange fails fast while the circuit is open.
+        The instrument is cleared after every failed attempt, so the operation must repeat the
+        whole exchange, query included.
+
+        Args:
+            operation (callable): Performs the exchange and returns its result.
+            description (str): What is exchanged, used in log and error messages.
+            payload (int): The expected size of the response in bytes.
+            header (str): The SCPI header the exchange is counted under in the command statistics.
+            sent (int): The number of bytes written by the exchange.
+
+        Returns:
+            Any: The result of the operation.
+
+        Raises:
+            ConnectionError: If the circuit is open or every attempt failed.
+        """
+        _policy = self.__io_policy
+        if _policy.is_open():
+            raise ConnectionError(f"Instrument is not responding; {description} not attempted.")
+        _timeout = _policy.timeout_for(payload)
+        if _timeout != self.__timeout:
+            self.__instrument.timeout = _timeout
+            self.__timeout = _timeout
+        _delays = _policy.delays()
+        _retries = 0
+        _started = time.perf_counter()
+        while True:
+            try:
+                _result = operation()
+                break
+            except (pyvisa.errors.VisaIOError, ConnectionError) as e:
+                _policy.record_failure(
+                    isinstance(e, pyvisa.errors.VisaIOError)
+                    and e.error_code == pyvisa.constants.StatusCode.error_timeout
+                )
+                self.__device_clear()
+                _delay = None if _policy.is_open() else next(_delays, None)
+                if _delay is None:
+                    self.__statistics.record(
+                        header or description, time.perf_counter() - _started, sent, 0, _retries, True
+                    )
+                    raise ConnectionError(f"{description} failed: {e}") from e
+                self.logger.debug(f"retrying {description} in {1000 * _delay:.0f} ms...")
+                self.__sleep(_delay)
+                _retries += 1
+        _policy.record_success()
+        self.__statistics.record(
+            header or description,
+            time.perf_counter() - _started,
+            sent,
+            len(_result) if isinstance(_result, (str, bytes, bytearray)) else 0,
+            _retries,
+        )
+        if not self.__draining and _policy.error_check_due():
+            self.drain_errors()
+        return _result
+
+    def __device_clear(self):
+        """
+        Clear the input and output buffers of the instrument after a failed exchange.
+
+        Without it a late response to a timed-out query is read as the response to the next
+        one, and a retried block read resumes in the middle of the block.
+        """
+        try:
+            self.__instrument.clear()
+        except (pyvisa.errors.VisaIOError, ConnectionError) as e:
+            self.logger.debug(f"device clear failed: {e}")
+
+    def __query(self, message: str, payload: int = 0) -> str:
         """
         Send a SCPI query to the instrument and return the response.
 
+        Any commands queued by an open batch are sent first so the query observes them.
+
         Args:
             message (str): The SCPI command string.
+            payload (int): The expected size of the response in bytes.
 
         Returns:
             str: The response string.
 
         Raises:
-            AssertionError: If the message is empty or no response after retries.
+            AssertionError: If the message is empty.
+            ConnectionError: If no response is received under the I/O policy.
         """
         _message = message.strip()
         assert _message, "Message cannot be empty."
-        self.logger.debug(f'sending request "{_message}"...')
-        for _ in range(5):
-            try:
-                _response = self.__instrument.query(_message).rstrip()
-                if _response:
-                    return _response
-            except pyvisa.errors.VisaIOError:
-                self.logger.debug("retrying...")
-                time.sleep(0.1)
-        raise AssertionError("Failed to get response.")
+        if self.__batch:
+            self.__flush_batch()
+        self.logger.debug('sending request "%s"...', _message)
+
+        def _query():
+            _response = self.__instrument.query(_message).rstrip()
+            if not _response:
+                raise ConnectionError("Empty response.")
+            return _response
+
+        _header = "(compound query)" if ";" in _message else self._command_header(_message)
+        return self.__exchange(_query, f'query "{_message}"', payload, _header, len(_message))
 
     def __write(self, message: str):
         """
-        Send a SCPI command to the instrument.
+        Send a SCPI command to the instrument, or queue it while a batch is open.
+
+        Commands that expect a response are never queued; the batch is flushed and they
+        are sent immediately.
 
         Args:
             message (str): The SCPI command string.
@@ -100,14 +472,608 @@ class MSO5000(Device):
         """
         _message = message.strip()
         assert _message, "Message cannot be empty."
-        for _ in range(5):
-            try:
-                self.logger.debug(f'sending command "{_message}"...')
-                self.__instrument.write(_message)
+        if not _message.startswith(":WAVeform"):
+            self.__preambles.clear()
+        _batch = self.__batch
+        if _batch is not None:
+            if "?" not in _message:
+                _batch.append(_message)
+                self.__statistics.record_queued(self._command_header(_message))
                 return
-            except pyvisa.errors.VisaIOError:
-                self.logger.debug("retrying...")
-                time.sleep(0.1)
+            if _batch:
+                self.__flush_batch()
+        self.__send(_message)
+
+    def __send(self, message: str):
+        """
+        Write a message to the instrument under the I/O policy.
+
+        Args:
+            message (str): The complete message to write.
+
+        Raises:
+            ConnectionError: If the message could not be written.
+        """
+        _text = message if len(message) <= 80 else f"{message[:77]}..."
+        self.logger.debug('sending command "%s"...', _text)
+        _header = "(batch)" if ";" in message else self._command_header(message)
+        self.__exchange(
+            partial(self.__instrument.write, message), f'command "{_text}"', len(message), _header, len(message)
+        )
+
+    def __flush_batch(self):
+        """
+        Send the queued batch commands as semicolon-joined messages.
+        """
+        _commands = list(self.__batch)
+        self.__batch.clear()
+        if self.__snapshot is not None:
+            self.__snapshot_sent = True
+        self.__send_commands(_commands)
+
+    def __send_commands(self, commands: list):
+        """
+        Send commands as semicolon-joined messages.
+
+        Every command is made absolute with a leading colon so it is not interpreted
+        relative to the previous command in the same message. Messages are split so that
+        none exceeds the batch message limit.
+
+        Args:
+            commands (list): The commands to send, in order.
+        """
+        _limit = self._batch_message_limit
+        _message = ""
+        for _command in commands:
+            if not _command.startswith((":", "*")):
+                _command = f":{_command}"
+            if _message and len(_message) + len(_command) + 1 > _limit:
+                self.__send(_message)
+                _message = _command
+            else:
+                _message = f"{_message};{_command}" if _message else _command
+        if _message:
+            self.__send(_message)
+
+    def query(self, message: str) -> str:
+        """
+        Send a raw SCPI query through the driver.
+
+        Unlike the underlying PyVISA resource, this flushes an open batch first and
+        retries on I/O errors.
+
+        Args:
+            message (str): The SCPI query.
+
+        Returns:
+            str: The response string.
+        """
+        return self.__query(message)
+
+    def write(self, message: str):
+        """
+        Send a raw SCPI command through the driver.
+
+        The driver cannot tell which settings a raw command changes, so the parameter
+        cache is invalidated afterwards.
+
+        Args:
+            message (str): The SCPI command.
+        """
+        self.__write(message)
+        self._invalidate_cache()
+
+    def get_io_policy(self) -> IoPolicy:
+        """
+        Get the retry, timeout and error-queue policy of the device.
+
+        Returns:
+            IoPolicy: The policy in use.
+        """
+        return self.__io_policy
+
+    def set_io_policy(self, policy: IoPolicy):
+        """
+        Replace the retry, timeout and error-queue policy of the device.
+
+        Args:
+            policy (IoPolicy): The policy to use for subsequent exchanges.
+        """
+        policy.clock = self.__now
+        self.__io_policy = policy
+        self.__timeout = None
+
+    def drain_errors(self) -> list:
+        """
+        Read and log every entry in the instrument error queue.
+
+        Returns:
+            list: The error messages read, oldest first; empty if the queue was empty.
+        """
+        _errors = []
+        self.__draining = True
+        try:
+            for _ in range(self._error_queue_limit):
+                _error = self.__query(":SYSTem:ERRor:NEXT?")
+                if _error.startswith(("0,", "+0,")):
+                    break
+                self.logger.warning(f"Instrument error: {_error}")
+                _errors.append(_error)
+        finally:
+            self.__draining = False
+        return _errors
+
+    def get_cancel_token(self):
+        """
+        Get the token that interrupts the long operations of the device.
+
+        Returns:
+            CancelToken: The token in use, or None.
+        """
+        return self.__cancel
+
+    def set_cancel_token(self, token):
+        """
+        Set the token that interrupts the long operations of the device.
+
+        Polls, retry backoffs and chunked waveform transfers wait on the token and raise
+        tester.OperationCancelled once it is cancelled; single exchanges are never interrupted,
+        so the instrument is not left in the middle of a response.
+
+        Args:
+            token (CancelToken): A token with wait(timeout) and raise_if_cancelled(), or None
+                to make the operations uninterruptible.
+        """
+        self.__cancel = token
+
+    @contextmanager
+    def uncancellable(self):
+        """
+        Suspend cancellation inside the block, e.g. to bring the instrument to a safe state
+        after a cancelled test.
+
+        Yields:
+            None
+        """
+        _cancel = self.__cancel
+        self.__cancel = None
+        try:
+            yield
+        finally:
+            self.__cancel = _cancel
+
+    def __check_cancel(self):
+        """
+        Raise if cancellation of the device's operations was requested.
+
+        Raises:
+            tester.OperationCancelled: If the cancel token is cancelled.
+        """
+        if self.__cancel is not None:
+            self.__cancel.raise_if_cancelled()
+
+    def __sleep(self, delay: float):
+        """
+        Sleep, waking up as soon as cancellation is requested.
+
+        Args:
+            delay (float): The time to sleep in seconds.
+
+        Raises:
+            tester.OperationCancelled: If cancellation was requested before or during the sleep.
+        """
+        if self.__cancel is None:
+            time.sleep(delay)
+        else:
+            self.__cancel.wait(delay)
+            self.__cancel.raise_if_cancelled()
+
+    def __poll(self, condition, timeout: float, description: str):
+        """
+        Poll a condition with exponential backoff until it holds or the timeout expires.
+
+        Args:
+            condition (callable): Returns True once the awaited state is reached.
+            timeout (float): The maximum time to wait in seconds.
+            description (str): What is being waited for, used in the timeout message.
+
+        Raises:
+            TimeoutError: If the condition does not hold within the timeout.
+            tester.OperationCancelled: If cancellation was requested while waiting.
+        """
+        _deadline = self.__now() + timeout
+        _delay, _maximum = self._poll_interval
+        self.__check_cancel()
+        while not condition():
+            _remaining = _deadline - self.__now()
+            if _remaining <= 0:
+                raise TimeoutError(f"Timed out after {timeout} s waiting for {description}.")
+            self.__sleep(min(_delay, _remaining))
+            _delay = min(_delay * 2, _maximum)
+
+    @contextmanager
+    def batch(self):
+        """
+        Queue the commands of all setters inside the block and send them together.
+
+        On exit the queued commands are sent as semicolon-joined messages sized to the
+        transport limit, followed by a single *OPC? query to synchronize with the
+        instrument. Nested batches join the outermost one. If the block raises, the queued
+        commands are discarded and the parameter cache is cleared, since it may hold values
+        that were never sent.
+
+        Yields:
+            list: The queue of commands not yet sent.
+
+        Example:
+            >>> with device.batch():
+            ...     device.channel_settings(1, scale=2, display=True)
+            ...     device.timebase_settings(scale=0.2)
+        """
+        if self.__batch is not None:
+            yield self.__batch
+            return
+        self.__batch = []
+        try:
+            yield self.__batch
+            self.__flush_batch()
+        except BaseException:
+            self._invalidate_cache()
+            raise
+        finally:
+            self.__batch = None
+        self.__query("*OPC?")
+        if self.__io_policy.error_check == MSO5000.ErrorCheck.Batch:
+            self.drain_errors()
+
+    @contextmanager
+    def snapshot(self, name: str):
+        """
+        Configure the instrument from a saved setup register instead of setter by setter.
+
+        The commands of the setters inside the block are recorded instead of sent. The first
+        time a configuration is seen on an oscilloscope, the commands are sent as one batch
+        and the resulting setup is saved with *SAV to one of the reserved registers. Later,
+        the register is restored with a single *RCL and only the commands that changed since
+        it was saved are sent, after which it is saved again. Either way the parameter cache
+        is left holding the recorded values.
+
+        Snapshots are stored in the device settings per oscilloscope serial number. A block
+        that has to query the instrument, or is nested in a batch, is sent as an ordinary batch.
+
+        Args:
+            name (str): The name of the configuration, e.g. the test name.
+
+        Yields:
+            list: The queue of commands not yet sent.
+
+        Example:
+            >>> with device.snapshot("Bearing Test"):
+            ...     device.channel_settings(1, scale=2, display=True)
+            ...     device.timebase_settings(scale=0.2)
+        """
+        if self.__batch is not None:
+            yield self.__batch
+            return
+        self._invalidate_cache()
+        self.__batch = []
+        self.__snapshot = {}
+        self.__snapshot_sent = False
+        try:
+            yield self.__batch
+            _commands = list(self.__batch)
+            _parameters = self.__snapshot
+            _complete = not self.__snapshot_sent
+            self.__batch.clear()
+        except BaseException:
+            self._invalidate_cache()
+            raise
+        finally:
+            self.__batch = None
+            self.__snapshot = None
+            self.__snapshot_sent = False
+        if _complete:
+            self.__restore_snapshot(name, _commands, _parameters)
+        else:
+            self.__send_commands(_commands)
+        self.__query("*OPC?")
+        if self.__io_policy.error_check == MSO5000.ErrorCheck.Batch:
+            self.drain_errors()
+
+    @staticmethod
+    def _command_header(command: str) -> str:
+        """
+        Get the header of a SCPI command, i.e. the node it sets.
+
+        Args:
+            command (str): The command with its parameters.
+
+        Returns:
+            str: The command up to the first space.
+        """
+        return command.split(" ", 1)[0]
+
+    def __restore_snapshot(self, name: str, commands: list, parameters: dict):
+        """
+        Bring the instrument to a recorded configuration using its setup snapshot.
+
+        Args:
+            name (str): The name of the configuration.
+            commands (list): The recorded commands, in order.
+            parameters (dict): The recorded parameter values, keyed by cache attribute.
+        """
+        _serial = self._get_setting("serial_number", "unknown")
+        _key = f"snapshots/{_serial}/{name}"
+        _digest = hashlib.sha1("\n".join(commands).encode()).hexdigest()
+        _register = self.__get_snapshot_setting(f"{_key}/register")
+        if _register is None:
+            self.logger.info(f'Creating snapshot of "{name}"...')
+            self.__send_commands(commands)
+            _register = self.__allocate_snapshot_register(_serial, name)
+        else:
+            _register = int(_register)
+            self.recall(_register)
+            if not self.__snapshot_matches(self._as_list(self.__get_snapshot_setting(f"{_key}/commands")), parameters):
+                # The register was overwritten, e.g. from the front panel or by another station,
+                # or the oscilloscope was replaced; start over from a known state.
+                self.logger.warning(
+                    f'Register {_register} no longer holds the snapshot of "{name}"; creating it again...'
+                )
+                self.__remove_snapshot_setting(_key)
+                self.__send("*RST")
+                self.__send_commands(commands)
+            elif self.__get_snapshot_setting(f"{_key}/digest") == _digest:
+                self.logger.info(f'Restored snapshot of "{name}" from register {_register}.')
+                _register = None
+            else:
+                _saved = {
+                    self._command_header(_command): _command
+                    for _command in self._as_list(self.__get_snapshot_setting(f"{_key}/commands"))
+                }
+                _headers = {self._command_header(_command) for _command in commands}
+                if _saved.keys() <= _headers:
+                    _changed = [
+                        _command
+                        for _command in commands
+                        if _saved.get(self._command_header(_command)) != _command
+                    ]
+                else:
+                    # A setting that is no longer requested cannot be undone; start over.
+                    self.__send("*RST")
+                    _changed = commands
+                self.logger.info(
+                    f'Updating snapshot of "{name}" in register {_register} with {len(_changed)} commands...'
+                )
+                self.__send_commands(_changed)
+        if _register is not None:
+            self.save(_register)
+            self.__set_snapshot_setting(f"{_key}/register", _register)
+            self.__set_snapshot_setting(f"{_key}/digest", _digest)
+            self.__set_snapshot_setting(f"{_key}/commands", commands)
+        self.__set_snapshot_setting(f"{_key}/used", time.time())
+        for _attribute, _value in parameters.items():
+            self.__cache_store(_attribute, _value)
+
+    def __snapshot_matches(self, saved: list, parameters: dict) -> bool:
+        """
+        Check that a recalled register still holds the setup saved to it.
+
+        A few of the saved settings are queried back in one compound query and compared with
+        the values they were saved with, numeric settings other than switches first.
+
+        Args:
+            saved (list): The commands the register was saved with.
+            parameters (dict): The recorded parameter values, keyed by cache attribute; only
+                saved settings that are still recorded are checked.
+
+        Returns:
+            bool: True if every checked setting holds its saved value.
+        """
+        _checks = []
+        for _command in saved:
+            _header, _, _value = _command.partition(" ")
+            if _value and "," not in _value and _header.replace(":", "_").lower() in parameters:
+                _checks.append((_header, _value))
+        if not _checks:
+            return True
+
+        def _rank(check):
+            # Reset defaults are mostly switches and keywords, so numbers tell setups apart best.
+            _canonical = self._canonical(check[1])
+            try:
+                float(_canonical)
+            except ValueError:
+                return 1
+            return 2 if _canonical in ("0", "1") else 0
+
+        _checks = sorted(_checks, key=_rank)[: self._snapshot_checks]
+        _responses = self.__query(";".join(f"{_header}?" for _header, _ in _checks)).split(";")
+        if len(_responses) != len(_checks):
+            return False
+        for (_header, _value), _response in zip(_checks, _responses):
+            try:
+                _same = math.isclose(float(_value), float(_response), rel_tol=1e-3, abs_tol=1e-12)
+            except ValueError:
+                _same = self._canonical(_value) == self._canonical(_response)
+            if not _same:
+                self.logger.debug(f'{_header} is {_response.strip()}, saved as {_value}')
+                return False
+        return True
+
+    def __allocate_snapshot_register(self, serial: str, name: str) -> int:
+        """
+        Choose the register for a new snapshot, evicting the least recently used one if all are taken.
+
+        Args:
+            serial (str): The serial number of the oscilloscope.
+            name (str): The name of the configuration.
+
+        Returns:
+            int: The register to save the snapshot to.
+        """
+        _names = self._as_list(self.__get_snapshot_setting(f"snapshots/{serial}/names"))
+        _registers = self._snapshot_registers
+        if len(_names) < len(_registers):
+            _names.append(name)
+        else:
+            _index = min(
+                range(len(_names)),
+                key=lambda i: float(self.__get_snapshot_setting(f"snapshots/{serial}/{_names[i]}/used", 0)),
+            )
+            self.logger.info(f'Evicting snapshot of "{_names[_index]}".')
+            self.__remove_snapshot_setting(f"snapshots/{serial}/{_names[_index]}")
+            _names[_index] = name
+        self.__set_snapshot_setting(f"snapshots/{serial}/names", _names)
+        return _registers[_names.index(name)]
+
+    def __get_snapshot_setting(self, key: str, default=None):
+        """
+        Get a setting of the setup snapshots.
+
+        While a trace is replayed the snapshots recorded with it are used instead of the
+        device settings, so the replay recalls the same registers whatever the station holds.
+
+        Args:
+            key (str): The key of the setting, starting with "snapshots/".
+            default (Any): The value to return if the key does not exist.
+
+        Returns:
+            Any: The value of the setting, or the default if not found.
+        """
+        if self.__snapshots is not None:
+            return self.__snapshots.get(key, default)
+        return self._get_setting(key, default)
+
+    def __set_snapshot_setting(self, key: str, value):
+        """
+        Set a setting of the setup snapshots.
+
+        Args:
+            key (str): The key of the setting, starting with "snapshots/".
+            value (Any): The value to set.
+        """
+        if self.__snapshots is not None:
+            self.__snapshots[key] = value
+        else:
+            self._set_setting(key, value)
+
+    def __remove_snapshot_setting(self, key: str):
+        """
+        Remove a setting of the setup snapshots and every setting below it.
+
+        Args:
+            key (str): The key of the setting, starting with "snapshots/".
+        """
+        if self.__snapshots is not None:
+            for _key in [_key for _key in self.__snapshots if _key == key or _key.startswith(f"{key}/")]:
+                del self.__snapshots[_key]
+        else:
+            self._settings.remove(f"Devices/{self.Name}/{key}")
+
+    def __get_snapshot_settings(self) -> dict:
+        """
+        Get every setting of the setup snapshots of the connected oscilloscope.
+
+        Returns:
+            dict: The values keyed as by __get_snapshot_setting.
+        """
+        _group = f"snapshots/{self._get_setting('serial_number', 'unknown')}"
+        if self.__snapshots is not None:
+            return {_key: _value for _key, _value in self.__snapshots.items() if _key.startswith(f"{_group}/")}
+        self._settings.beginGroup(f"Devices/{self.Name}/{_group}")
+        try:
+            return {f"{_group}/{_key}": self._settings.value(_key) for _key in self._settings.allKeys()}
+        finally:
+            self._settings.endGroup()
+
+    def __state_known(self) -> bool:
+        """
+        Check whether the driver knows any of the configuration of the instrument.
+
+        Returns:
+            bool: True if the cache holds a written or queried setting.
+        """
+        _policies = self.__cache_policies
+        _static = MSO5000.CachePolicy.Static
+        return any(
+            _policies.get(_attribute, self.__default_cache_policy)[0] != _static
+            for _attribute in self.__cache
+        )
+
+    @tester._member_logger
+    def apply_state(self, state: dict, snapshot: str = None) -> list:
+        """
+        Bring the instrument to a declared state, writing only the settings that differ from the known state.
+
+        The state maps the names of setter methods to their arguments:
+
+        - a dict of keyword arguments, for setters of the whole instrument;
+        - a dict of keyword-argument dicts keyed by channel, for setters taking a channel first;
+        - a list of positional-argument tuples, for setters applied once per entry.
+
+        Setters are applied in dependency order (acquisition, channels, timebase, trigger,
+        function generators, then measurements) inside one batch. Every parameter that already
+        holds the declared value in the cache is skipped, so only the difference to the previous
+        state is sent. The analog channels and function generators not declared are switched off.
+
+        Args:
+            state (dict): The declared state.
+            snapshot (str, optional): If the driver knows nothing of the instrument configuration,
+                e.g. right after a reset, restore the state through the setup snapshot of this name.
+
+        Returns:
+            list: The commands issued by the setters, in order. When the state is restored from a
+                snapshot most of them are covered by the *RCL instead of being sent.
+
+        Example:
+            >>> device.apply_state({
+            ...     "timebase_settings": {"scale": 0.2},
+            ...     "channel_settings": {1: {"scale": 2, "display": True}},
+            ...     "set_measure_item": [(MSO5000.Measurement.VoltageRms, MSO5000.Source.Channel1)],
+            ... })
+        """
+        _order = self._state_order
+
+        def _rank(name):
+            return next(
+                (_index for _index, _prefix in enumerate(_order) if name.startswith(_prefix)),
+                len(_order),
+            )
+
+        _generators = {
+            _channel
+            for _name, _arguments in state.items()
+            if _name.startswith("function_generator_") and isinstance(_arguments, dict)
+            for _channel in _arguments
+            if isinstance(_channel, int)
+        }
+        _context = (
+            self.snapshot(snapshot)
+            if snapshot and self.__batch is None and not self.__state_known()
+            else self.batch()
+        )
+        with _context as _queue:
+            for _name in sorted(state, key=_rank):
+                _setter = getattr(self, _name)
+                _arguments = state[_name]
+                if isinstance(_arguments, dict) and _arguments and all(isinstance(_key, int) for _key in _arguments):
+                    for _channel, _kwargs in _arguments.items():
+                        _setter(_channel, **_kwargs)
+                    if _name == "channel_settings":
+                        for _channel in range(1, 5):
+                            if _channel not in _arguments:
+                                self.set_channel_display(_channel, False)
+                elif isinstance(_arguments, dict):
+                    _setter(**_arguments)
+                else:
+                    for _args in _arguments:
+                        _setter(*_args)
+            for _channel in (1, 2):
+                if _channel not in _generators:
+                    self.function_generator_state(_channel, False)
+            _sent = list(_queue)
+        self.logger.info(f"Applied state with {len(_sent)} commands.")
+        return _sent
 
     def __get_names(self, channel: str, parameter: str):
         """
@@ -127,9 +1093,143 @@ class MSO5000(Device):
         _attribute = _parameter.replace(":", "_").lower()
         return _attribute, _parameter
 
+    @staticmethod
+    def _canonical(value) -> str:
+        """
+        Normalize a written or queried value so equal settings compare equal.
+
+        Booleans and ON/OFF become "1"/"0", numbers are formatted with ten significant
+        digits, mixed-case SCPI keywords are reduced to their short form, and other text is
+        upper-cased.
+
+        Args:
+            value (Any): The value as written or the response string as queried.
+
+        Returns:
+            str: The canonical form of the value.
+        """
+        if isinstance(value, bool):
+            return "1" if value else "0"
+        if isinstance(value, (int, float)):
+            return f"{value:.10g}"
+        _text = str(value).strip()
+        try:
+            return f"{float(_text):.10g}"
+        except ValueError:
+            pass
+        if _text.isalnum() and not _text.islower():
+            _text = "".join(c for c in _text if not c.islower())
+        _text = _text.upper()
+        return {"ON": "1", "OFF": "0"}.get(_text, _text)
+
+    def __cache_lookup(self, attribute: str):
+        """
+        Get the cached entry of a parameter if its policy allows it to be used.
+
+        Args:
+            attribute (str): The cache key.
+
+        Returns:
+            tuple: The (canonical, value, expiry) entry, or None if it must be re-read.
+        """
+        _entry = self.__cache.get(attribute)
+        if _entry is not None and _entry[2] is not None and _entry[2] < self.__now():
+            del self.__cache[attribute]
+            _entry = None
+        return _entry
+
+    def __cache_store(self, attribute: str, value):
+        """
+        Store a written or queried value according to the parameter's cache policy.
+
+        Args:
+            attribute (str): The cache key.
+            value (Any): The value as written or the response string as queried.
+        """
+        _policy, _ttl = self.__cache_policies.get(attribute, self.__default_cache_policy)
+        if _policy == MSO5000.CachePolicy.Never:
+            return
+        _expiry = self.__now() + _ttl if _policy == MSO5000.CachePolicy.Ttl else None
+        self.__cache[attribute] = (self._canonical(value), value, _expiry)
+
+    def __cached_query(self, attribute: str, message: str) -> str:
+        """
+        Return a cached query response, or query the instrument and cache the response.
+
+        Args:
+            attribute (str): The cache key.
+            message (str): The SCPI query.
+
+        Returns:
+            str: The response string.
+        """
+        _entry = self.__cache_lookup(attribute)
+        if _entry is not None:
+            self.__cache_hits += 1
+            self.__statistics.record_cache_hit(message)
+            return _entry[1]
+        self.__cache_misses += 1
+        _response = self.__query(message)
+        self.__cache_store(attribute, _response)
+        return _response
+
+    def _invalidate_cache(self):
+        """
+        Drop every cached value that may no longer match the instrument state.
+
+        Only entries with the Static policy are kept. Called whenever the instrument
+        state is replaced as a whole, e.g. by *RST, *RCL, :LOAD:SETup or :AUToscale.
+        """
+        _policies = self.__cache_policies
+        _static = MSO5000.CachePolicy.Static
+        self.__cache = {
+            _attribute: _entry
+            for _attribute, _entry in self.__cache.items()
+            if _policies.get(_attribute, self.__default_cache_policy)[0] == _static
+        }
+        self.__preambles.clear()
+        self.__measure_items.clear()
+
+    def get_cache_statistics(self) -> dict:
+        """
+        Get the parameter cache counters.
+
+        Hits are reads served from the cache and writes skipped because the cached value
+        already matched; misses are reads and writes that went to the instrument.
+
+        Returns:
+            dict: The number of hits, misses and currently cached entries.
+        """
+        return {
+            "hits": self.__cache_hits,
+            "misses": self.__cache_misses,
+            "entries": len(self.__cache),
+        }
+
+    def get_command_statistics(self) -> dict:
+        """
+        Get the statistics of every SCPI header exchanged since they were last reset.
+
+        Returns:
+            dict: Per header, slowest in total first, the wire calls, cache hits, commands
+                queued in batches, retries, failures, bytes out and in, and the total, mean,
+                p50, p95, p99 and maximum latency in milliseconds.
+
+        Example:
+            >>> for header, entry in list(device.get_command_statistics().items())[:5]:
+            ...     print(header, entry["calls"], entry["total_ms"])
+        """
+        return self.__statistics.summary()
+
+    def reset_command_statistics(self):
+        """
+        Forget the SCPI command statistics, e.g. at the start of a run.
+        """
+        self.__statistics.reset()
+
     def _get_parameter(self, channel: str, parameter: str, default=None):
         """
-        Retrieve a parameter value from the device, using cache if available.
+        Retrieve a parameter value from the device, using cache if its policy allows.
 
         Args:
             channel (str): The channel identifier.
@@ -142,24 +1242,22 @@ class MSO5000(Device):
         assert channel, "Channel cannot be empty."
         assert parameter, "Parameter cannot be empty."
         _attribute, _parameter = self.__get_names(channel, parameter)
-        _cache = self.__cache
-        if _attribute in _cache:
-            return _cache[_attribute]
-        _query_result = self.__query(f"{_parameter}?")
-        if default is not None:
-            try:
-                _value = type(default)(_query_result)
-            except Exception:
-                _value = default
-        else:
-            _value = _query_result
-        _cache[_attribute] = _value
-        return _value
+        _response = self.__cached_query(_attribute, f"{_parameter}?")
+        if default is None:
+            return _response
+        if isinstance(default, bool):
+            return self._canonical(_response) == "1"
+        try:
+            return type(default)(_response)
+        except Exception:
+            return default
 
     def _set_parameter(self, channel: str, parameter: str, value):
         """
         Set a device parameter for the specified channel and cache the value.
 
+        The write is skipped when the cached value is equal in canonical form.
+
         Args:
             channel (str): The channel identifier.
             parameter (str): The parameter name.
@@ -168,10 +1266,21 @@ class MSO5000(Device):
         assert channel, "Channel cannot be empty."
         assert parameter, "Parameter cannot be empty."
         _attribute, _parameter = self.__get_names(channel, parameter)
-        if self.__cache.get(_attribute) == value:
+        _entry = self.__cache_lookup(_attribute)
+        if _entry is not None and _entry[0] == self._canonical(value):
+            self.__cache_hits += 1
+            self.__statistics.record_cache_hit(_parameter)
             return
-        self.__write(f"{_parameter} {value}")
-        self.__cache[_attribute] = value
+        self.__cache_misses += 1
+        _value = ("1" if value else "0") if isinstance(value, bool) else str(value)
+        self.__write(f"{_parameter} {_value}")
+        if self.__snapshot is not None:
+            self.__snapshot[_attribute] = _value
+        for _prefix, _dependents in self.__cache_dependents.items():
+            if _attribute.startswith(_prefix):
+                for _dependent in _dependents:
+                    self.__cache.pop(_dependent, None)
+        self.__cache_store(_attribute, _value)
 
     class Source(StrEnum):
         """
@@ -243,32 +1352,199 @@ class MSO5000(Device):
         Ampere = "AMP"
         Unknown = "UNKN"
 
+    def __probe(self, resource_manager, resource_name: str):
+        """
+        Open a VISA resource with a short timeout and ask it to identify itself.
+
+        Args:
+            resource_manager (pyvisa.ResourceManager): The resource manager to open the resource with.
+            resource_name (str): The VISA resource string.
+
+        Returns:
+            tuple: The open instrument (or None) and its identity string (or None if it did not answer).
+                The instrument is only returned, with its default timeout restored, for an MSO5000.
+        """
+        try:
+            _instrument = resource_manager.open_resource(resource_name, open_timeout=self._probe_timeout)
+        except Exception as e:
+            self.logger.debug(f"Error opening resource {resource_name}: {e}")
+            return None, None
+        try:
+            _timeout = _instrument.timeout
+            _instrument.timeout = self._probe_timeout
+            _idn = _instrument.query("*IDN?").strip()
+            if "RIGOL" in _idn and "MSO5" in _idn:
+                _instrument.timeout = _timeout
+                return _instrument, _idn
+        except Exception as e:
+            self.logger.debug(f"Error querying resource {resource_name}: {e}")
+            _idn = None
+        _instrument.close()
+        return None, _idn
+
+    def __probe_resources(self, resource_manager, names: list, skipped: set) -> tuple:
+        """
+        Probe VISA resources in parallel until one answers as an MSO5000.
+
+        Args:
+            resource_manager (pyvisa.ResourceManager): The resource manager to open the resources with.
+            names (list): The VISA resource strings to probe.
+            skipped (set): The resources known to be some other instrument, updated with the
+                answers of the probed resources.
+
+        Returns:
+            tuple: The open instrument, its identity string and its resource string, or three
+                None if no resource answered as an MSO5000.
+        """
+        _instrument = _idn = _resource = None
+        if not names:
+            return _instrument, _idn, _resource
+        with ThreadPoolExecutor(max_workers=min(self._probe_workers, len(names))) as _executor:
+            _futures = {_executor.submit(self.__probe, resource_manager, _name): _name for _name in names}
+            for _future in as_completed(_futures):
+                if _future.cancelled():
+                    continue
+                _name = _futures[_future]
+                _found, _answer = _future.result()
+                if _found is None:
+                    if _answer:
+                        skipped.add(_name)
+                    else:
+                        skipped.discard(_name)
+                elif _instrument is None:
+                    skipped.discard(_name)
+                    _instrument, _idn, _resource = _found, _answer, _name
+                    for _pending in _futures:
+                        _pending.cancel()
+                else:
+                    skipped.discard(_name)
+                    _found.close()
+        return _instrument, _idn, _resource
+
+    def __get_list_setting(self, key: str) -> list:
+        """
+        Get a device setting that holds a list of strings.
+
+        Args:
+            key (str): The key of the setting.
+
+        Returns:
+            list: The stored strings.
+        """
+        return self._as_list(self._get_setting(key, []))
+
+    @staticmethod
+    def _as_list(value) -> list:
+        """
+        Normalize a setting that holds a list of strings.
+
+        QSettings returns a single-element list as a plain string and an empty list as None.
+
+        Args:
+            value (Any): The value as stored.
+
+        Returns:
+            list: The stored strings.
+        """
+        if isinstance(value, str):
+            return [value] if value else []
+        return list(value or [])
+
     def find_instrument(self):
         """
         Discover and connect to a RIGOL MSO5000 oscilloscope using PyVISA.
 
+        If the "replay_trace" device setting names a trace file, the recorded instrument is
+        replayed from it instead, in real time if the "replay_realtime" setting is true. If the
+        "simulated" device setting is true, the simulated oscilloscope is attached
+        instead, with the latency, bandwidth and acquisition speed of the "simulated_latency",
+        "simulated_bandwidth" and "simulated_realtime" settings.
+
+        The last-known resource is tried first with a short timeout. Only when it does not answer
+        as an MSO5000 are the remaining resources probed, in parallel, skipping resources that
+        previously identified themselves as some other instrument. The skipped resources are
+        probed again only if none of the others is an MSO5000.
+
         Side Effects:
             Sets self.__instrument and updates device settings.
         Raises:
             AssertionError: If no MSO5000 oscilloscope is found.
         """
+        _replay = self._get_setting("replay_trace", "")
+        if _replay:
+            self.logger.info(f"Replaying SCPI trace {_replay}.")
+            _resource = ReplayResource(_replay, self._get_bool_setting("replay_realtime"))
+            self.attach(_resource, _resource.idn)
+            return
+        if self._get_bool_setting("simulated"):
+            self.logger.info("Using the simulated MSO5000 oscilloscope.")
+            self.attach(
+                SimulatedMSO5000(
+                    latency=float(self._get_setting("simulated_latency", 0.0)),
+                    bandwidth=float(self._get_setting("simulated_bandwidth", 0.0)),
+                    realtime=float(self._get_setting("simulated_realtime", 1.0)),
+                )
+            )
+            return
+        _started = time.perf_counter()
         _resource_manager = pyvisa.ResourceManager()
-        found = False
-        for _resource_name in _resource_manager.list_resources():
-            try:
-                self.logger.info(f"Found device: {_resource_name}")
-                _instrument = _resource_manager.open_resource(_resource_name)
-                idn = _instrument.query("*IDN?").strip()
-                if "RIGOL" in idn and "MSO5" in idn:
-                    self.logger.info(f"Found MSO5000 oscilloscope: {_resource_name}")
-                    self.__instrument = _instrument
-                    found = True
-                    break
-            except Exception as e:
-                self.logger.debug(f"Error opening resource {_resource_name}: {e}")
-        assert found, "No oscilloscope found."
+        _skipped = set(self.__get_list_setting("non_mso5000_resources"))
+        _last = self._get_setting("resource_name", "")
+        _instrument = _idn = None
+        _resource = _last
+        if _last:
+            _instrument, _idn = self.__probe(_resource_manager, _last)
+            if _instrument is not None:
+                _skipped.discard(_last)
+            elif _idn:
+                _skipped.add(_last)
+        if _instrument is None:
+            _available = [_name for _name in _resource_manager.list_resources() if _name != _last]
+            _candidates = [_name for _name in _available if _name not in _skipped]
+            self.logger.info(f"Probing {len(_candidates)} resources, skipping {len(_skipped)}.")
+            _instrument, _idn, _resource = self.__probe_resources(_resource_manager, _candidates, _skipped)
+        if _instrument is None:
+            # A skipped resource may have been booting when it answered, or its address may
+            # since have been given to the oscilloscope, so it is probed again before giving up.
+            _candidates = [_name for _name in _available if _name in _skipped]
+            if _candidates:
+                self.logger.info(f"Probing {len(_candidates)} skipped resources again.")
+                _instrument, _idn, _resource = self.__probe_resources(_resource_manager, _candidates, _skipped)
+        self._set_setting("non_mso5000_resources", sorted(_skipped))
+        self.logger.info(
+            f"Instrument discovery took {1000 * (time.perf_counter() - _started):.0f} ms."
+        )
+        assert _instrument is not None, "No oscilloscope found."
+        self.logger.info(f"Found MSO5000 oscilloscope: {_resource}")
+        self._set_setting("resource_name", _resource)
+        self.attach(_instrument, _idn)
+
+    def attach(self, instrument, idn: str = None):
+        """
+        Connect the driver to an open instrument resource.
+
+        Any object with the write, query, _read_raw and clear methods and the timeout attribute of a
+        PyVISA message based resource can be attached, e.g. a simulated instrument.
+
+        Args:
+            instrument: The resource to send the SCPI commands to.
+            idn (str, optional): The *IDN? response, if the resource has already been asked.
+
+        Side Effects:
+            Sets self.__instrument, clears the cache and updates device settings.
+        """
+        self.__instrument = instrument
+        self.__timeout = None
+        self.__io_policy.reset()
+        _snapshots = getattr(instrument, "snapshots", None)
+        self.__snapshots = dict(_snapshots) if _snapshots is not None else None
+        self.__cache = {}
+        self.__preambles.clear()
+        self.__measure_items.clear()
+        if idn is None:
+            idn = instrument.query("*IDN?").strip()
+        self.__cache_store("_idn", idn)
         try:
-            idn = self.__instrument.query("*IDN?").strip()
             parts = idn.split(",")
             if len(parts) >= 4:
                 settings = {
@@ -284,6 +1560,56 @@ class MSO5000(Device):
             self.logger.debug(f"Error parsing IDN: {e}")
         self.logger.info(f"Connected to {getattr(self, 'model_name', 'Unknown')} oscilloscope.")
 
+    def get_record_trace(self) -> bool:
+        """
+        Check whether test runs should record an SCPI trace.
+
+        Returns:
+            bool: The "record_trace" device setting.
+        """
+        return self._get_bool_setting("record_trace")
+
+    @tester._member_logger
+    def start_trace(self, path):
+        """
+        Record every exchange with the instrument into a binary SCPI trace.
+
+        The trace can be replayed later through the "replay_trace" setting. The cache is
+        cleared so the recording does not depend on what the driver already knew, and the
+        setup snapshots are stored in the trace so the replay recalls the same registers.
+
+        Args:
+            path (str or Path): The trace file to create.
+        """
+        self.stop_trace()
+        self._invalidate_cache()
+        self.__instrument = RecordingResource(
+            self.__instrument, path, self.__cached_query("_idn", "*IDN?"), self.__get_snapshot_settings()
+        )
+        self.__io_policy.reset()
+
+    @tester._member_logger
+    def stop_trace(self) -> dict:
+        """
+        Stop recording the SCPI trace, if one is being recorded, and summarize it.
+
+        Returns:
+            dict: The summary of the trace, as returned by summarize_trace, or None if no
+                trace was being recorded.
+        """
+        _instrument = self.__instrument
+        if not isinstance(_instrument, RecordingResource):
+            return None
+        self.__instrument = _instrument.resource
+        self.__io_policy.reset()
+        _instrument.close()
+        _summary = summarize_trace(_instrument.path)
+        self.logger.info(
+            f"SCPI trace: {_summary['exchanges']} exchanges, {_summary['bytes_read']} bytes read, "
+            f"{_summary['wire_time']:.3f} s wire time and {_summary['host_time']:.3f} s host time."
+        )
+        return _summary
+
     # The device command system
     @tester._member_logger
     def autoscale(self):
@@ -302,6 +1628,7 @@ class MSO5000(Device):
             >>> device.autoscale()
         """
         self.__write("AUToscale")
+        self._invalidate_cache()
 
     @tester._member_logger
     def clear(self):
@@ -323,6 +1650,32 @@ class MSO5000(Device):
     def force_trigger(self):
         self.__write(":TFORce")
 
+    @tester._member_logger
+    def wait_for_acquisition(self, timeout: float = 30.0):
+        """
+        Wait until a single acquisition has completed and the oscilloscope has stopped.
+
+        The trigger status is polled with exponential backoff after the instrument has
+        acknowledged all pending commands, so a status left over from before :SINGle is
+        never mistaken for a completed acquisition.
+
+        Args:
+            timeout (float, optional): The maximum time to wait in seconds. Defaults to 30.
+
+        Raises:
+            TimeoutError: If the acquisition does not complete within the timeout.
+
+        Example:
+            >>> device.single()
+            >>> device.wait_for_acquisition(timeout=60)
+        """
+        self.__query("*OPC?")
+        self.__poll(
+            lambda: self.__query(":TRIGger:STATus?") == MSO5000.TriggerStatus.Stop,
+            timeout,
+            "the acquisition",
+        )
+
     # The :ACQ commands are used to set the memory depth of the
     # oscilloscope, the acquisition mode, the average times, as well as query
     # the current sample rate
@@ -529,7 +1882,7 @@ class MSO5000(Device):
         position: float = 0,
     ):
         self.set_channel_display(channel, display)
-        time.sleep(1)
+        self.wait_for_complete()
         self.set_channel_probe(channel, probe)
         self.set_channel_scale(channel, scale)
         self.set_channel_bandwidth_limit(channel, bandwidth_limit)
@@ -576,7 +1929,7 @@ class MSO5000(Device):
 
     @tester._member_logger
     def get_identity(self) -> str:
-        return self.__query("*IDN?")
+        return self.__cached_query("_idn", "*IDN?")
 
     @tester._member_logger
     def get_operation_complete(self) -> bool:
@@ -596,6 +1949,7 @@ class MSO5000(Device):
     def recall(self, register: int):
         assert register >= 0 and register <= 49, "Register must be between 0 and 49."
         self.__write(f"*RCL {register}")
+        self._invalidate_cache()
 
     @tester._member_logger
     def reset(self):
@@ -614,7 +1968,7 @@ class MSO5000(Device):
             >>> device.reset()
         """
         self.__write("*RST")
-        self.__cache.clear()
+        self._invalidate_cache()
 
     @tester._member_logger
     def get_status_byte_register_enable(self) -> BYTE:
@@ -639,6 +1993,30 @@ class MSO5000(Device):
     def wait(self):
         self.__write("*WAI")
 
+    @tester._member_logger
+    def wait_for_complete(self, timeout: float = 10.0):
+        """
+        Wait until the instrument has finished executing all pending commands.
+
+        Sets the operation complete bit with *OPC and polls *ESR? with exponential backoff
+        until it is reported. Inside a batch this returns immediately, since the batch ends
+        with its own *OPC? synchronization.
+
+        Args:
+            timeout (float, optional): The maximum time to wait in seconds. Defaults to 10.
+
+        Raises:
+            TimeoutError: If the operations do not complete within the timeout.
+        """
+        if self.__batch is not None:
+            return
+        self.__write("*OPC")
+        self.__poll(
+            lambda: int(self.__query("*ESR?")) & 0x01,
+            timeout,
+            "operation complete",
+        )
+
     # The :LA commands are used to perform relevant operations on the digital
     # channels. PLA2216 active logic probe option is required to be ordered.
 
@@ -719,6 +2097,7 @@ class MSO5000(Device):
             item in MSO5000.MeasureItem
         ), "Item must be one of the MeasureItem enum values."
         self._set_parameter("MEASure", "CLEar", item.value)
+        self.__measure_items.clear()
 
     @tester._member_logger
     def set_measure_threshold_source(self, source: Source):
@@ -749,17 +2128,231 @@ class MSO5000(Device):
 
     @tester._member_logger
     def set_measure_item(self, measurement: Measurement, source: Source):
+        if (measurement, source) in self.__measure_items:
+            return
         self.__write(f":MEASure:ITEM {measurement.value},{source.value}")
+        self.__measure_items.add((measurement, source))
 
     @tester._member_logger
     def get_measure_item(self, measurement: Measurement, source: Source):
         return float(self.__query(f":MEASure:ITEM? {measurement.value},{source.value}"))
 
-    # The :POWer commands are used to set the relevant parameters of the power supply module.
+    class MeasureStatistic(StrEnum):
+        """
+        Enumeration of the statistics the oscilloscope keeps for every measurement item.
+
+        Attributes:
+            Current: The value of the last acquisition.
+            Average: The mean since the statistics were reset.
+            Maximum: The largest value since the statistics were reset.
+            Minimum: The smallest value since the statistics were reset.
+            Deviation: The standard deviation since the statistics were reset.
+            Count: The number of values since the statistics were reset.
+        """
+
+        Current = "CURRent"
+        Average = "AVERages"
+        Maximum = "MAXimum"
+        Minimum = "MINimum"
+        Deviation = "DEViation"
+        Count = "CNT"
+
+    # The value the oscilloscope returns for a measurement it cannot make on the waveform.
+    _invalid_measurement = 9.9e37
+
+    @tester._member_logger
+    def set_measure_statistic_display(self, state: bool):
+        self._set_parameter("MEASure", "STATistic:DISPlay", state)
+
+    @tester._member_logger
+    def reset_measure_statistic(self):
+        self.__write(":MEASure:STATistic:RESet")
+
+    @tester._member_logger
+    def set_measure_items(self, items: list):
+        """
+        Register several measurement items in one batch; items already registered are skipped.
+
+        Args:
+            items (list): The (Measurement, Source) pairs to measure.
+        """
+        with self.batch():
+            for _measurement, _source in items:
+                self.set_measure_item(_measurement, _source)
+
+    @tester._member_logger
+    def get_measure_items(self, items: list, statistics: list = None) -> np.ndarray:
+        """
+        Read several measurement items, or their statistics, in one compound query.
+
+        Values the oscilloscope cannot measure are returned as NaN.
+
+        Args:
+            items (list): The (Measurement, Source) pairs to read, registered with set_measure_items.
+            statistics (list, optional): The MeasureStatistic values to read for every item.
+                Defaults to the current value of every item.
+
+        Returns:
+            np.ndarray: One value per item, or one row per item with one column per statistic.
+
+        Raises:
+            AssertionError: If the number of values returned does not match the request.
+
+        Example:
+            >>> items = [(MSO5000.Measurement.VoltageRms, MSO5000.Source.Channel2)]
+            >>> device.set_measure_items(items)
+            >>> rms, = device.get_measure_items(items)
+        """
+        assert items, "At least one measurement item must be read."
+        if statistics is None:
+            _queries = [
+                f":MEASure:ITEM? {_measurement.value},{_source.value}"
+                for _measurement, _source in items
+            ]
+        else:
+            _queries = [
+                f":MEASure:STATistic:ITEM? {_statistic.value},{_measurement.value},{_source.value}"
+                for _measurement, _source in items
+                for _statistic in statistics
+            ]
+        _response = self.__query(";".join(_queries), 16 * len(_queries))
+        _values = np.array(_response.split(";"), dtype=np.float64)
+        assert _values.size == len(_queries), (
+            f"Expected {len(_queries)} measurement values, received {_values.size}."
+        )
+        _values[_values >= self._invalid_measurement] = np.nan
+        return _values if statistics is None else _values.reshape(len(items), len(statistics))
+
+    # The :POWer commands are used to set the relevant parameters of the power supply module.
+
+    # The :QUICk command is used to set and query the relevant parameters for shortcut keys.
+
+    # The :RECOrd commands are used to set the relevant parameters of the record function.
+    class RecordOperation(StrEnum):
+        """
+        Enumeration of the states of the waveform recorder.
+
+        Attributes:
+            Run: Recording frames.
+            Stop: Idle; the recorded frames can be played back.
+        """
+
+        Run = "RUN"
+        Stop = "STOP"
+
+    @tester._member_logger
+    def set_record_enable(self, state: bool):
+        self._set_parameter("RECord", "WRECord:ENABle", state)
+
+    @tester._member_logger
+    def set_record_frames(self, frames: int):
+        assert frames >= 1, "Frames must be at least 1."
+        self._set_parameter("RECord", "WRECord:FRAMes", frames)
+
+    @tester._member_logger
+    def get_record_frames_max(self) -> int:
+        return self._get_parameter("RECord", "WRECord:FMAX", 0)
+
+    @tester._member_logger
+    def set_record_interval(self, interval: float):
+        assert interval >= 0, "Interval must not be negative."
+        self._set_parameter("RECord", "WRECord:INTerval", interval)
+
+    @tester._member_logger
+    def set_record_operation(self, operation: RecordOperation):
+        self._set_parameter("RECord", "WRECord:OPERate", operation.value)
+
+    @tester._member_logger
+    def get_record_operation(self) -> RecordOperation:
+        return MSO5000.RecordOperation(self._get_parameter("RECord", "WRECord:OPERate"))
+
+    @tester._member_logger
+    def set_record_current_frame(self, frame: int):
+        assert frame >= 1, "Frame must be at least 1."
+        self._set_parameter("RECord", "WREPlay:FCURrent", frame)
+
+    @tester._member_logger
+    def record(self, frames: int, interval: float = 0, timeout: float = 60.0):
+        """
+        Record a number of triggered frames into the segmented memory and wait until done.
+
+        Each trigger fills one frame with the configured memory depth, so a periodic signal
+        triggered once per cycle yields one cycle per frame.
+
+        Args:
+            frames (int): The number of frames to record.
+            interval (float, optional): The time between frames in seconds. Defaults to 0.
+            timeout (float, optional): The maximum time to wait in seconds. Defaults to 60.
+
+        Raises:
+            TimeoutError: If the recording does not complete within the timeout.
+
+        Example:
+            >>> device.record(16, timeout=60)
+            >>> frames = device.get_record_frames([MSO5000.Source.Channel2])
+        """
+        with self.batch():
+            self.set_record_enable(True)
+            self.set_record_frames(frames)
+            self.set_record_interval(interval)
+            self.set_record_operation(MSO5000.RecordOperation.Run)
+        self.__poll(
+            lambda: self.get_record_operation() == MSO5000.RecordOperation.Stop,
+            timeout,
+            "the recording",
+        )
+
+    def get_record_frames(
+        self,
+        sources: list,
+        frames=None,
+        format_: "MSO5000.WaveformFormat" = None,
+        start: int = 1,
+        stop: int = None,
+    ) -> dict:
+        """
+        Read recorded frames into one array per source, one row per frame.
+
+        The MSO5000 plays back one frame at a time, so every frame is selected and read with
+        the fewest commands, directly into a preallocated array; the preamble is read once
+        per source since all frames share it.
 
-    # The :QUICk command is used to set and query the relevant parameters for shortcut keys.
+        Args:
+            sources (list): The sources to read.
+            frames (iterable, optional): The 1-based frames to read, in order. Defaults to all recorded frames.
+            format_ (WaveformFormat, optional): The transfer format. Defaults to WaveformFormat.Byte.
+            start (int, optional): The first point of each frame (1-based). Defaults to 1.
+            stop (int, optional): The last point of each frame (inclusive). Defaults to the whole frame.
 
-    # The :RECOrd commands are used to set the relevant parameters of the record function.
+        Returns:
+            dict: The MSO5000.Waveform of each source, with the frames as rows of its data.
+        """
+        if format_ is None:
+            format_ = MSO5000.WaveformFormat.Byte
+        if frames is None:
+            frames = range(1, int(self._get_parameter("RECord", "WRECord:FRAMes", 1)) + 1)
+        frames = list(frames)
+        assert frames, "At least one frame must be read."
+        _mode = MSO5000.WaveformMode.Raw
+        _waveforms = {}
+        self.set_waveform_mode(_mode)
+        self.set_waveform_format(format_)
+        for _source in sources:
+            self.set_waveform_source(_source)
+            _preamble = self.get_waveform_preamble()
+            _stop = _preamble.points if stop is None else stop
+            _points = _stop - start + 1
+            _data = None
+            for _row, _frame in enumerate(frames):
+                self.set_record_current_frame(_frame)
+                _frame_data = self._assemble_waveform(
+                    self._transfer_waveform(_source, format_, _mode, start, _stop), format_, _points
+                )
+                if _data is None:
+                    _data = np.empty((len(frames), _points), dtype=_frame_data.dtype)
+                _data[_row] = _frame_data
+            _waveforms[_source] = MSO5000.Waveform(_source, _preamble, _data, start)
+        return _waveforms
 
     # The :REFerence commands are used to set relevant parameters for reference waveforms.
 
@@ -818,7 +2411,7 @@ class MSO5000(Device):
 
     @tester._member_logger
     def save_image_invert(self, invert: bool):
-        self.__set_parameter("SAVE", "IMAGe:INVert", invert)
+        self._set_parameter("SAVE", "IMAGe:INVert", invert)
 
     @tester._member_logger
     def save_image_color(self, color: ImageColor):
@@ -852,6 +2445,7 @@ class MSO5000(Device):
     @tester._member_logger
     def load_setup(self, filename: str):
         self.__write(f":LOAD:SETup {filename}")
+        self._invalidate_cache()
 
     # The :SEARch commands are used to set the relevant parameters of the search function.
 
@@ -1119,6 +2713,35 @@ class MSO5000(Device):
     # Function Generator Function: LORentz
     # Function Generator Function: HAVersine
     # Function Generator Function: ARBitrary
+    @tester._member_logger
+    def function_generator_arbitrary(
+        self,
+        channel: int,
+        values,
+        frequency: float = 1000,
+        amplitude: float = 0.5,
+        offset: float = 0,
+        output_impedance: SourceOutputImpedance = SourceOutputImpedance.Omeg,
+    ):
+        """
+        Output an arbitrary waveform, one period of which is given by its normalized points.
+
+        Args:
+            channel (int): The generator, 1 or 2.
+            values (array-like): The points of one period, between -1 and 1.
+            frequency (float, optional): The frequency of the period in hertz. Defaults to 1000.
+            amplitude (float, optional): The peak-to-peak amplitude of -1 to 1 in volts. Defaults to 0.5.
+            offset (float, optional): The voltage of 0. Defaults to 0.
+            output_impedance (SourceOutputImpedance, optional): The output impedance. Defaults to Omeg.
+        """
+        self.function_generator_state(channel, False)
+        self.set_source_function(channel, MSO5000.SourceFunction.Arbitrary)
+        self.set_trace_data(channel, values)
+        self.set_source_frequency(channel, frequency)
+        self.set_source_amplitude(channel, amplitude)
+        self.set_source_offset(channel, offset)
+        self.set_source_output_impedance(channel, output_impedance)
+
     # Function Generator Type: None
     @tester._member_logger
     def function_generator_no_modulation(self, channel: int):
@@ -1317,7 +2940,7 @@ class MSO5000(Device):
 
     @tester._member_logger
     def set_timebase_delay_enable(self, enable: bool):
-        self.__set_parameter("TIMebase", "DELay:ENABle", enable)
+        self._set_parameter("TIMebase", "DELay:ENABle", enable)
 
     @tester._member_logger
     def set_timebase_delay_offset(self, offset: float):
@@ -1389,6 +3012,38 @@ class MSO5000(Device):
     # sources. <n> can be 1 or 2 which denotes the corresponding built in signal source channel. If <n>
     # or :TRACe[<n>] is omitted, the operation will be applied to source 1 by default.
 
+    # The largest number of points of an arbitrary waveform.
+    _trace_points_max = 16384
+
+    @tester._member_logger
+    def set_trace_interpolate(self, channel: int, state: bool):
+        assert channel >= 1 and channel <= 2, "Channel must be between 1 and 2."
+        self._set_parameter(f"TRACe{channel}", "DATA:POINts:INTerpolate", "LIN" if state else "OFF")
+
+    @tester._member_logger
+    def set_trace_data(self, channel: int, values):
+        """
+        Load the points of the arbitrary waveform of a built-in generator.
+
+        The points are linearly interpolated to the output rate, so a few dozen points per
+        feature are enough for slow waveforms.
+
+        Args:
+            channel (int): The generator, 1 or 2.
+            values (array-like): The points of one period, between -1 and 1.
+
+        Raises:
+            AssertionError: If there are too few or too many points, or a point is out of range.
+        """
+        assert channel >= 1 and channel <= 2, "Channel must be between 1 and 2."
+        _values = np.asarray(values, dtype=np.float64)
+        assert (
+            _values.ndim == 1 and 2 <= _values.size <= self._trace_points_max
+        ), f"Trace must have between 2 and {self._trace_points_max} points."
+        assert np.all(np.abs(_values) <= 1), "Trace values must be between -1 and 1."
+        self.set_trace_interpolate(channel, True)
+        self.__write(f":TRACe{channel}:DATA {','.join(f'{_value:.4f}' for _value in _values)}")
+
     # The :TRIGger commands are used to set the trigger system of the oscilloscope.
     class TriggerMode(StrEnum):
         Edge = "EDGE"
@@ -2168,6 +3823,127 @@ class MSO5000(Device):
         Byte = "BYTE"
         Ascii = "ASC"
 
+    class WaveformPreamble(NamedTuple):
+        """
+        Parsed :WAVeform:PREamble? response describing how to scale the waveform points.
+
+        Attributes:
+            format_ (WaveformFormat): The format the points are transferred in.
+            mode (WaveformMode): The waveform reading mode.
+            points (int): The number of waveform points.
+            count (int): The number of averages in average acquisition mode, 1 otherwise.
+            xincrement (float): The time between two neighbouring points.
+            xorigin (float): The time of the first point relative to the trigger.
+            xreference (float): The reference point index on the time axis.
+            yincrement (float): The voltage between two neighbouring ADC codes.
+            yorigin (float): The vertical offset relative to the reference code.
+            yreference (float): The ADC code of the vertical reference position.
+        """
+
+        format_: "MSO5000.WaveformFormat"
+        mode: "MSO5000.WaveformMode"
+        points: int
+        count: int
+        xincrement: float
+        xorigin: float
+        xreference: float
+        yincrement: float
+        yorigin: float
+        yreference: float
+
+        @classmethod
+        def parse(cls, response: str) -> "MSO5000.WaveformPreamble":
+            """
+            Parse the comma separated :WAVeform:PREamble? response.
+
+            Args:
+                response (str): The preamble response string.
+
+            Returns:
+                MSO5000.WaveformPreamble: The parsed preamble.
+
+            Raises:
+                AssertionError: If the response does not contain the ten preamble fields.
+            """
+            _fields = response.strip().split(",")
+            assert len(_fields) == 10, "Preamble must contain 10 fields."
+            return cls(
+                (
+                    MSO5000.WaveformFormat.Byte,
+                    MSO5000.WaveformFormat.Word,
+                    MSO5000.WaveformFormat.Ascii,
+                )[int(_fields[0])],
+                (
+                    MSO5000.WaveformMode.Normal,
+                    MSO5000.WaveformMode.Maximum,
+                    MSO5000.WaveformMode.Raw,
+                )[int(_fields[1])],
+                int(_fields[2]),
+                int(_fields[3]),
+                *(float(_field) for _field in _fields[4:]),
+            )
+
+    class Waveform:
+        """
+        Waveform points of one source together with the preamble used to scale them.
+
+        Attributes:
+            source (Source): The source the waveform was read from.
+            preamble (WaveformPreamble): The preamble of the acquisition.
+            data (np.ndarray): The points as transferred (ADC codes for Byte and Word); for
+                recorded frames, one row per frame.
+            start (int): The 1-based index of the first point in the waveform memory.
+        """
+
+        def __init__(self, source, preamble, data: np.ndarray, start: int = 1):
+            """
+            Initialize the waveform.
+
+            Args:
+                source (Source): The source the waveform was read from.
+                preamble (WaveformPreamble): The preamble of the acquisition.
+                data (np.ndarray): The transferred points.
+                start (int, optional): The 1-based index of the first point. Defaults to 1.
+            """
+            self.source = source
+            self.preamble = preamble
+            self.data = data
+            self.start = start
+
+        def __len__(self) -> int:
+            return self.data.shape[-1]
+
+        @cached_property
+        def volts(self) -> np.ndarray:
+            """
+            The points converted to channel units using the preamble.
+
+            Returns:
+                np.ndarray: The scaled points as float64.
+            """
+            _preamble = self.preamble
+            if _preamble.format_ == MSO5000.WaveformFormat.Ascii:
+                return self.data.astype(np.float64, copy=False)
+            _volts = self.data.astype(np.float64)
+            _volts -= _preamble.yorigin + _preamble.yreference
+            _volts *= _preamble.yincrement
+            return _volts
+
+        @cached_property
+        def time(self) -> np.ndarray:
+            """
+            The time axis of the points, computed on first access.
+
+            Returns:
+                np.ndarray: The time of each point in seconds relative to the trigger.
+            """
+            _preamble = self.preamble
+            _index = np.arange(self.start - 1, self.start - 1 + self.data.shape[-1], dtype=np.float64)
+            _index -= _preamble.xreference
+            _index *= _preamble.xincrement
+            _index += _preamble.xorigin
+            return _index
+
     @tester._member_logger
     def set_waveform_source(self, source: Source):
         """
@@ -2235,6 +4011,100 @@ class MSO5000(Device):
         assert points >= 1, "Waveform points must be greater than 1."
         self._set_parameter("WAVeform", "POINts", points)
 
+    # The largest number of points a single :WAVeform:DATA? read returns for each format; in
+    # NORMal mode the reads are further limited to the 1000 points displayed on screen.
+    __waveform_window = {
+        WaveformFormat.Byte: 250000,
+        WaveformFormat.Word: 125000,
+        WaveformFormat.Ascii: 15625,
+    }
+    __waveform_screen_points = 1000
+
+    # The approximate number of bytes each point occupies in a :WAVeform:DATA? block.
+    __waveform_point_size = {
+        WaveformFormat.Byte: 1,
+        WaveformFormat.Word: 2,
+        WaveformFormat.Ascii: 16,
+    }
+
+    def __get_waveform_window(self, mode: WaveformMode, format_: WaveformFormat) -> int:
+        """
+        Get the largest number of points that can be read in one transfer.
+
+        Args:
+            mode (WaveformMode): The waveform reading mode.
+            format_ (WaveformFormat): The waveform data format.
+
+        Returns:
+            int: The maximum number of points per :WAVeform:DATA? read.
+        """
+        _window = self.__waveform_window[format_]
+        if mode == MSO5000.WaveformMode.Normal:
+            _window = min(_window, self.__waveform_screen_points)
+        return _window
+
+    def __query_block(self, message: str, payload: int = 0) -> memoryview:
+        """
+        Send a SCPI query and read its IEEE 488.2 definite length block response.
+
+        The query and the read are one exchange, so a failed read is retried by clearing the
+        instrument and sending the query again rather than by resuming the block.
+
+        Args:
+            message (str): The SCPI query, e.g. ":WAVeform:DATA?".
+            payload (int): The expected size of the block in bytes, used to size the I/O timeout.
+
+        Returns:
+            memoryview: The block payload without the header and terminator.
+
+        Raises:
+            AssertionError: If the response is not a well formed definite length block.
+            ConnectionError: If no response is received under the I/O policy.
+        """
+        if self.__batch:
+            self.__flush_batch()
+        self.logger.debug('sending request "%s"...', message)
+
+        def _query():
+            self.__instrument.write(message)
+            return self.__instrument._read_raw()
+
+        _response = self.__exchange(
+            _query, f'query "{message}"', payload, self._command_header(message), len(message)
+        )
+        assert _response[0] == 35, "Data must start with the '#' character."
+        assert _response[-1] == 10, "Data must end with the '\n' character."
+        _header_length = _response[1] - 48
+        assert 1 <= _header_length <= 9, "Data must have a definite length header."
+        _data_length = int(_response[2 : 2 + _header_length])
+        _offset = 2 + _header_length
+        return memoryview(_response)[_offset : _offset + _data_length]
+
+    @staticmethod
+    def _decode_waveform_block(block, format_: WaveformFormat) -> np.ndarray:
+        """
+        Decode the payload of a :WAVeform:DATA? block into a NumPy array.
+
+        BYTE and WORD data are returned as the raw unsigned ADC codes; WORD points are two
+        bytes each, least significant byte first. ASCII data is returned as floating-point
+        values in the channel units.
+
+        Args:
+            block (bytes-like): The block payload.
+            format_ (WaveformFormat): The format the block was transferred in.
+
+        Returns:
+            np.ndarray: The decoded waveform points.
+        """
+        if format_ == MSO5000.WaveformFormat.Byte:
+            return np.frombuffer(block, dtype=np.uint8)
+        if format_ == MSO5000.WaveformFormat.Word:
+            return np.frombuffer(block, dtype="<u2", count=len(block) // 2)
+        _text = bytes(block).decode("ascii").strip().rstrip(",")
+        if not _text:
+            return np.empty(0, dtype=np.float64)
+        return np.array(_text.split(","), dtype=np.float64)
+
     @tester._member_logger
     def get_waveform(
         self,
@@ -2243,52 +4113,326 @@ class MSO5000(Device):
         mode: WaveformMode = WaveformMode.Normal,
         start: int = 1,
         stop: int = 1000,
-    ):
+    ) -> np.ndarray:
         """
         Reads waveform data from the oscilloscope for a specified channel and range.
 
+        The range is transferred in the largest windows the selected mode and format allow,
+        and each block is decoded directly into a NumPy array.
+
         Parameters:
             source (Source, optional): The waveform source channel. Defaults to Source.Channel1.
             format_ (WaveformFormat, optional): The format of the waveform data (Byte, Word, or Ascii). Defaults to WaveformFormat.Byte.
             mode (WaveformMode, optional): The acquisition mode for the waveform. Defaults to WaveformMode.Normal.
             start (int, optional): The starting data point (1-based index). Must be >= 1. Defaults to 1.
-            stop (int, optional): The ending data point (exclusive). Must be greater than start. Defaults to 1000.
+            stop (int, optional): The ending data point (inclusive). Must be greater than start. Defaults to 1000.
 
         Returns:
-            list: The acquired waveform data as a list of values, with type depending on the selected format.
+            np.ndarray: The acquired waveform data; unsigned ADC codes for Byte and Word, values for Ascii.
+
+        Raises:
+            AssertionError: If start < 1, stop <= start, or if the oscilloscope response is malformed.
+        """
+        _blocks = self.__iter_waveform_blocks(source, format_, mode, start, stop)
+        return self._assemble_waveform(_blocks, format_, stop - start + 1)
+
+    def __iter_waveform_blocks(
+        self,
+        source: Source,
+        format_: WaveformFormat,
+        mode: WaveformMode,
+        start: int,
+        stop: int,
+        chunk_points: int = None,
+    ):
+        """
+        Transfer the :WAVeform:DATA? blocks covering a range one at a time.
+
+        Args:
+            source (Source): The waveform source channel.
+            format_ (WaveformFormat): The format of the waveform data.
+            mode (WaveformMode): The waveform reading mode.
+            start (int): The starting data point (1-based index).
+            stop (int): The ending data point (inclusive).
+            chunk_points (int, optional): The number of points per block, limited to the
+                largest read the mode and format allow. Defaults to that limit.
+
+        Yields:
+            memoryview: The payload of each block, in order.
 
         Raises:
             AssertionError: If start < 1, stop <= start, or if the oscilloscope response is malformed.
+            tester.OperationCancelled: If cancellation was requested between two blocks.
         """
         assert start >= 1, "Waveform start must be greater than 1."
         assert stop > start, "Waveform stop must be greater than start."
         self.set_waveform_source(source)
         self.set_waveform_mode(mode)
         self.set_waveform_format(format_)
-        _data = [0] * (stop - start + 1)
-        for _start in range(0, stop - start, 100):
-            self.set_waveform_start(start + _start)
-            self.set_waveform_stop(min(start + _start + 99, stop))
-            self.__write(":WAVeform:DATA?")
-            _response = self.__instrument._read_raw()
-            assert _response[0] == 35, "Data must start with the '#' character."
-            assert _response[-1] == 10, "Data must end with the '\n' character."
-            _header_length = int(chr(_response[1]))
-            _data_length = int("".join([chr(x) for x in _response[2 : 2 + _header_length]]))
-            _response = _response[2 + _header_length : 2 + _header_length + _data_length]
-            if format_ == MSO5000.WaveformFormat.Ascii:
-                _points = "".join([chr(x) for x in _response]).split(",")
-                for _index in range(len(_points) - 1):
-                    _data[_start + _index] = float(_points[_index])
-            elif format_ == MSO5000.WaveformFormat.Word:
-                for _index in range(len(_response)/2):
-                    _byte1 = _response[_index * 2]
-                    _byte2 = _response[_index * 2 + 1]
-                    _data[_start + _index] = (_byte1 << 8) + _byte2
-            else:
-                for _index in range(len(_response)):
-                    _data[_start + _index] = _response[_index]
-        return _data
+        _window = self.__get_waveform_window(mode, format_)
+        if chunk_points is not None:
+            assert chunk_points >= 1, "Chunk points must be at least 1."
+            _window = min(_window, chunk_points)
+        _point_size = self.__waveform_point_size[format_]
+        for _start in range(start, stop + 1, _window):
+            self.__check_cancel()
+            _stop = min(_start + _window - 1, stop)
+            self.set_waveform_start(_start)
+            self.set_waveform_stop(_stop)
+            yield self.__query_block(":WAVeform:DATA?", (_stop - _start + 1) * _point_size)
+
+    def _transfer_waveform(
+        self,
+        source: Source,
+        format_: WaveformFormat,
+        mode: WaveformMode,
+        start: int,
+        stop: int,
+    ) -> list:
+        """
+        Transfer the raw :WAVeform:DATA? blocks covering a range without decoding them.
+
+        Args:
+            source (Source): The waveform source channel.
+            format_ (WaveformFormat): The format of the waveform data.
+            mode (WaveformMode): The waveform reading mode.
+            start (int): The starting data point (1-based index).
+            stop (int): The ending data point (inclusive).
+
+        Returns:
+            list: The block payloads in order.
+
+        Raises:
+            AssertionError: If start < 1, stop <= start, or if the oscilloscope response is malformed.
+        """
+        return list(self.__iter_waveform_blocks(source, format_, mode, start, stop))
+
+    @staticmethod
+    def _assemble_waveform(blocks: list, format_: WaveformFormat, points: int) -> np.ndarray:
+        """
+        Decode transferred blocks into one contiguous array.
+
+        Args:
+            blocks (iterable): The block payloads in order; each block is decoded as it is
+                produced, so a generator keeps only one raw block in memory.
+            format_ (WaveformFormat): The format the blocks were transferred in.
+            points (int): The number of points requested.
+
+        Returns:
+            np.ndarray: The decoded points, truncated to the number actually received.
+        """
+        _data = np.empty(points, dtype=MSO5000._waveform_dtype(format_))
+        _count = 0
+        for _block in blocks:
+            _points = MSO5000._decode_waveform_block(_block, format_)
+            _points = _points[: points - _count]
+            _data[_count : _count + _points.size] = _points
+            _count += _points.size
+        return _data[:_count]
+
+    @staticmethod
+    def _waveform_dtype(format_: WaveformFormat) -> np.dtype:
+        """
+        Get the NumPy type the points of a waveform format are decoded into.
+
+        Args:
+            format_ (WaveformFormat): The waveform data format.
+
+        Returns:
+            np.dtype: uint8 for Byte, uint16 for Word and float64 for Ascii.
+        """
+        return np.dtype(
+            {
+                MSO5000.WaveformFormat.Byte: np.uint8,
+                MSO5000.WaveformFormat.Word: np.uint16,
+            }.get(format_, np.float64)
+        )
+
+    def iter_waveform(
+        self,
+        source: Source = Source.Channel1,
+        chunk_points: int = None,
+        format_: WaveformFormat = WaveformFormat.Byte,
+        mode: WaveformMode = WaveformMode.Raw,
+        start: int = 1,
+        stop: int = None,
+    ):
+        """
+        Read waveform data in chunks, yielding each chunk as soon as it arrives.
+
+        Only one chunk is held at a time, so the memory used does not depend on the memory
+        depth. Other commands must not be sent to the instrument until the iteration ends.
+
+        Args:
+            source (Source, optional): The waveform source channel. Defaults to Source.Channel1.
+            chunk_points (int, optional): The number of points per chunk, limited to the largest
+                read the mode and format allow. Defaults to that limit.
+            format_ (WaveformFormat, optional): The format of the waveform data. Defaults to WaveformFormat.Byte.
+            mode (WaveformMode, optional): The waveform reading mode. Defaults to WaveformMode.Raw.
+            start (int, optional): The starting data point (1-based index). Defaults to 1.
+            stop (int, optional): The ending data point (inclusive). Defaults to the last point.
+
+        Yields:
+            np.ndarray: The decoded points of each chunk; read-only for Byte and Word.
+
+        Example:
+            >>> peak = max(int(chunk.max()) for chunk in device.iter_waveform(MSO5000.Source.Channel3))
+        """
+        if stop is None:
+            stop = self.__get_waveform_points(source, format_, mode)
+        for _block in self.__iter_waveform_blocks(source, format_, mode, start, stop, chunk_points):
+            yield self._decode_waveform_block(_block, format_)
+
+    @tester._member_logger
+    def save_waveform_npy(
+        self,
+        path,
+        source: Source = Source.Channel1,
+        chunk_points: int = None,
+        format_: WaveformFormat = WaveformFormat.Byte,
+        mode: WaveformMode = WaveformMode.Raw,
+        start: int = 1,
+        stop: int = None,
+    ) -> Waveform:
+        """
+        Stream waveform data straight into a memory-mapped .npy file.
+
+        The points are written chunk by chunk as they arrive, so deep captures can be saved
+        without holding them in memory. The returned waveform maps the file read-only;
+        its volts are computed in memory, so scale slices of its data for deep captures.
+
+        Args:
+            path (str or Path): The .npy file to create, e.g. in the test's data directory.
+            source (Source, optional): The waveform source channel. Defaults to Source.Channel1.
+            chunk_points (int, optional): The number of points per chunk. Defaults to the largest read possible.
+            format_ (WaveformFormat, optional): The format of the waveform data. Defaults to WaveformFormat.Byte.
+            mode (WaveformMode, optional): The waveform reading mode. Defaults to WaveformMode.Raw.
+            start (int, optional): The starting data point (1-based index). Defaults to 1.
+            stop (int, optional): The ending data point (inclusive). Defaults to the last point.
+
+        Returns:
+            MSO5000.Waveform: The waveform backed by the memory-mapped file.
+
+        Raises:
+            AssertionError: If the instrument returns fewer points than requested.
+
+        Example:
+            >>> device.save_waveform_npy(test.dataDirectory / "current.npy", MSO5000.Source.Channel3)
+        """
+        if stop is None:
+            stop = self.__get_waveform_points(source, format_, mode)
+        _points = stop - start + 1
+        _file = np.lib.format.open_memmap(
+            path, mode="w+", dtype=self._waveform_dtype(format_), shape=(_points,)
+        )
+        _count = 0
+        try:
+            for _chunk in self.iter_waveform(source, chunk_points, format_, mode, start, stop):
+                _chunk = _chunk[: _points - _count]
+                _file[_count : _count + _chunk.size] = _chunk
+                _count += _chunk.size
+            _file.flush()
+        finally:
+            del _file
+        assert _count == _points, f"Waveform transfer ended after {_count} of {_points} points."
+        return MSO5000.Waveform(
+            source, self.get_waveform_preamble(), np.load(path, mmap_mode="r"), start
+        )
+
+    def __get_waveform_points(self, source: Source, format_: WaveformFormat, mode: WaveformMode) -> int:
+        """
+        Get the number of points a source holds in a reading mode.
+
+        Args:
+            source (Source): The waveform source channel.
+            format_ (WaveformFormat): The format of the waveform data.
+            mode (WaveformMode): The waveform reading mode.
+
+        Returns:
+            int: The number of points reported by the preamble.
+        """
+        self.set_waveform_source(source)
+        self.set_waveform_mode(mode)
+        self.set_waveform_format(format_)
+        return self.get_waveform_preamble().points
+
+    @tester._member_logger
+    def get_waveform_scaled(
+        self,
+        source: Source = Source.Channel1,
+        format_: WaveformFormat = WaveformFormat.Byte,
+        mode: WaveformMode = WaveformMode.Normal,
+        start: int = 1,
+        stop: int = 1000,
+    ) -> Waveform:
+        """
+        Reads waveform data together with its preamble so it can be scaled to channel units.
+
+        Parameters:
+            source (Source, optional): The waveform source channel. Defaults to Source.Channel1.
+            format_ (WaveformFormat, optional): The format of the waveform data. Defaults to WaveformFormat.Byte.
+            mode (WaveformMode, optional): The acquisition mode for the waveform. Defaults to WaveformMode.Normal.
+            start (int, optional): The starting data point (1-based index). Defaults to 1.
+            stop (int, optional): The ending data point (inclusive). Defaults to 1000.
+
+        Returns:
+            MSO5000.Waveform: The waveform with lazily computed volts and time axis.
+        """
+        _data = self.get_waveform(source, format_, mode, start, stop)
+        return MSO5000.Waveform(source, self.get_waveform_preamble(), _data, start)
+
+    @tester._member_logger
+    def get_waveforms(
+        self,
+        sources: list,
+        format_: WaveformFormat = WaveformFormat.Byte,
+        mode: WaveformMode = WaveformMode.Raw,
+        start: int = 1,
+        stop: int = None,
+    ) -> dict:
+        """
+        Read several sources from the same acquisition, aligned point for point.
+
+        The acquisition is stopped once, if it is still running, and every source is then
+        read back to back with the same mode, format and range, so all waveforms come from
+        the same trigger. The acquisition is left stopped.
+
+        Args:
+            sources (list): The sources to read.
+            format_ (WaveformFormat, optional): The format of the waveform data. Defaults to WaveformFormat.Byte.
+            mode (WaveformMode, optional): The waveform reading mode. Defaults to WaveformMode.Raw.
+            start (int, optional): The starting data point (1-based index). Defaults to 1.
+            stop (int, optional): The ending data point (inclusive). Defaults to the last point
+                all sources hold.
+
+        Returns:
+            dict: The MSO5000.Waveform of each source, all with the same start and length.
+
+        Example:
+            >>> waveforms = device.get_waveforms([MSO5000.Source.Channel2, MSO5000.Source.Channel3])
+            >>> positions = waveforms[MSO5000.Source.Channel2].volts
+        """
+        assert sources, "At least one source must be read."
+        if self.__query(":TRIGger:STATus?") != MSO5000.TriggerStatus.Stop:
+            self.stop()
+        self.set_waveform_mode(mode)
+        self.set_waveform_format(format_)
+        _preambles = {}
+        _data = {}
+        for _source in sources:
+            self.set_waveform_source(_source)
+            _preambles[_source] = _preamble = self.get_waveform_preamble()
+            _stop = _preamble.points if stop is None else stop
+            _data[_source] = self._assemble_waveform(
+                self.__iter_waveform_blocks(_source, format_, mode, start, _stop),
+                format_,
+                _stop - start + 1,
+            )
+        _points = min(_points.size for _points in _data.values())
+        return {
+            _source: MSO5000.Waveform(_source, _preambles[_source], _data[_source][:_points], start)
+            for _source in sources
+        }
 
     @tester._member_logger
     def get_waveform_xincrement(self) -> float:
@@ -2379,11 +4523,172 @@ class MSO5000(Device):
         self._set_parameter("WAVeform", "STOP", stop)
 
     @tester._member_logger
-    def get_waveform_preamble(self) -> str:
+    def get_waveform_preamble(self) -> WaveformPreamble:
         """
         Retrieves the waveform preamble from the device.
 
+        The preamble is queried once per acquisition for each source, mode and format and
+        reused until a command other than a :WAVeform command is sent.
+
+        Returns:
+            MSO5000.WaveformPreamble: The parsed preamble of the current waveform source.
+        """
+        _key = (
+            self._get_parameter("WAVeform", "SOURce"),
+            self._get_parameter("WAVeform", "MODE"),
+            self._get_parameter("WAVeform", "FORMat"),
+        )
+        _preamble = self.__preambles.get(_key)
+        if _preamble is None:
+            _preamble = MSO5000.WaveformPreamble.parse(
+                self.__query(":WAVeform:PREamble?")
+            )
+            self.__preambles[_key] = _preamble
+        return _preamble
+
+
+class AsyncMSO5000:
+    """
+    asyncio front end for an MSO5000 device.
+
+    All instrument I/O runs on one dedicated worker thread, since a VISA session must not
+    be used from several threads at once, while waveform decoding runs on the event loop's
+    default executor. Awaiting several waveform reads together therefore decodes one source
+    while the next one is still being transferred, and the event loop stays responsive
+    during long reads. The wrapped device should not be used synchronously while
+    asynchronous calls are pending.
+
+    Example:
+        >>> async with AsyncMSO5000(devices.MSO5000) as mso:
+        ...     positions, currents = await asyncio.gather(
+        ...         mso.get_waveform_scaled(MSO5000.Source.Channel2),
+        ...         mso.get_waveform_scaled(MSO5000.Source.Channel3),
+        ...     )
+    """
+
+    def __init__(self, device: MSO5000, executor: ThreadPoolExecutor = None):
+        """
+        Initialize the asynchronous front end.
+
+        Args:
+            device (MSO5000): The connected device to drive.
+            executor (ThreadPoolExecutor, optional): The I/O executor; a single-thread
+                executor owned by this instance is created if omitted.
+        """
+        self.device = device
+        self.__owns_executor = executor is None
+        self.__executor = executor or ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix=f"{device.Name}-io"
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """
+        Shut down the I/O executor if this instance created it, waiting for pending I/O.
+        """
+        if self.__owns_executor:
+            self.__executor.shutdown(wait=True)
+
+    async def call(self, name: str, *args, **kwargs):
+        """
+        Run any driver method on the I/O thread.
+
+        Args:
+            name (str): The name of the MSO5000 method, e.g. "channel_settings".
+            *args: Positional arguments for the method.
+            **kwargs: Keyword arguments for the method.
+
+        Returns:
+            Any: The return value of the method.
+        """
+        _loop = asyncio.get_running_loop()
+        _function = partial(getattr(self.device, name), *args, **kwargs)
+        return await _loop.run_in_executor(self.__executor, _function)
+
+    async def query(self, message: str) -> str:
+        """
+        Send a SCPI query on the I/O thread.
+
+        Args:
+            message (str): The SCPI query.
+
+        Returns:
+            str: The response string.
+        """
+        return await self.call("query", message)
+
+    async def write(self, message: str):
+        """
+        Send a SCPI command on the I/O thread.
+
+        Args:
+            message (str): The SCPI command.
+        """
+        await self.call("write", message)
+
+    async def get_waveform(
+        self,
+        source: MSO5000.Source = MSO5000.Source.Channel1,
+        format_: MSO5000.WaveformFormat = MSO5000.WaveformFormat.Byte,
+        mode: MSO5000.WaveformMode = MSO5000.WaveformMode.Normal,
+        start: int = 1,
+        stop: int = 1000,
+    ) -> np.ndarray:
+        """
+        Transfer waveform data on the I/O thread and decode it off the I/O thread.
+
+        Args:
+            source (MSO5000.Source, optional): The waveform source channel. Defaults to Channel1.
+            format_ (MSO5000.WaveformFormat, optional): The waveform data format. Defaults to Byte.
+            mode (MSO5000.WaveformMode, optional): The waveform reading mode. Defaults to Normal.
+            start (int, optional): The starting data point (1-based index). Defaults to 1.
+            stop (int, optional): The ending data point (inclusive). Defaults to 1000.
+
+        Returns:
+            np.ndarray: The decoded waveform points.
+        """
+        _blocks = await self.call("_transfer_waveform", source, format_, mode, start, stop)
+        return await asyncio.get_running_loop().run_in_executor(
+            None, MSO5000._assemble_waveform, _blocks, format_, stop - start + 1
+        )
+
+    async def get_waveform_scaled(
+        self,
+        source: MSO5000.Source = MSO5000.Source.Channel1,
+        format_: MSO5000.WaveformFormat = MSO5000.WaveformFormat.Byte,
+        mode: MSO5000.WaveformMode = MSO5000.WaveformMode.Normal,
+        start: int = 1,
+        stop: int = 1000,
+    ) -> MSO5000.Waveform:
+        """
+        Read waveform data and its preamble, scaling to channel units off the I/O thread.
+
+        Args:
+            source (MSO5000.Source, optional): The waveform source channel. Defaults to Channel1.
+            format_ (MSO5000.WaveformFormat, optional): The waveform data format. Defaults to Byte.
+            mode (MSO5000.WaveformMode, optional): The waveform reading mode. Defaults to Normal.
+            start (int, optional): The starting data point (1-based index). Defaults to 1.
+            stop (int, optional): The ending data point (inclusive). Defaults to 1000.
+
         Returns:
-            str: The waveform preamble as a string, typically containing information about the waveform format, such as scaling, offset, and other acquisition parameters.
+            MSO5000.Waveform: The waveform with its volts already computed.
         """
-        return self._get_parameter("WAVeform", "PREamble")
+
+        def _transfer():
+            _blocks = self.device._transfer_waveform(source, format_, mode, start, stop)
+            return _blocks, self.device.get_waveform_preamble()
+
+        def _decode(blocks, preamble):
+            _data = MSO5000._assemble_waveform(blocks, format_, stop - start + 1)
+            _waveform = MSO5000.Waveform(source, preamble, _data, start)
+            _waveform.volts  # scale here rather than on first access by the caller
+            return _waveform
+
+        _loop = asyncio.get_running_loop()
+        _blocks, _preamble = await _loop.run_in_executor(self.__executor, _transfer)
+        return await _loop.run_in_executor(None, _decode, _blocks, _preamble)
@@ -0,0 +1,558 @@
+# -*- coding: utf-8 -*-
+import re
+import time
+
+import numpy as np
+
+
+class SimulatedMSO5000:
+    """
+    In-process stand-in for the PyVISA resource of a RIGOL MSO5000 oscilloscope.
+
+    Answers the SCPI commands issued by the MSO5000 driver, including IEEE 488.2 definite
+    length blocks for :WAVeform:DATA?, so the driver, the tests and the test sequence can run
+    without hardware. Settings are stored by the short form of their header and echoed back
+    on query. Waveforms are synthesized from the function generator settings as if the
+    oscilloscope were wired to a galvanometer scanner:
+
+    - CHAN1: the output of generator 1, driving the scanner.
+    - CHAN2: the position signal, following the drive offset by the torque center.
+    - CHAN3: the drive current, the sum of the inertial, friction and spring torques.
+    - CHAN4: the output of generator 2.
+
+    Attributes:
+        model_name (str): The model reported by *IDN?.
+        timeout (int): The I/O timeout in milliseconds; accepted for compatibility and ignored.
+        latency (float): The time, in seconds, added to every write and read.
+        bandwidth (float): The transfer rate, in bytes per second, of the simulated link.
+        realtime (float): How long an acquisition takes compared to the real instrument; 0 completes it at once.
+        torque_center (float): The drive voltage at which the spring torque vanishes.
+        inertia (float): The current, in volts, per unit of position acceleration in V/s².
+        friction (float): The current, in volts, opposing the motion.
+        spring (float): The current, in volts, per volt of position away from the torque center.
+        noise (float): The standard deviation, in volts, of the noise added to every channel.
+        frame_variation (float): The relative variation of the friction between recorded frames.
+    """
+
+    model_name = "MSO5074"
+    serial_number = "SIM0000001"
+
+    # The values of the settings after *RST that the driver or the synthesis depend on, keyed by short header.
+    _defaults = {
+        "ACQ:TYPE": "NORM",
+        "ACQ:AVER": "2",
+        "ACQ:MDEP": "AUTO",
+        "TIM:MAIN:SCAL": "1e-06",
+        "TIM:MAIN:OFFS": "0",
+        "WAV:SOUR": "CHAN1",
+        "WAV:MODE": "NORM",
+        "WAV:FORM": "BYTE",
+        "WAV:STAR": "1",
+        "WAV:STOP": "1000",
+    }
+
+    # The number of points in a NORMal mode waveform, i.e. the points displayed on screen.
+    _screen_points = 1000
+
+    # The highest sample rate, in samples per second, and the memory depth used for AUTO.
+    _max_sample_rate = 4e9
+    _auto_memory_depth = 1_000_000
+
+    # The ADC codes spanning the eight vertical divisions, and the code of the center line.
+    _codes_per_division = 32
+    _reference_code = 128
+
+    _keyword = re.compile(r"([A-Za-z*]+)(\d*)")
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        bandwidth: float = 0.0,
+        realtime: float = 1.0,
+        torque_center: float = 0.1,
+        inertia: float = 2e-4,
+        friction: float = 0.2,
+        spring: float = 0.1,
+        noise: float = 0.005,
+        frame_variation: float = 0.05,
+        seed: int = 0,
+    ):
+        """
+        Initialize the simulated instrument in its reset state.
+
+        Args:
+            latency (float): The time, in seconds, added to every write and read.
+            bandwidth (float): The transfer rate in bytes per second; 0 makes transfers instantaneous.
+            realtime (float): How long an acquisition takes compared to the real instrument.
+            torque_center (float): The drive voltage at which the spring torque vanishes.
+            inertia (float): The current per unit of position acceleration.
+            friction (float): The current opposing the motion.
+            spring (float): The current per volt of position away from the torque center.
+            noise (float): The standard deviation of the channel noise in volts.
+            frame_variation (float): The relative variation of the friction between recorded frames.
+            seed (int): The seed of the noise generator, for reproducible runs.
+        """
+        self.timeout = 2000
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.realtime = realtime
+        self.torque_center = torque_center
+        self.inertia = inertia
+        self.friction = friction
+        self.spring = spring
+        self.noise = noise
+        self.frame_variation = frame_variation
+        self.__random = np.random.default_rng(seed)
+        self.__registers = {}
+        self.__traces = {}
+        self.__pending = b""
+        self.__measurements = {}
+        self.__statistics = {}
+        self.__errors = []
+        self.__reset()
+
+    def __reset(self):
+        """Return every setting to its default and stop the acquisition."""
+        self.__state = dict(self._defaults)
+        self.__status = "RUN"
+        self.__acquired = 0.0
+        self.__recorded = 0.0
+        self.__recordings = 0
+        self.__esr = 0
+
+    def __transfer(self, size: int):
+        """
+        Wait for the simulated latency and transfer time of one message.
+
+        Args:
+            size (int): The number of bytes transferred.
+        """
+        _delay = self.latency + (size / self.bandwidth if self.bandwidth else 0.0)
+        if _delay > 0:
+            time.sleep(_delay)
+
+    @classmethod
+    def _short_header(cls, header: str) -> str:
+        """
+        Reduce a SCPI header to its short form, e.g. ":CHANnel1:SCALe" to "CHAN1:SCAL".
+
+        Args:
+            header (str): The header as sent, with or without a leading colon or trailing '?'.
+
+        Returns:
+            str: The upper case short form without the leading colon and the '?'.
+        """
+        _nodes = []
+        for _node in header.strip().lstrip(":").rstrip("?").split(":"):
+            _match = cls._keyword.fullmatch(_node)
+            if _match is None:
+                _nodes.append(_node.upper())
+                continue
+            _word, _suffix = _match.groups()
+            if not _word.isupper() and not _word.islower():
+                _word = "".join(_c for _c in _word if _c.isupper() or _c == "*")
+            _nodes.append(f"{_word.upper()}{_suffix}")
+        return ":".join(_nodes)
+
+    def write(self, message: str):
+        """
+        Execute a message of one or more semicolon separated commands.
+
+        Responses to queries in the message are concatenated and held for the next read.
+
+        Args:
+            message (str): The message.
+        """
+        self.__transfer(len(message))
+        self.__measurements = {}
+        _responses = []
+        for _command in message.strip().split(";"):
+            if not _command.strip():
+                continue
+            _header, _, _arguments = _command.strip().partition(" ")
+            _response = self.__execute(self._short_header(_header), _header.endswith("?"), _arguments.strip())
+            if _response is not None:
+                _responses.append(_response)
+        if _responses:
+            if any(isinstance(_r, bytes) for _r in _responses):
+                _blocks = [_r if isinstance(_r, bytes) else f"{_r}\n".encode() for _r in _responses]
+                self.__pending = b"".join(_blocks)
+            else:
+                self.__pending = f"{';'.join(_responses)}\n".encode()
+
+    def _read_raw(self, size: int = None) -> bytes:
+        """
+        Read the response held by the last query.
+
+        Args:
+            size (int, optional): Ignored; the whole response is returned.
+
+        Returns:
+            bytes: The response, terminated by a newline.
+        """
+        _response, self.__pending = self.__pending, b""
+        self.__transfer(len(_response))
+        return _response
+
+    read_raw = _read_raw
+
+    def read(self) -> str:
+        """
+        Read the response held by the last query as text.
+
+        Returns:
+            str: The response.
+        """
+        return self._read_raw().decode()
+
+    def query(self, message: str) -> str:
+        """
+        Execute a message and read its response.
+
+        Args:
+            message (str): The message.
+
+        Returns:
+            str: The response.
+        """
+        self.write(message)
+        return self.read()
+
+    def clear(self):
+        """Discard the response held by the last query, like a device clear."""
+        self.__pending = b""
+
+    def close(self):
+        """Accepted for compatibility with a PyVISA resource."""
+
+    def __execute(self, header: str, query: bool, arguments: str):
+        """
+        Execute one command.
+
+        Args:
+            header (str): The short form of the command header.
+            query (bool): True if the command is a query.
+            arguments (str): The arguments of the command.
+
+        Returns:
+            str or bytes or None: The response of a query, None for a command.
+        """
+        if header == "*IDN":
+            return f"RIGOL TECHNOLOGIES,{self.model_name},{self.serial_number},00.01.03.00.03"
+        if header == "*OPC":
+            if query:
+                return "1"
+            self.__esr |= 1
+            return None
+        if header == "*ESR":
+            _esr, self.__esr = self.__esr, 0
+            return str(_esr)
+        if header == "*RST":
+            self.__reset()
+        elif header == "*CLS":
+            self.__esr = 0
+            self.__errors.clear()
+        elif header == "*SAV":
+            self.__registers[arguments] = dict(self.__state)
+        elif header == "*RCL":
+            self.__state = dict(self.__registers.get(arguments, self._defaults))
+        elif header in ("RUN", "AUT"):
+            self.__status = "RUN"
+        elif header == "STOP":
+            self.__status = "STOP"
+        elif header == "SING":
+            self.__status = "WAIT"
+            self.__acquired = time.monotonic() + self.realtime * self.__acquisition_time()
+        elif header == "TFOR":
+            self.__acquired = time.monotonic()
+        elif header == "TRIG:STAT":
+            if self.__status == "WAIT" and time.monotonic() >= self.__acquired:
+                self.__status = "STOP"
+            return self.__status
+        elif header == "REC:WREC:OPER":
+            if query:
+                return "RUN" if time.monotonic() < self.__recorded else "STOP"
+            if arguments.upper().startswith("RUN"):
+                _frames = self.__float("REC:WREC:FRAM", 1)
+                _interval = self.__float("REC:WREC:INT")
+                self.__recordings += 1
+                self.__recorded = time.monotonic() + self.realtime * _frames * (
+                    self.__acquisition_time() + _interval
+                )
+            else:
+                self.__recorded = 0.0
+        elif header == "SYST:ERR:NEXT" or header == "SYST:ERR":
+            return self.__errors.pop(0) if self.__errors else '0,"No error"'
+        elif header == "ACQ:SRAT":
+            return f"{self.__sample_rate():e}"
+        elif header == "WAV:PRE":
+            return ",".join(str(_field) for _field in self.__preamble())
+        elif header == "WAV:DATA":
+            return self.__waveform_block()
+        elif header == "MEAS:ITEM" and query:
+            _item, _, _source = arguments.partition(",")
+            return f"{self.__measurement(_item.upper(), _source.upper()):e}"
+        elif header.startswith("TRAC") and header.endswith(":DATA") and not query:
+            self.__traces[header[4:-5] or "1"] = np.array(arguments.split(","), dtype=np.float64)
+        elif header == "MEAS:STAT:ITEM" and query:
+            _type, _item, _source = (_argument.strip().upper() for _argument in arguments.split(",")[:3])
+            self.__measurement(_item, _source)
+            _values = np.array(self.__statistics[(_item, _source)])
+            _values = _values[_values < 9.9e37]
+            if _type.startswith("CNT"):
+                return str(_values.size)
+            if not _values.size:
+                return f"{9.9e37:e}"
+            if _type.startswith("AVER"):
+                return f"{_values.mean():e}"
+            if _type.startswith("MAX"):
+                return f"{_values.max():e}"
+            if _type.startswith("MIN"):
+                return f"{_values.min():e}"
+            if _type.startswith("DEV"):
+                return f"{_values.std():e}"
+            return f"{_values[-1]:e}"
+        elif header in ("MEAS:STAT:RES", "MEAS:CLE"):
+            self.__statistics.clear()
+        elif query:
+            return self.__state.get(header, "0")
+        elif header in ("CLE", "MEAS:ITEM") or header.endswith(":PHAS:INIT"):
+            pass
+        else:
+            self.__state[header] = arguments
+        return None
+
+    def __float(self, header: str, default: float = 0.0) -> float:
+        """
+        Get a numeric setting.
+
+        Args:
+            header (str): The short header of the setting.
+            default (float): The value if the setting is not numeric.
+
+        Returns:
+            float: The value of the setting.
+        """
+        try:
+            return float(self.__state.get(header, default))
+        except ValueError:
+            return default
+
+    def __memory_depth(self) -> int:
+        """
+        Get the number of points acquired.
+
+        Returns:
+            int: The memory depth.
+        """
+        _depth = self.__state.get("ACQ:MDEP", "AUTO").upper()
+        if _depth == "AUTO":
+            return self._auto_memory_depth
+        _scale = {"K": 1_000, "M": 1_000_000}.get(_depth[-1], 1)
+        return int(float(_depth.rstrip("KM")) * _scale)
+
+    def __sample_rate(self) -> float:
+        """
+        Get the sample rate resulting from the memory depth and the timebase.
+
+        Returns:
+            float: The sample rate in samples per second.
+        """
+        _span = 10 * self.__float("TIM:MAIN:SCAL", 1e-6)
+        return min(self._max_sample_rate, self.__memory_depth() / _span)
+
+    def __acquisition_time(self) -> float:
+        """
+        Get the time the real instrument takes for a single acquisition.
+
+        Returns:
+            float: The time in seconds.
+        """
+        _time = 10 * self.__float("TIM:MAIN:SCAL", 1e-6)
+        if self.__state.get("ACQ:TYPE", "NORM").startswith("AVER"):
+            _time *= self.__float("ACQ:AVER", 2)
+        return _time
+
+    def __preamble(self) -> tuple:
+        """
+        Get the preamble of the current waveform source, mode and format.
+
+        Returns:
+            tuple: The ten :WAVeform:PREamble? fields.
+        """
+        _format = self.__state.get("WAV:FORM", "BYTE").upper()
+        _format_index = 2 if _format.startswith("ASC") else 1 if _format.startswith("WORD") else 0
+        _mode = self.__state.get("WAV:MODE", "NORM").upper()
+        _mode_index = 2 if _mode.startswith("RAW") else 1 if _mode.startswith("MAX") else 0
+        _scale = self.__float("TIM:MAIN:SCAL", 1e-6)
+        _points = self._screen_points if _mode_index == 0 else self.__memory_depth()
+        _xincrement = 10 * _scale / _points
+        _xorigin = self.__float("TIM:MAIN:OFFS") - 5 * _scale
+        _count = int(self.__float("ACQ:AVER", 2)) if self.__state.get("ACQ:TYPE", "").startswith("AVER") else 1
+        _yincrement = self.__channel_scale(self.__state.get("WAV:SOUR", "CHAN1")) / self._codes_per_division
+        return (_format_index, _mode_index, _points, _count, _xincrement, _xorigin, 0, _yincrement, 0, self._reference_code)
+
+    def __channel_scale(self, source: str) -> float:
+        """
+        Get the vertical scale of an analog channel.
+
+        Args:
+            source (str): The channel, e.g. "CHAN2".
+
+        Returns:
+            float: The scale in volts per division.
+        """
+        return self.__float(f"{source}:SCAL", 0.1) or 0.1
+
+    def __generator(self, channel: int, t: np.ndarray) -> np.ndarray:
+        """
+        Synthesize the output of a function generator.
+
+        Args:
+            channel (int): The generator, 1 or 2.
+            t (np.ndarray): The sample times in seconds.
+
+        Returns:
+            np.ndarray: The output in volts.
+        """
+        _prefix = f"SOUR{channel}"
+        if self.__state.get(f"{_prefix}:OUTP{channel}:STAT", "0") not in ("1", "ON"):
+            return np.zeros_like(t)
+        _function = self.__state.get(f"{_prefix}:FUNC", "SIN").upper()
+        _amplitude = self.__float(f"{_prefix}:VOLT:LEV:IMM:AMPL", 0.5) / 2
+        _offset = self.__float(f"{_prefix}:VOLT:LEV:IMM:OFFS")
+        _frequency = self.__float(f"{_prefix}:FREQ", 1000)
+        _cycle = np.mod(_frequency * t + self.__float(f"{_prefix}:PHAS") / 360, 1.0)
+        if _function.startswith("SIN"):
+            _wave = np.sin(2 * np.pi * _cycle)
+        elif _function.startswith("SQU"):
+            _wave = np.where(_cycle < 0.5, 1.0, -1.0)
+        elif _function.startswith("RAMP"):
+            _symmetry = min(max(self.__float(f"{_prefix}:FUNC:RAMP:SYMM", 50) / 100, 1e-3), 1 - 1e-3)
+            _wave = np.where(_cycle < _symmetry, _cycle / _symmetry, (1 - _cycle) / (1 - _symmetry)) * 2 - 1
+        elif _function.startswith("PULS"):
+            _wave = np.where(_cycle < self.__float(f"{_prefix}:PULS:DCYC", 20) / 100, 1.0, -1.0)
+        elif _function.startswith("ARB"):
+            _trace = self.__traces.get(str(channel), np.zeros(2))
+            _wave = np.interp(_cycle * _trace.size, np.arange(_trace.size + 1), np.append(_trace, _trace[0]))
+        elif _function.startswith("NOIS"):
+            _wave = self.__random.uniform(-1, 1, t.shape)
+        else:
+            _wave = np.zeros_like(t)
+        return _offset + _amplitude * _wave
+
+    def __channel(self, source: str, t: np.ndarray) -> np.ndarray:
+        """
+        Synthesize the signal of an analog channel.
+
+        Args:
+            source (str): The channel, e.g. "CHAN2".
+            t (np.ndarray): The sample times in seconds.
+
+        Returns:
+            np.ndarray: The signal in volts, including noise.
+        """
+        if source == "CHAN1":
+            _signal = self.__generator(1, t)
+        elif source == "CHAN4":
+            _signal = self.__generator(2, t)
+        elif source == "CHAN2":
+            _signal = self.__generator(1, t) - self.torque_center
+        elif source == "CHAN3":
+            _friction = self.friction
+            if self.__state.get("REC:WREC:ENAB", "0") in ("1", "ON"):
+                _frame = int(self.__float("REC:WREP:FCUR", 1))
+                _friction *= 1 + self.frame_variation * np.random.default_rng((self.__recordings, _frame)).standard_normal()
+            _position = self.__generator(1, t)
+            if len(t) > 2:
+                _velocity = np.gradient(_position, t)
+                _acceleration = np.gradient(_velocity, t)
+            else:
+                _velocity = _acceleration = np.zeros_like(t)
+            _signal = (
+                self.inertia * _acceleration
+                + _friction * np.tanh(_velocity)
+                + self.spring * (_position - self.torque_center)
+            )
+        else:
+            _signal = np.zeros_like(t)
+        _noise = self.noise
+        if self.__state.get("ACQ:TYPE", "").startswith("AVER"):
+            _noise /= np.sqrt(self.__float("ACQ:AVER", 2))
+        return _signal + self.__random.normal(0.0, _noise, t.shape)
+
+    def __waveform_block(self) -> bytes:
+        """
+        Encode the points between :WAVeform:STARt and :WAVeform:STOP as a definite length block.
+
+        Returns:
+            bytes: The block, terminated by a newline.
+        """
+        _format, _, _points, _, _xincrement, _xorigin, _, _yincrement, _yorigin, _yreference = self.__preamble()
+        _start = max(int(self.__float("WAV:STAR", 1)), 1)
+        _stop = min(int(self.__float("WAV:STOP", _points)), _points)
+        _t = _xorigin + _xincrement * np.arange(_start - 1, _stop)
+        _volts = self.__channel(self.__state.get("WAV:SOUR", "CHAN1"), _t)
+        if _format == 2:
+            _payload = "".join(f"{_v:e}," for _v in _volts).encode()
+        else:
+            _codes = np.clip(np.rint(_volts / _yincrement + _yorigin + _yreference), 0, 255)
+            _payload = _codes.astype(np.uint8 if _format == 0 else "<u2").tobytes()
+        _length = str(len(_payload))
+        return b"#" + str(len(_length)).encode() + _length.encode() + _payload + b"\n"
+
+    def __measurement(self, item: str, source: str) -> float:
+        """
+        Measure a waveform parameter once per message and add it to the item's statistics.
+
+        Every message is treated as one acquisition, so the items of a compound query are
+        measured on the same waveform.
+
+        Args:
+            item (str): The measurement, e.g. "VRMS".
+            source (str): The channel, e.g. "CHAN2".
+
+        Returns:
+            float: The measured value.
+        """
+        _key = (item, source)
+        if _key not in self.__measurements:
+            self.__measurements[_key] = self.__measure(item, source)
+            self.__statistics.setdefault(_key, []).append(self.__measurements[_key])
+        return self.__measurements[_key]
+
+    def __measure(self, item: str, source: str) -> float:
+        """
+        Measure a waveform parameter over the points displayed on screen.
+
+        Args:
+            item (str): The measurement, e.g. "VRMS".
+            source (str): The channel, e.g. "CHAN2".
+
+        Returns:
+            float: The measured value, or 9.9e37 if the measurement is not simulated.
+        """
+        _scale = self.__float("TIM:MAIN:SCAL", 1e-6)
+        _t = self.__float("TIM:MAIN:OFFS") - 5 * _scale + 10 * _scale / self._screen_points * np.arange(
+            self._screen_points
+        )
+        _volts = self.__channel(source, _t)
+        _maximum, _minimum = float(_volts.max()), float(_volts.min())
+        if item.startswith("VMAX") or item.startswith("VTOP"):
+            return _maximum
+        if item.startswith("VMIN") or item.startswith("VBAS"):
+            return _minimum
+        if item.startswith("VPP") or item.startswith("VAMP"):
+            return _maximum - _minimum
+        if item.startswith("VAVG"):
+            return float(_volts.mean())
+        if item.startswith("VRMS"):
+            return float(np.sqrt(np.mean(np.square(_volts))))
+        if item.startswith("FREQ") or item.startswith("PER"):
+            _centered = np.signbit(_volts - (_maximum + _minimum) / 2)
+            _rising = np.flatnonzero(_centered[:-1] & ~_centered[1:])
+            if len(_rising) < 2:
+                return 9.9e37
+            _period = (_t[_rising[-1]] - _t[_rising[0]]) / (len(_rising) - 1)
+            return 1 / _period if item.startswith("FREQ") else _period
+        return 9.9e37
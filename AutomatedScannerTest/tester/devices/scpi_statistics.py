@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+import math
+
+
+class CommandStatistics:
+    """
+    Per-header statistics of the SCPI commands exchanged with an instrument.
+
+    Latencies are counted in a logarithmic histogram with 20 buckets per decade from 1 us
+    to 1000 s, so recording an exchange takes constant time and memory however long a run
+    is, and percentiles are accurate to about 6%.
+
+    Headers are the SCPI nodes as sent, e.g. ":CHANnel1:SCALe" for a command and
+    ":CHANnel1:SCALe?" for a query; compound messages are counted under "(batch)" or
+    "(compound query)", and block queries such as ":WAVeform:DATA?" include reading the block.
+    """
+
+    _buckets_per_decade = 20
+    _minimum_latency = 1e-6
+    _bucket_count = 9 * _buckets_per_decade + 1
+
+    def __init__(self):
+        """
+        Start with no recorded exchanges.
+        """
+        self.__headers = {}
+
+    def reset(self):
+        """
+        Forget every recorded exchange and cache hit.
+        """
+        self.__headers.clear()
+
+    def __entry(self, header: str) -> dict:
+        """
+        Get the counters of a header, creating them on first use.
+
+        Args:
+            header (str): The SCPI header.
+
+        Returns:
+            dict: The counters of the header.
+        """
+        _entry = self.__headers.get(header)
+        if _entry is None:
+            _entry = self.__headers[header] = {
+                "calls": 0,
+                "cache_hits": 0,
+                "queued": 0,
+                "retries": 0,
+                "failures": 0,
+                "bytes_out": 0,
+                "bytes_in": 0,
+                "total": 0.0,
+                "maximum": 0.0,
+                "histogram": [0] * self._bucket_count,
+            }
+        return _entry
+
+    def record(
+        self,
+        header: str,
+        latency: float,
+        bytes_out: int = 0,
+        bytes_in: int = 0,
+        retries: int = 0,
+        failed: bool = False,
+    ):
+        """
+        Record one exchange with the instrument.
+
+        Args:
+            header (str): The SCPI header.
+            latency (float): The time the exchange took in seconds, including retries.
+            bytes_out (int, optional): The number of bytes written. Defaults to 0.
+            bytes_in (int, optional): The number of bytes read. Defaults to 0.
+            retries (int, optional): The number of attempts after the first. Defaults to 0.
+            failed (bool, optional): Whether the exchange failed after all attempts. Defaults to False.
+        """
+        _entry = self.__entry(header)
+        _entry["calls"] += 1
+        _entry["retries"] += retries
+        _entry["failures"] += failed
+        _entry["bytes_out"] += bytes_out
+        _entry["bytes_in"] += bytes_in
+        _entry["total"] += latency
+        if latency > _entry["maximum"]:
+            _entry["maximum"] = latency
+        _bucket = 0
+        if latency > self._minimum_latency:
+            _bucket = min(
+                int(self._buckets_per_decade * math.log10(latency / self._minimum_latency)),
+                self._bucket_count - 1,
+            )
+        _entry["histogram"][_bucket] += 1
+
+    def record_cache_hit(self, header: str):
+        """
+        Record a read or write of a header that was served by the driver's cache.
+
+        Args:
+            header (str): The SCPI header.
+        """
+        self.__entry(header)["cache_hits"] += 1
+
+    def record_queued(self, header: str):
+        """
+        Record a command queued by a batch and sent as part of a compound message.
+
+        Args:
+            header (str): The SCPI header.
+        """
+        self.__entry(header)["queued"] += 1
+
+    def __percentile(self, histogram: list, calls: int, fraction: float) -> float:
+        """
+        Estimate a latency percentile from a histogram.
+
+        Args:
+            histogram (list): The bucket counts.
+            calls (int): The number of exchanges in the histogram.
+            fraction (float): The percentile as a fraction, e.g. 0.95.
+
+        Returns:
+            float: The geometric center of the bucket holding the percentile, in seconds.
+        """
+        _rank = fraction * calls
+        _seen = 0
+        for _bucket, _count in enumerate(histogram):
+            _seen += _count
+            if _seen >= _rank:
+                return self._minimum_latency * 10 ** ((_bucket + 0.5) / self._buckets_per_decade)
+        return 0.0
+
+    def summary(self) -> dict:
+        """
+        Summarize the statistics of every header, slowest in total first.
+
+        Returns:
+            dict: Per header, the calls, cache hits, queued commands, retries, failures,
+                bytes out and in, and the total, mean, p50, p95, p99 and maximum latency in
+                milliseconds.
+        """
+        _summary = {}
+        for _header, _entry in sorted(self.__headers.items(), key=lambda _item: -_item[1]["total"]):
+            _calls = _entry["calls"]
+            _latencies = {}
+            if _calls:
+                _latencies = {
+                    "mean_ms": 1000 * _entry["total"] / _calls,
+                    **{
+                        f"p{round(100 * _fraction)}_ms": 1000
+                        * self.__percentile(_entry["histogram"], _calls, _fraction)
+                        for _fraction in (0.5, 0.95, 0.99)
+                    },
+                    "max_ms": 1000 * _entry["maximum"],
+                }
+            _summary[_header] = {
+                "calls": _calls,
+                "cache_hits": _entry["cache_hits"],
+                "queued": _entry["queued"],
+                "retries": _entry["retries"],
+                "failures": _entry["failures"],
+                "bytes_out": _entry["bytes_out"],
+                "bytes_in": _entry["bytes_in"],
+                "total_ms": 1000 * _entry["total"],
+                **_latencies,
+            }
+        return _summary
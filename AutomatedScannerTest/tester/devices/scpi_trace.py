@@ -0,0 +1,324 @@
+# -*- coding: utf-8 -*-
+from enum import IntEnum
+from pathlib import Path
+import json
+import struct
+import time
+
+import pyvisa
+
+
+class TraceRecord(IntEnum):
+    """
+    Enumeration of the exchanges stored in an SCPI trace.
+
+    Attributes:
+        Write: A message written to the instrument.
+        Query: A message written to the instrument and the response read back.
+        Read: A raw response read from the instrument, e.g. a waveform block.
+        Error: An exchange that failed with a VISA I/O error; the response holds the error code.
+        Clear: A device clear of the instrument buffers.
+        Clock: A reading of the driver clock; the response holds the time since the start of
+            the trace, so a replay expires cached values and times out waits as recorded.
+    """
+
+    Write = 0
+    Query = 1
+    Read = 2
+    Error = 3
+    Clear = 4
+    Clock = 5
+
+
+# A trace starts with the magic bytes, the length-prefixed *IDN? response of the instrument and
+# the length-prefixed JSON of the setup snapshots known for it; version 1 traces have no snapshots.
+# Each record then holds the exchange, its start time relative to the start of the trace, its
+# wire time in seconds and the lengths of the message and the response, followed by both.
+_MAGIC = b"SCPITRC2"
+_MAGIC_V1 = b"SCPITRC1"
+_LENGTH = struct.Struct("<I")
+_RECORD = struct.Struct("<BddII")
+_CLOCK = struct.Struct("<d")
+
+
+class RecordingResource:
+    """
+    Wrapper around an instrument resource that records every exchange into a binary trace.
+
+    Attributes that are not exchanges, such as timeout or model_name, are passed through to
+    the wrapped resource.
+    """
+
+    def __init__(self, resource, path, idn: str, snapshots: dict = None):
+        """
+        Start recording a resource.
+
+        Args:
+            resource: The resource to wrap, e.g. a PyVISA message based resource.
+            path (str or Path): The trace file to create.
+            idn (str): The *IDN? response of the instrument, stored in the trace header.
+            snapshots (dict, optional): The setup snapshot settings of the instrument, stored
+                in the trace header so a replay recalls the same registers.
+        """
+        self.__resource = resource
+        self.__path = Path(path)
+        self.__file = self.__path.open("wb")
+        _idn = idn.encode()
+        _snapshots = json.dumps(snapshots or {}).encode()
+        self.__file.write(
+            _MAGIC + _LENGTH.pack(len(_idn)) + _idn + _LENGTH.pack(len(_snapshots)) + _snapshots
+        )
+        self.__started = time.perf_counter()
+
+    @property
+    def resource(self):
+        """The wrapped resource."""
+        return self.__resource
+
+    @property
+    def path(self) -> Path:
+        """The trace file."""
+        return self.__path
+
+    def __getattr__(self, name):
+        return getattr(self.__resource, name)
+
+    def __setattr__(self, name, value):
+        if name.startswith("_RecordingResource__"):
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self.__resource, name, value)
+
+    def __record(self, kind: TraceRecord, started: float, message: bytes, response: bytes):
+        """
+        Append one exchange to the trace.
+
+        Args:
+            kind (TraceRecord): The kind of exchange.
+            started (float): The perf_counter value when the exchange started.
+            message (bytes): The message written, empty for a read.
+            response (bytes): The response read, empty for a write.
+        """
+        self.__file.write(
+            _RECORD.pack(
+                kind,
+                started - self.__started,
+                time.perf_counter() - started,
+                len(message),
+                len(response),
+            )
+        )
+        self.__file.write(message)
+        self.__file.write(response)
+
+    def __exchange(self, kind: TraceRecord, message: str, operation):
+        """
+        Perform and record one exchange with the wrapped resource.
+
+        Args:
+            kind (TraceRecord): The kind of exchange.
+            message (str): The message written, empty for a read.
+            operation (callable): Performs the exchange and returns the response, if any.
+
+        Returns:
+            Any: The result of the operation.
+
+        Raises:
+            pyvisa.errors.VisaIOError: If the exchange fails; the failure is recorded first.
+        """
+        _started = time.perf_counter()
+        try:
+            _result = operation()
+        except pyvisa.errors.VisaIOError as e:
+            self.__record(TraceRecord.Error, _started, message.encode(), str(e.error_code).encode())
+            raise
+        if kind in (TraceRecord.Write, TraceRecord.Clear):
+            _response = b""
+        elif kind == TraceRecord.Query:
+            _response = _result.encode()
+        else:
+            _response = bytes(_result)
+        self.__record(kind, _started, message.encode(), _response)
+        return _result
+
+    def write(self, message: str):
+        """Write a message to the wrapped resource and record it."""
+        return self.__exchange(TraceRecord.Write, message, lambda: self.__resource.write(message))
+
+    def query(self, message: str) -> str:
+        """Query the wrapped resource and record the message and the response."""
+        return self.__exchange(TraceRecord.Query, message, lambda: self.__resource.query(message))
+
+    def _read_raw(self, size: int = None) -> bytes:
+        """Read a raw response from the wrapped resource and record it."""
+        return self.__exchange(TraceRecord.Read, "", self.__resource._read_raw)
+
+    read_raw = _read_raw
+
+    def clear(self):
+        """Clear the wrapped resource and record it."""
+        return self.__exchange(TraceRecord.Clear, "", self.__resource.clear)
+
+    def clock(self) -> float:
+        """Read and record the time since the start of the trace, in seconds."""
+        _now = time.perf_counter()
+        _elapsed = _now - self.__started
+        self.__record(TraceRecord.Clock, _now, b"", _CLOCK.pack(_elapsed))
+        return _elapsed
+
+    def close(self):
+        """Stop recording and close the trace file; the wrapped resource stays open."""
+        self.__file.close()
+
+
+def read_trace(path) -> tuple:
+    """
+    Read a binary SCPI trace.
+
+    Args:
+        path (str or Path): The trace file.
+
+    Returns:
+        tuple: The *IDN? response, the setup snapshot settings and the list of
+            (kind, start, duration, message, response) records.
+
+    Raises:
+        AssertionError: If the file is not an SCPI trace or is truncated.
+    """
+    _data = Path(path).read_bytes()
+    assert _data.startswith((_MAGIC, _MAGIC_V1)), "File is not an SCPI trace."
+    _offset = len(_MAGIC)
+    (_length,) = _LENGTH.unpack_from(_data, _offset)
+    _offset += _LENGTH.size
+    _idn = _data[_offset : _offset + _length].decode()
+    _offset += _length
+    _snapshots = {}
+    if _data.startswith(_MAGIC):
+        (_length,) = _LENGTH.unpack_from(_data, _offset)
+        _offset += _LENGTH.size
+        _snapshots = json.loads(_data[_offset : _offset + _length].decode())
+        _offset += _length
+    _records = []
+    _view = memoryview(_data)
+    while _offset < len(_data):
+        assert _offset + _RECORD.size <= len(_data), "Trace is truncated."
+        _kind, _start, _duration, _message_length, _response_length = _RECORD.unpack_from(_data, _offset)
+        _offset += _RECORD.size
+        _message = bytes(_view[_offset : _offset + _message_length])
+        _offset += _message_length
+        _response = bytes(_view[_offset : _offset + _response_length])
+        _offset += _response_length
+        assert _offset <= len(_data), "Trace is truncated."
+        _records.append((TraceRecord(_kind), _start, _duration, _message, _response))
+    return _idn, _snapshots, _records
+
+
+def summarize_trace(path) -> dict:
+    """
+    Summarize where the time of a recorded run went.
+
+    Wire time is the time spent inside exchanges with the instrument; host time is the rest
+    of the span between the first and the last exchange. Clock readings are not exchanges.
+
+    Args:
+        path (str or Path): The trace file.
+
+    Returns:
+        dict: The number of exchanges, the bytes written and read, and the span, wire and host times in seconds.
+    """
+    _, _, _records = read_trace(path)
+    _records = [_record for _record in _records if _record[0] != TraceRecord.Clock]
+    _wire = sum(_record[2] for _record in _records)
+    _span = (_records[-1][1] + _records[-1][2] - _records[0][1]) if _records else 0.0
+    return {
+        "exchanges": len(_records),
+        "bytes_written": sum(len(_record[3]) for _record in _records),
+        "bytes_read": sum(len(_record[4]) for _record in _records),
+        "span": _span,
+        "wire_time": _wire,
+        "host_time": _span - _wire,
+    }
+
+
+class ReplayResource:
+    """
+    Instrument resource that answers the driver from a recorded SCPI trace.
+
+    Every exchange must match the next record of the trace, so a run replays exactly as it
+    was recorded as long as the driver issues the same commands. The driver clock follows the
+    recorded readings instead of the wall clock.
+
+    Attributes:
+        idn (str): The *IDN? response of the recorded instrument.
+        snapshots (dict): The setup snapshot settings of the recorded instrument.
+        model_name (str): The model of the recorded instrument.
+        timeout (int): The I/O timeout in milliseconds; accepted for compatibility and ignored.
+    """
+
+    def __init__(self, path, realtime: bool = False):
+        """
+        Load a trace for replay.
+
+        Args:
+            path (str or Path): The trace file.
+            realtime (bool): If True, every exchange takes as long as it did when recorded.
+        """
+        self.idn, self.snapshots, self.__records = read_trace(path)
+        _parts = self.idn.split(",")
+        self.model_name = _parts[1] if len(_parts) > 1 else ""
+        self.timeout = 2000
+        self.__realtime = realtime
+        self.__index = 0
+
+    def __next(self, kind: TraceRecord, message: bytes) -> bytes:
+        """
+        Consume the next record, which must be the given exchange.
+
+        Args:
+            kind (TraceRecord): The kind of exchange the driver performs.
+            message (bytes): The message the driver writes, empty for a read.
+
+        Returns:
+            bytes: The recorded response.
+
+        Raises:
+            AssertionError: If the trace is exhausted or the exchange differs from the recording.
+            pyvisa.errors.VisaIOError: If the exchange failed when it was recorded.
+        """
+        assert self.__index < len(self.__records), "Trace is exhausted."
+        _kind, _, _duration, _message, _response = self.__records[self.__index]
+        assert _kind in (kind, TraceRecord.Error) and _message == message, (
+            f"Trace diverged at record {self.__index}: expected {_kind.name} {_message!r}, "
+            f"got {kind.name} {message!r}."
+        )
+        self.__index += 1
+        if self.__realtime:
+            time.sleep(_duration)
+        if _kind == TraceRecord.Error:
+            raise pyvisa.errors.VisaIOError(int(_response))
+        return _response
+
+    def write(self, message: str):
+        """Replay a message written to the instrument."""
+        self.__next(TraceRecord.Write, message.encode())
+
+    def query(self, message: str) -> str:
+        """Replay a query, returning the recorded response."""
+        return self.__next(TraceRecord.Query, message.encode()).decode()
+
+    def _read_raw(self, size: int = None) -> bytes:
+        """Replay a raw read, returning the recorded response."""
+        return self.__next(TraceRecord.Read, b"")
+
+    read_raw = _read_raw
+
+    def clear(self):
+        """Replay a device clear."""
+        self.__next(TraceRecord.Clear, b"")
+
+    def clock(self) -> float:
+        """Replay a reading of the driver clock, returning the recorded time."""
+        return _CLOCK.unpack(self.__next(TraceRecord.Clock, b""))[0]
+
+    def close(self):
+        """Accepted for compatibility with a PyVISA resource."""
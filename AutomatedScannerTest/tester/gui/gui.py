@@ -5,6 +5,7 @@ from pathlib import Path
 import re
 
 import tester
+from tester.manager.sequence_runner import SequenceRunner
 from tester.manager.test_sequence import TestSequence
 from tester.gui.tester_ui import Ui_TesterWindow
 
@@ -72,6 +73,7 @@ class TesterWindow(QtWidgets.QMainWindow):
 
         # Setup model and UI
         self.model = TestSequence()
+        self.runner = SequenceRunner(self.model, self)
         self.ui = Ui_TesterWindow()
         self.ui.setupUi(self)
         self.ui.tableSequence.setModel(self.model)
@@ -101,11 +103,16 @@ class TesterWindow(QtWidgets.QMainWindow):
         self.model.statusChanged.connect(self.ui.labelStatus.setText)
         self.model.testerNameChanged.connect(self.ui.labelTesterName.setText)
         self.model.testStarted.connect(self.ui.tableSequence.selectRow)
+        self.runner.progressChanged.connect(self.onProgressChanged)
+        self.runner.sequenceFinished.connect(self.onSequenceFinished)
 
         # Status bar logging handler
         class StatusBarHandler(logging.Handler):
             """
             Logging handler that updates the status bar with info messages.
+
+            Messages are posted to the status bar through a queued call, as they are also
+            logged from the test sequence's worker threads.
             """
             def __init__(self, status_bar):
                 """
@@ -125,7 +132,12 @@ class TesterWindow(QtWidgets.QMainWindow):
                 """
                 if record.levelno <= logging.INFO:
                     msg = self.format(record)
-                    self.status_bar.showMessage(f"Status: {msg}")
+                    QtCore.QMetaObject.invokeMethod(
+                        self.status_bar,
+                        "showMessage",
+                        QtCore.Qt.ConnectionType.QueuedConnection,
+                        QtCore.Q_ARG(str, f"Status: {msg}"),
+                    )
 
         _status_bar_handler = StatusBarHandler(self.ui.statusBar)
         _status_bar_handler.setLevel(logging.INFO)
@@ -146,9 +158,10 @@ class TesterWindow(QtWidgets.QMainWindow):
     @QtCore.Slot()
     def onExit(self):
         """
-        Handle the Exit action: stop the test and quit the application.
+        Handle the Exit action: stop the test, wait for it to finish and quit the application.
         """
         self.onStopTest()
+        self.runner.wait()
         QtWidgets.QApplication.quit()
 
     @QtCore.Slot()
@@ -206,24 +219,48 @@ class TesterWindow(QtWidgets.QMainWindow):
         self.ui.actionStop.setEnabled(True)
         self.ui.actionReport.setEnabled(False)
         if self.model:
-            self.model.on_start_test(serial_number)
+            self.runner.start_sequence(serial_number)
         else:
             self._logger.error("Model is not initialized.")
 
     @QtCore.Slot()
     def onStopTest(self):
         """
-        Handle the Stop Test action: stop the current test and update UI actions.
+        Handle the Stop Test action: request the current test to stop; the UI actions are
+        updated once it has.
         """
         self._logger.info("Stop test menu clicked")
         if self.model:
-            self.model.on_stop_test()
-            self.ui.actionStart.setEnabled(True)
             self.ui.actionStop.setEnabled(False)
-            self.ui.actionReport.setEnabled(True)
+            self.runner.stop_sequence()
         else:
             self._logger.error("Model is not initialized.")
 
+    @QtCore.Slot(int, int)
+    def onProgressChanged(self, index: int, count: int):
+        """
+        Show which test of the sequence is running.
+
+        Args:
+            index (int): The index of the running test.
+            count (int): The number of tests in the sequence.
+        """
+        self.setWindowTitle(f"{tester.__application__} - Running test {index + 1} of {count}")
+
+    @QtCore.Slot(str)
+    def onSequenceFinished(self, status: str):
+        """
+        Handle the end of the test sequence: update UI actions.
+
+        Args:
+            status (str): The final status of the sequence.
+        """
+        self._logger.info(f"Test sequence finished with status {status}")
+        self.setWindowTitle(tester.__application__)
+        self.ui.actionStart.setEnabled(True)
+        self.ui.actionStop.setEnabled(False)
+        self.ui.actionReport.setEnabled(True)
+
     @QtCore.Slot()
     def onReport(self):
         """
@@ -1,7 +1,10 @@
 # -*- coding: utf-8 -*-
+from concurrent.futures import ThreadPoolExecutor
 import logging
+from pathlib import Path
 import re
 import sys
+import time
 
 from tester.gui.gui import TesterApp
 from tester.manager.test_sequence import TestSequence
@@ -10,6 +13,132 @@ from tester.manager.test_sequence import TestSequence
 _SERIAL_RE = re.compile(r"^[A-Z]{2}[0-9]{6}$")
 """Regular expression to validate serial numbers in the format: two uppercase letters followed by six digits."""
 
+
+def _read_serials(source: str):
+    """
+    Read the serial numbers of a batch.
+
+    Args:
+        source (str): A comma-separated list of serial numbers, a file with one per line, or
+            "-" to read them from standard input one at a time as they are scanned; blank
+            lines are skipped and "q" ends the input.
+
+    Yields:
+        str: The serial numbers, in order.
+    """
+    if source == "-":
+        _lines = sys.stdin
+    elif Path(source).is_file():
+        _lines = Path(source).read_text().splitlines()
+    else:
+        _lines = source.split(",")
+    for _line in _lines:
+        _serial_number = _line.strip()
+        if _serial_number.lower() == "q":
+            return
+        if _serial_number:
+            yield _serial_number
+
+
+def _run_batch(ts: TestSequence, source: str, model_name: str = "", test: str = None):
+    """
+    Test several units back to back in one session and print their throughput.
+
+    The instruments stay connected and configured for the whole batch, so every unit after
+    the first only sends the settings that differ between tests. Each unit is tested on a
+    worker thread while the report of the previous unit is generated on this thread, as
+    rendering the report is not thread-safe and takes most of the time of a unit otherwise.
+    After each unit its status and phase times are printed, and at the end the aggregate
+    throughput and phase breakdown. A unit whose run raises is recorded with the status
+    "Error" and the batch continues with the instruments reset; an interrupt cancels the unit
+    being tested and ends the batch early, still printing the summary.
+
+    Args:
+        ts (TestSequence): The test sequence.
+        source (str): The serial numbers, as accepted by _read_serials.
+        model_name (str, optional): The model name of the units.
+        test (str, optional): The name of a specific test to run.
+    """
+    _units = []
+    _pending = None
+    _started = time.perf_counter()
+
+    def _report(pending):
+        """Generate the report of a tested unit and add its time to the unit's phases."""
+        _index, _snapshot = pending
+        _report_started = time.perf_counter()
+        try:
+            ts.generate_report(_snapshot)
+        except Exception:
+            logging.exception(f"Generating the report of {_units[_index][0]} failed.")
+        _units[_index][3]["Report"] = time.perf_counter() - _report_started
+
+    ts.start_session()
+    try:
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="Unit") as _executor:
+            try:
+                for _serial_number in _read_serials(source):
+                    if not _SERIAL_RE.match(_serial_number):
+                        logging.error(f"Skipping invalid serial number {_serial_number!r}.")
+                        continue
+                    _unit_started = time.perf_counter()
+                    ts.reset_cancel()
+                    _unit = _executor.submit(
+                        ts.on_start_test, _serial_number, model_name=model_name, test=test, generate_report=False
+                    )
+                    if _pending is not None:
+                        _report(_pending)
+                        _pending = None
+                    try:
+                        _unit.result()
+                        _status = ts.Status
+                        _pending = (len(_units), ts.get_report_snapshot(test))
+                    except Exception:
+                        logging.exception(f"Testing {_serial_number} failed.")
+                        _status = "Error"
+                        # The instruments are in an unknown state, so the next unit configures them from scratch.
+                        try:
+                            ts.end_session()
+                        except Exception:
+                            logging.exception("Resetting the instruments failed.")
+                        ts.start_session()
+                    _duration = time.perf_counter() - _unit_started
+                    _phases = ts.PhaseTimes
+                    _units.append((_serial_number, _status, _duration, _phases))
+                    print(
+                        f"{_serial_number}: {_status} in {_duration:.1f} s ("
+                        + ", ".join(f"{_name} {_seconds:.1f} s" for _name, _seconds in _phases.items())
+                        + ")"
+                    )
+            except KeyboardInterrupt:
+                ts.on_stop_test()
+                print("Batch interrupted.")
+        if _pending is not None:
+            _report(_pending)
+    finally:
+        ts.end_session()
+    _elapsed = time.perf_counter() - _started
+    if not _units:
+        print("No units tested.")
+        return
+    _busy = sum(_unit[2] for _unit in _units)
+    _passed = sum(1 for _unit in _units if _unit[1] == "Pass")
+    print(f"Tested {len(_units)} units in {_elapsed:.1f} s: {_passed} passed, {len(_units) - _passed} did not.")
+    print(
+        f"Throughput: {3600 * len(_units) / _elapsed:.1f} units/hour overall, "
+        f"{3600 * len(_units) / _busy:.1f} units/hour while testing, {_busy / len(_units):.1f} s per unit."
+    )
+    _totals = {}
+    for _unit in _units:
+        for _name, _seconds in _unit[3].items():
+            _totals[_name] = _totals.get(_name, 0.0) + _seconds
+    print("Phase breakdown per unit:")
+    for _name, _seconds in _totals.items():
+        # The report of a unit is generated while the next unit is tested, so it takes no time of its own.
+        _share = "while the next unit is tested" if _name == "Report" else f"{100 * _seconds / _busy:.0f}%"
+        print(f"    {_name}: {_seconds / len(_units):.2f} s ({_share})")
+
+
 def main():
     """
     Main entry point for the CLI tester application.
@@ -18,6 +147,7 @@ def main():
     and executes actions based on the provided options. It supports the following actions:
         - Listing available tests.
         - Running a test sequence (with serial number validation and user prompt).
+        - Running a test sequence on a batch of units in one session.
         - Displaying help information.
 
     The function ensures that the serial number provided for a test sequence matches the required format (AA######).
@@ -44,6 +174,18 @@ def main():
         ts.print_test_list()
         sys.exit(0)
 
+    if args.isSet("batch"):
+        """
+        Handle the 'batch' command-line option.
+
+        Runs the test sequence on every serial number of the batch in one session and prints
+        the per-unit and aggregate throughput.
+        """
+        logging.info("Running test sequence on a batch of units...")
+        _run_batch(ts, args.value("batch"), model_name=args.value("model"), test=args.value("test"))
+        logging.info("Batch completed.")
+        return
+
     if args.isSet("run"):
         """
         Handle the 'run' command-line option.
@@ -62,6 +204,7 @@ def main():
             _serial_number = input(
                 "Please enter the serial number for the test sequence (format: AA######): "
             ).strip()
+        ts.reset_cancel()
         ts.on_start_test(
             _serial_number, model_name=args.value("model"), test=args.value("test")
         )
@@ -3,6 +3,7 @@ from PySide6 import QtCore
 import ctypes
 import importlib
 import inspect
+import json
 import os
 import socket
 
@@ -38,6 +39,8 @@ class DeviceManager:
         """
         self.__logger = tester._get_class_logger(self.__class__)
         self.__settings = settings
+        self.__session = False
+        self.__configured = False
 
         # Efficiently discover and instantiate all Device subclasses in tester.devices
         _device_module = importlib.import_module(Device.__module__)
@@ -98,51 +101,122 @@ class DeviceManager:
         return username
 
     @tester._member_logger
-    def setup(self):
+    def setup(self, data_directory=None, cancel=None):
         """
         Initializes the device manager before running tests.
 
-        Resets MSO5000 if present.
+        Resets MSO5000 if present and its SCPI command statistics, recording its SCPI trace into
+        the run data directory if enabled, and lets the cancel token interrupt its long operations.
+        Within a session the MSO5000 is only reset before the first run.
+
+        Args:
+            data_directory (Path, optional): The data directory of the run.
+            cancel (CancelToken, optional): The cancel token of the run.
         """
         self.__logger.info("Setting up the device manager...")
         mso = getattr(self, "MSO5000", None)
         if mso:
-            mso.reset()
+            mso.set_cancel_token(cancel)
+            mso.reset_command_statistics()
+            if data_directory is not None and mso.get_record_trace():
+                mso.start_trace(data_directory / "scpi_trace.bin")
+            if not self.__configured:
+                mso.reset()
+            self.__configured = self.__session
 
     @tester._member_logger
-    def test_setup(self):
+    def test_setup(self, state: dict = None, name: str = None):
         """
         Sets up the device manager before each test.
 
-        Resets and clears MSO5000 if present.
+        Without a declared state the MSO5000, if present, is reset so the test can configure it
+        from scratch. With a declared state the MSO5000 is brought to it directly, sending only
+        what differs from the state it was left in by the previous test.
+
+        Args:
+            state (dict, optional): The declared MSO5000 state, as accepted by MSO5000.apply_state.
+            name (str, optional): The name of the setup snapshot used when the MSO5000 state is unknown.
         """
         self.__logger.info("Setting up the device manager for testing...")
         mso = getattr(self, "MSO5000", None)
         if mso:
-            mso.reset()
-            # Use getattr with default to avoid repeated hasattr checks
-            clear_registers = getattr(mso, "clear_registers", None)
-            if callable(clear_registers):
-                clear_registers()
-            clear = getattr(mso, "clear", None)
-            if callable(clear):
-                clear()
+            with mso.batch():
+                if state is None:
+                    mso.reset()
+                # Use getattr with default to avoid repeated hasattr checks
+                clear_registers = getattr(mso, "clear_registers", None)
+                if callable(clear_registers):
+                    clear_registers()
+                clear = getattr(mso, "clear", None)
+                if callable(clear):
+                    clear()
+            if state is not None:
+                mso.apply_state(state, snapshot=name)
 
     @tester._member_logger
     def test_teardown(self):
         """
         Cleans up the device manager after each test.
+
+        The MSO5000 function generators, if present, are turned off, even if the test was
+        cancelled, so the device under test is never left driven.
         """
         self.__logger.info("Tearing down the device manager settings for testing...")
+        mso = getattr(self, "MSO5000", None)
+        if mso:
+            with mso.uncancellable():
+                mso.function_generator_state(1, False)
+                mso.function_generator_state(2, False)
 
     @tester._member_logger
     def teardown(self):
         """
         Performs cleanup operations after running tests.
 
-        Resets MSO5000 if present.
+        Resets MSO5000 if present, even after a cancellation, and stops recording its SCPI trace.
+        Within a session the MSO5000 keeps its configuration for the next run instead.
         """
         self.__logger.info("Tearing down the device manager...")
         mso = getattr(self, "MSO5000", None)
         if mso:
-            mso.reset()
+            if not self.__session:
+                with mso.uncancellable():
+                    mso.reset()
+            mso.stop_trace()
+            mso.set_cancel_token(None)
+
+    @tester._member_logger
+    def start_session(self):
+        """
+        Keep the devices configured between runs, e.g. to test several units back to back.
+
+        The MSO5000 is reset before the first run of the session only, so its cached state
+        stays valid and each test sends only the settings that differ from the previous one.
+        """
+        self.__session = True
+
+    @tester._member_logger
+    def end_session(self):
+        """
+        End a session started with start_session, resetting MSO5000 if present.
+        """
+        self.__session = False
+        if self.__configured:
+            self.__configured = False
+            mso = getattr(self, "MSO5000", None)
+            if mso:
+                with mso.uncancellable():
+                    mso.reset()
+
+    @tester._member_logger
+    def save_command_statistics(self, path):
+        """
+        Save the SCPI command statistics of the MSO5000, if present, to a JSON file.
+
+        Args:
+            path (Path): The JSON file to write, e.g. next to the run's data.json.
+        """
+        mso = getattr(self, "MSO5000", None)
+        if mso:
+            with open(path, "w") as _file:
+                json.dump(mso.get_command_statistics(), _file, indent=4)
@@ -0,0 +1,225 @@
+#-*- coding: utf-8 -*-
+from itertools import combinations
+
+import tester
+
+
+class TestPlanner:
+    """
+    Orders the tests of a sequence to minimize the reconfiguration of the oscilloscope between them.
+
+    Every test declares the MSO5000 state it runs in, so the cost of running one test after
+    another is the number of settings MSO5000.apply_state has to send to get from the first
+    state to the second. The costs between all tests are computed once when the planner is
+    created; plan() then finds the cheapest order that runs every test after the tests named
+    in its RunsAfter.
+
+    Args:
+        tests (list): The tests to plan, in their default order.
+    """
+
+    # The cost of a test without a declared state, which resets the oscilloscope and configures
+    # it from scratch, in commands.
+    _reset_cost = 100
+    # The most tests ordered exactly; larger sequences are ordered greedily.
+    _exact_limit = 12
+
+    def __init__(self, tests: list):
+        """
+        Compute the transition costs between the tests.
+
+        Args:
+            tests (list): The tests to plan, in their default order.
+
+        Raises:
+            AssertionError: If the ordering constraints of the tests form a cycle.
+        """
+        self.__logger = tester._get_class_logger(self.__class__)
+        self.__tests = list(tests)
+        _states = [self._state_items(_test.get_instrument_state()) for _test in self.__tests]
+        self.__start_costs = [self.transition_cost({}, _state) for _state in _states]
+        self.__costs = [[self.transition_cost(_before, _after) for _after in _states] for _before in _states]
+        _indexes = {_test.Name: _index for _index, _test in enumerate(self.__tests)}
+        self.__predecessors = [
+            frozenset(_indexes[_name] for _name in _test.RunsAfter if _name in _indexes)
+            for _test in self.__tests
+        ]
+        assert self.__is_acyclic(), "The RunsAfter constraints of the tests form a cycle."
+
+    @property
+    def Costs(self) -> list:
+        """
+        Get the transition costs between the tests.
+
+        Returns:
+            list: The cost of running test j right after test i at [i][j], in commands.
+        """
+        return [list(_row) for _row in self.__costs]
+
+    @staticmethod
+    def _state_items(state: dict) -> dict:
+        """
+        Flatten a declared MSO5000 state into its individual settings.
+
+        Args:
+            state (dict): The state as accepted by MSO5000.apply_state, or None.
+
+        Returns:
+            dict: The value of every setting keyed by (setter, channel, argument) for setters
+                taking a channel, (setter, argument) for the others and (setter, arguments) for
+                setters applied once per entry; None for a test without a declared state.
+        """
+        if state is None:
+            return None
+        _items = {}
+        for _name, _arguments in state.items():
+            if isinstance(_arguments, dict) and _arguments and all(isinstance(_key, int) for _key in _arguments):
+                for _channel, _kwargs in _arguments.items():
+                    _items[(_name, _channel)] = True
+                    for _key, _value in _kwargs.items():
+                        _items[(_name, _channel, _key)] = _value
+            elif isinstance(_arguments, dict):
+                for _key, _value in _arguments.items():
+                    _items[(_name, _key)] = _value
+            else:
+                for _args in _arguments:
+                    _items[(_name, tuple(_args))] = True
+        return _items
+
+    @classmethod
+    def transition_cost(cls, before: dict, after: dict) -> int:
+        """
+        Get the number of settings to send to go from one state to another.
+
+        Args:
+            before (dict): The flattened state the oscilloscope is in, None if unknown.
+            after (dict): The flattened state of the next test, None if it resets the oscilloscope.
+
+        Returns:
+            int: The cost in commands.
+        """
+        if after is None:
+            return cls._reset_cost
+        if before is None:
+            before = {}
+        _missing = object()
+        _cost = sum(1 for _key, _value in after.items() if before.get(_key, _missing) != _value)
+        # Channels and generators of the previous state that the next one does not use are switched off.
+        _cost += sum(
+            1
+            for _key in before
+            if len(_key) == 2 and isinstance(_key[1], int) and _key not in after
+        )
+        return _cost
+
+    def __is_acyclic(self) -> bool:
+        """
+        Check that the ordering constraints can all be met.
+
+        Returns:
+            bool: True if no test has to run after itself.
+        """
+        _done = set()
+        _remaining = set(range(len(self.__tests)))
+        while _remaining:
+            _ready = {_index for _index in _remaining if self.__predecessors[_index] <= _done}
+            if not _ready:
+                return False
+            _done |= _ready
+            _remaining -= _ready
+        return True
+
+    def cost(self, order: list) -> int:
+        """
+        Get the total reconfiguration cost of running the tests in an order.
+
+        Args:
+            order (list): The indexes of the tests, in the order they run.
+
+        Returns:
+            int: The cost in commands.
+        """
+        if not order:
+            return 0
+        return self.__start_costs[order[0]] + sum(
+            self.__costs[_before][_after] for _before, _after in zip(order, order[1:])
+        )
+
+    def __plan_exact(self, count: int) -> list:
+        """
+        Find the cheapest order by dynamic programming over the subsets of tests.
+
+        Among orders of equal cost the one closest to the default order is chosen.
+
+        Args:
+            count (int): The number of tests.
+
+        Returns:
+            list: The indexes of the tests, in the order they run.
+        """
+        _best = {}
+        for _index in range(count):
+            if not self.__predecessors[_index]:
+                _best[(frozenset((_index,)), _index)] = (self.__start_costs[_index], (_index,))
+        for _size in range(2, count + 1):
+            for _subset in map(frozenset, combinations(range(count), _size)):
+                for _last in _subset:
+                    if not self.__predecessors[_last] <= _subset - {_last}:
+                        continue
+                    _rest = _subset - {_last}
+                    _candidates = [
+                        (_cost + self.__costs[_previous][_last], _order + (_last,))
+                        for _previous in _rest
+                        for _cost, _order in [_best.get((_rest, _previous), (None, None))]
+                        if _order is not None
+                    ]
+                    if _candidates:
+                        _best[(_subset, _last)] = min(_candidates)
+        _all = frozenset(range(count))
+        return list(min(_best[(_all, _last)] for _last in range(count) if (_all, _last) in _best)[1])
+
+    def __plan_greedy(self, count: int) -> list:
+        """
+        Order the tests by always running the cheapest test whose constraints are met next.
+
+        Args:
+            count (int): The number of tests.
+
+        Returns:
+            list: The indexes of the tests, in the order they run.
+        """
+        _order = []
+        _remaining = list(range(count))
+        while _remaining:
+            _done = set(_order)
+            _ready = [_index for _index in _remaining if self.__predecessors[_index] <= _done]
+            _next = min(
+                _ready,
+                key=lambda _index: (
+                    self.__costs[_order[-1]][_index] if _order else self.__start_costs[_index],
+                    _index,
+                ),
+            )
+            _order.append(_next)
+            _remaining.remove(_next)
+        return _order
+
+    def plan(self) -> list:
+        """
+        Find the order of the tests that needs the fewest configuration changes.
+
+        Returns:
+            list: The tests, in the order to run them.
+        """
+        _count = len(self.__tests)
+        if not _count:
+            return []
+        if _count <= self._exact_limit:
+            _order = self.__plan_exact(_count)
+        else:
+            _order = self.__plan_greedy(_count)
+        self.__logger.info(
+            f"Planned {', '.join(self.__tests[_index].Name for _index in _order)} with a "
+            f"reconfiguration cost of {self.cost(_order)}, {self.cost(list(range(_count)))} in the default order"
+        )
+        return [self.__tests[_index] for _index in _order]
@@ -337,6 +337,41 @@ class TestReport:
         self.writeLine("Results", pointSize=12, bold=True)
         self.writeLine()
 
+    @tester._member_logger
+    def commandStatisticsPage(self, statistics: dict, count: int = 40):
+        """
+        Add a page listing the SCPI commands that took the most time during the run.
+
+        Args:
+            statistics (dict): The per-header statistics, slowest in total first, as returned
+                by MSO5000.get_command_statistics.
+            count (int): The largest number of commands to list.
+        """
+        if getattr(self, "pageNumber", 1) % 2 == 1:
+            self.blankPage()
+        self.newPage()
+        self.writeLine(
+            "SCPI Command Statistics", pointSize=14, bold=True, halign=QtCore.Qt.AlignmentFlag.AlignHCenter
+        )
+        self.writeLine()
+        _calls = sum(_entry["calls"] for _entry in statistics.values())
+        _hits = sum(_entry["cache_hits"] for _entry in statistics.values())
+        _total = sum(_entry["total_ms"] for _entry in statistics.values())
+        self.writeLine(f"{_calls} exchanges taking {_total / 1000:.2f} s; {_hits} cache hits")
+        self.writeLine()
+        for _header, _entry in list(statistics.items())[:count]:
+            _line = f"{_header}: {_entry['calls']} calls, {_entry['total_ms']:.1f} ms"
+            if _entry["calls"]:
+                _line += (
+                    f" (p50 {_entry['p50_ms']:.2f}, p95 {_entry['p95_ms']:.2f},"
+                    f" p99 {_entry['p99_ms']:.2f} ms)"
+                )
+            if _entry["cache_hits"]:
+                _line += f", {_entry['cache_hits']} cached"
+            if _entry["retries"]:
+                _line += f", {_entry['retries']} retries"
+            self.writeLine(_line, pointSize=8)
+
     @tester._member_logger
     def plotXYData(
         self,
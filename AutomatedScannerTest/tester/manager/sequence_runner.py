@@ -0,0 +1,119 @@
+#-*- coding: utf-8 -*-
+from PySide6 import QtCore
+import time
+
+import tester
+from tester.manager.test_sequence import TestSequence
+
+
+class SequenceRunner(QtCore.QThread):
+    """
+    Runs a TestSequence on a worker thread so the GUI stays responsive.
+
+    The runner lives in the GUI thread while run() executes on the worker, so every signal of
+    the sequence and its tests that is connected to a GUI object is delivered through a queued
+    connection and handled by the GUI event loop. The report is generated back on the GUI
+    thread once the sequence finishes, as rendering its charts is not thread-safe.
+
+    Args:
+        model (TestSequence): The test sequence to run.
+        parent (QtCore.QObject, optional): The parent object.
+    """
+
+    progressChanged = QtCore.Signal(int, int)
+    """Signal emitted when a test starts, with its index and the number of tests."""
+    sequenceFinished = QtCore.Signal(str)
+    """Signal emitted on the GUI thread after the sequence and its report finish, with the status."""
+    cancelLatencyMeasured = QtCore.Signal(float)
+    """Signal emitted after a cancelled sequence stops, with the seconds since the stop request."""
+
+    def __init__(self, model: TestSequence, parent: QtCore.QObject = None):
+        """
+        Initialize the runner for a test sequence.
+
+        Args:
+            model (TestSequence): The test sequence to run.
+            parent (QtCore.QObject, optional): The parent object.
+        """
+        super().__init__(parent)
+        self.__logger = tester._get_class_logger(self.__class__)
+        self.__model = model
+        self.__serial_number = ""
+        self.__model_name = ""
+        self.__test = None
+        self.__stop_requested = None
+        model.testStarted.connect(self._on_test_started)
+        self.finished.connect(self._on_finished)
+
+    @tester._member_logger
+    def start_sequence(self, serial_number: str, model_name: str = "", test: str = None):
+        """
+        Start the test sequence or a specific test on the worker thread.
+
+        The cancellation of the previous run is cleared here, on the calling thread, so a stop
+        requested before the worker reaches the sequence still cancels it.
+
+        Args:
+            serial_number (str): The serial number for the test run.
+            model_name (str, optional): The model name.
+            test (str, optional): The name of a specific test to run.
+
+        Raises:
+            AssertionError: If a sequence is already running.
+        """
+        assert not self.isRunning(), "A test sequence is already running."
+        self.__serial_number = serial_number
+        self.__model_name = model_name
+        self.__test = test
+        self.__stop_requested = None
+        self.__model.reset_cancel()
+        self.start()
+
+    @tester._member_logger
+    def stop_sequence(self):
+        """
+        Request cancellation of the running test sequence.
+
+        The time until the worker thread stops is reported by cancelLatencyMeasured.
+        """
+        if self.isRunning() and self.__stop_requested is None:
+            self.__stop_requested = time.perf_counter()
+        self.__model.on_stop_test()
+
+    def run(self):
+        """
+        Run the test sequence on the worker thread.
+        """
+        try:
+            self.__model.on_start_test(
+                self.__serial_number,
+                model_name=self.__model_name,
+                test=self.__test,
+                generate_report=False,
+            )
+        except Exception:
+            self.__logger.exception("Test sequence failed")
+            self.__model.Status = "Error"
+        if self.__stop_requested is not None:
+            _latency = time.perf_counter() - self.__stop_requested
+            self.__logger.info(f"Test sequence stopped {1000 * _latency:.1f} ms after the stop request")
+            self.cancelLatencyMeasured.emit(_latency)
+
+    @QtCore.Slot(int)
+    def _on_test_started(self, index: int):
+        """
+        Report the progress of the sequence when a test starts.
+
+        Args:
+            index (int): The index of the test.
+        """
+        self.progressChanged.emit(index, self.__model.rowCount())
+
+    @QtCore.Slot()
+    def _on_finished(self):
+        """
+        Generate the report on the GUI thread once the worker thread finishes.
+        """
+        if self.__model.Status != "Error":
+            self.__model.on_generate_report(test=self.__test)
+        self.sequenceFinished.emit(self.__model.Status)
@@ -1,14 +1,18 @@
 #-*- coding: utf-8 -*-
 from PySide6 import QtCore, QtWidgets
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
 from dateutil import tz
 import json
 import logging
 import logging.handlers
 from pathlib import Path
+import time
 
 import tester
 from tester.manager.devices import DeviceManager
+from tester.manager.planner import TestPlanner
 from tester.manager.report import TestReport
 from tester.tests import _test_list, Test, CancelToken
 
@@ -43,6 +47,9 @@ class TestSequence(QtCore.QAbstractTableModel):
     testStarted = QtCore.Signal(int)
     """Signal emitted when a test is started (by index)."""
 
+    # The time in seconds a cancelled sequence may take to stop its acquisition.
+    _cancel_budget = 0.1
+
     def __init__(self):
         """
         Initialize the TestSequence, set up logging, device manager, test list, and default parameters.
@@ -59,15 +66,18 @@ class TestSequence(QtCore.QAbstractTableModel):
         self.__timezone = tz.tzlocal()
         self.__cancel = CancelToken()
         self.__parameters = {}
+        self.__phase_times = {}
         self.__devices = DeviceManager(self.__settings)
         self.__tests = []
+        self.__report_tests = None
         self._currentui = None
         self._init_tests()
         self.reset_test_data()
         self.ComputerName = self.__devices.ComputerName
         self.TesterName = self.__devices.UserName
         self._start_logging(self.DataDirectory)
-        logging.root.setLevel(logging.DEBUG)
+        _level = str(self._get_setting("LogLevel", "INFO")).upper()
+        logging.root.setLevel(_level if _level in logging.getLevelNamesMapping() else logging.INFO)
 
     @tester._member_logger
     def _init_tests(self):
@@ -324,6 +334,28 @@ class TestSequence(QtCore.QAbstractTableModel):
         """
         return self.RunDataDirectory / "data.json"
 
+    @property
+    def CommandStatisticsPath(self) -> Path:
+        """
+        Get the path to the SCPI command statistics file for the current run.
+
+        Returns:
+            Path: The command statistics file path.
+        """
+        return self.RunDataDirectory / "command_statistics.json"
+
+    @property
+    def PhaseTimes(self) -> dict:
+        """
+        Get where the time of the last run went.
+
+        Returns:
+            dict: The seconds spent in each phase, in order: "Setup", the acquisition of each
+                test by name, "Teardown", "Analysis" waiting for the analysis to finish, "Save"
+                and "Report".
+        """
+        return dict(self.__phase_times)
+
     @property
     def PdfReportPath(self) -> Path:
         """
@@ -564,6 +596,17 @@ class TestSequence(QtCore.QAbstractTableModel):
                 QtCore.QCoreApplication.translate(_context, "Run the tests."),
             )
         )
+        _options.addOption(
+            QtCore.QCommandLineOption(
+                ["b", "batch"],
+                QtCore.QCoreApplication.translate(
+                    _context,
+                    "Run the tests on several units: a comma-separated list of serial numbers, "
+                    "a file with one per line, or - to read them from standard input as they are scanned.",
+                ),
+                "serials",
+            )
+        )
         _options.addHelpOption()
         _options.addVersionOption()
         _options.process(app)
@@ -597,37 +640,98 @@ class TestSequence(QtCore.QAbstractTableModel):
             path (str, optional): The output path for the report.
             test (str, optional): The name of a specific test to report.
         """
-        _path = path or str(self.PdfReportPath.resolve())
+        self.generate_report(self.get_report_snapshot(test), path)
+
+    @tester._member_logger
+    def get_report_snapshot(self, test: str = None) -> dict:
+        """
+        Get a copy of everything the report of the last run is generated from.
+
+        The copy stays valid while the next run resets and refills the sequence, so the report
+        can be generated with generate_report while the next unit is tested.
+
+        Args:
+            test (str, optional): The name of a specific test to report.
+
+        Returns:
+            dict: The snapshot, as accepted by generate_report.
+        """
+        _report_statistics = tester._setting_to_bool(self._get_setting("ReportCommandStatistics", False))
+        return {
+            "Path": self.PdfReportPath,
+            "DataDirectory": self.RunDataDirectory,
+            "Test": test,
+            "Parameters": dict(self.__parameters),
+            "Tests": {
+                _test.Name: _test.on_save(write_data=False)
+                for _test in self.__tests
+                if _test.Name == test or (not test and _test.StartTime is not None)
+            },
+            "CommandStatisticsPath": None if test or not _report_statistics else self.CommandStatisticsPath,
+        }
+
+    @tester._member_logger
+    def generate_report(self, snapshot: dict, path: str = None):
+        """
+        Generate a PDF report from a snapshot taken with get_report_snapshot.
+
+        The tests are reported from copies loaded with the snapshot, never from the tests of
+        the sequence, so the report of one unit can be rendered on the calling thread while the
+        next unit is tested on another.
+
+        Args:
+            snapshot (dict): The snapshot of the run.
+            path (str, optional): The output path for the report. Defaults to the report path of the run.
+        """
+        _path = path or str(snapshot["Path"].resolve())
         _parent = Path(_path).parent
         if not _parent.exists():
             _parent.mkdir(parents=True, exist_ok=True)
+        _test = snapshot["Test"]
+        if _test and _test not in snapshot["Tests"]:
+            self.__logger.error(f"Test '{_test}' not found.")
+            return
         self.__logger.info(f"Generating report at {_path}")
+        if self.__report_tests is None:
+            # The copies get their own settings object, as one QSettings must not be shared
+            # between threads.
+            _settings = QtCore.QSettings(
+                QtCore.QSettings.Format.IniFormat,
+                QtCore.QSettings.Scope.SystemScope,
+                tester.__company__,
+                tester.__application__,
+                self,
+            )
+            self.__report_tests = [type(_test)(_settings, CancelToken()) for _test in self.__tests]
 
         _report = TestReport(_path)
-        _start_time = self.StartTime
-        _end_time = self.EndTime
+        _parameters = snapshot["Parameters"]
+        _start_time = _parameters.get("StartTime")
+        _end_time = _parameters.get("EndTime")
         _report.titlePage(
-            self.SerialNumber,
-            self.ModelName,
+            _parameters.get("SerialNumber", ""),
+            _parameters.get("ModelName", ""),
             _start_time.strftime("%A, %B %d, %Y") if _start_time else "",
             _start_time.strftime("%H:%M:%S") if _start_time else "",
             _end_time.strftime("%H:%M:%S") if _end_time else "",
-            f"{self.Duration} sec",
-            self.TesterName,
-            self.ComputerName,
-            self.Status,
+            f"{_parameters.get('Duration', 0.0)} sec",
+            _parameters.get("TesterName", ""),
+            _parameters.get("ComputerName", ""),
+            _parameters.get("Status", "Idle"),
         )
-
-        if not test:
-            for _test in self.__tests:
-                _test.on_generate_report(_report)
-        else:
-            _selected_test = next((t for t in self.__tests if t.Name == test), None)
-            if _selected_test:
-                _selected_test.on_generate_report(_report)
-            else:
-                self.__logger.error(f"Test '{test}' not found.")
-                return
+        for _copy in self.__report_tests:
+            _data = snapshot["Tests"].get(_copy.Name)
+            if _data is None:
+                continue
+            _copy.reset()
+            for _key, _value in _data.items():
+                _copy._set_parameter(_key, _value)
+            _copy.set_data_directory(snapshot["DataDirectory"])
+            _copy.on_generate_report(_report)
+        _statistics_path = snapshot["CommandStatisticsPath"]
+        if _statistics_path is not None and _statistics_path.exists():
+            with open(_statistics_path, "r") as _file:
+                _report.commandStatisticsPage(json.load(_file))
 
         _report.finish()
 
@@ -652,15 +756,17 @@ class TestSequence(QtCore.QAbstractTableModel):
                 self._set_parameter(_key, _value)
 
     @tester._member_logger
-    def on_save(self, path: str = None):
+    def on_save(self, path: str = None, write_data: bool = True):
         """
         Save the current test sequence data and test results to a JSON file.
 
         Args:
             path (str, optional): The path to save the file. Defaults to DataFilePath.
+            write_data (bool, optional): Whether the tests write their data files too.
+                Defaults to True.
         """
         _data = dict(self.__parameters)
-        _test_data = {t.Name: t.on_save() for t in self.__tests}
+        _test_data = {t.Name: t.on_save(write_data) for t in self.__tests}
         _data["Tests"] = _test_data
         _path = str(self.DataFilePath.resolve()) if path is None else path
 
@@ -672,35 +778,92 @@ class TestSequence(QtCore.QAbstractTableModel):
         with open(_path, "w") as _file:
             json.dump(_data, _file, indent=4, default=_json_serial)
 
+    @contextmanager
+    def __phase(self, name: str):
+        """
+        Time a phase of the run into PhaseTimes.
+
+        Args:
+            name (str): The name of the phase.
+        """
+        _started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.__phase_times[name] = self.__phase_times.get(name, 0.0) + time.perf_counter() - _started
+
+    def _analyze_test(self, test: Test, serial_number: str) -> bool:
+        """
+        Analyze the results of an acquired test and write its data files.
+
+        Args:
+            test (Test): The test to analyze.
+            serial_number (str): The serial number for the test run.
+
+        Returns:
+            bool: True if the test passed.
+        """
+        _passed = test.analyze_results(serial_number)
+        test.save_data()
+        return _passed
+
     @tester._member_logger
-    def on_start_test(self, serial_number: str, model_name: str = "", test: str = None):
+    def on_start_test(
+        self, serial_number: str, model_name: str = "", test: str = None, generate_report: bool = True
+    ):
         """
         Start the test sequence or a specific test.
 
+        The selected tests run in the order planned by TestPlanner, which minimizes the
+        reconfiguration of the oscilloscope between them within their RunsAfter constraints.
+        Tests acquire one after the other on the calling thread while the analysis and the
+        data files of every acquired test are done on a worker thread, so the instruments
+        move on to the next test immediately. The sequence joins the worker after the last
+        test, then saves the results and generates the report. A cancellation requested before
+        the call stops the run at once, so callers clear the previous one with reset_cancel.
+
         Args:
             serial_number (str): The serial number for the test run.
             model_name (str, optional): The model name.
             test (str, optional): The name of a specific test to run.
+            generate_report (bool, optional): Whether to generate the report at the end; False
+                when the caller generates it, e.g. on the GUI thread. Defaults to True.
         """
         self.__logger.info(f"Executing tests for serial number {serial_number}")
+        self.__phase_times = {}
         self.reset_test_data()
         self.SerialNumber = serial_number
         self.ModelName = model_name
         self.StartTime = datetime.now(self.__timezone)
         self.Status = "Running"
-        self.__devices.setup()
         _data_directory = self.RunDataDirectory
-        _statuses = []
-        test_name = test
+        with self.__phase("Setup"):
+            _tests = TestPlanner(t for t in self.__tests if not test or t.Name == test).plan()
+            self.__devices.setup(_data_directory, self.__cancel)
+        _analyses = []
         cancel = self.__cancel
-        for _index, _test in enumerate(self.__tests):
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="Analysis") as _executor:
+            for _test in _tests:
+                if cancel.cancelled:
+                    break
+                self.testStarted.emit(self.__tests.index(_test))
+                _test.set_data_directory(_data_directory)
+                try:
+                    with self.__phase(_test.Name):
+                        _test.acquire(serial_number, self.__devices)
+                except tester.OperationCancelled:
+                    _test.Status = "Cancelled"
+                    break
+                _analyses.append(_executor.submit(self._analyze_test, _test, serial_number))
             if cancel.cancelled:
-                break
-            if test_name and _test.Name != test_name:
-                continue
-            self.testStarted.emit(_index)
-            _test.set_data_directory(_data_directory)
-            _statuses.append(_test.on_start_test(serial_number, self.__devices))
+                self.__report_cancel_latency(cancel.elapsed())
+            with self.__phase("Teardown"):
+                self.__devices.teardown()
+                self.__devices.save_command_statistics(self.CommandStatisticsPath)
+            _joined = time.perf_counter()
+        self.__phase_times["Analysis"] = time.perf_counter() - _joined
+        self.__logger.info(f"Waited {self.__phase_times['Analysis']:.3f} s for the analysis to finish")
+        _statuses = [_analysis.result() for _analysis in _analyses]
         if cancel.cancelled:
             self.Status = "Cancelled"
         else:
@@ -708,11 +871,42 @@ class TestSequence(QtCore.QAbstractTableModel):
                 self.__logger.error(f"Test '{test}' not found.")
             else:
                 self.Status = "Pass" if all(_statuses) else "Fail"
-        self.__devices.teardown()
         self.EndTime = datetime.now(self.__timezone)
         self.Duration = (self.EndTime - self.StartTime).total_seconds()
-        self.on_save()
-        self.on_generate_report(test=test)
+        with self.__phase("Save"):
+            self.on_save(write_data=False)
+        if generate_report:
+            with self.__phase("Report"):
+                self.on_generate_report(test=test)
+
+    def __report_cancel_latency(self, latency: float):
+        """
+        Log how long the acquisition took to stop after cancellation was requested.
+
+        Args:
+            latency (float): The time from the request to the instruments being safe, in seconds.
+        """
+        if latency > self._cancel_budget:
+            self.__logger.warning(
+                f"Cancellation took {1000 * latency:.0f} ms, more than the "
+                f"{1000 * self._cancel_budget:.0f} ms budget"
+            )
+        else:
+            self.__logger.info(f"Cancellation took {1000 * latency:.0f} ms")
+
+    @tester._member_logger
+    def start_session(self):
+        """
+        Keep the instruments configured between runs, e.g. to test several units back to back.
+        """
+        self.__devices.start_session()
+
+    @tester._member_logger
+    def end_session(self):
+        """
+        End a session started with start_session and reset the instruments.
+        """
+        self.__devices.end_session()
 
     @tester._member_logger
     def on_stop_test(self):
@@ -721,6 +915,16 @@ class TestSequence(QtCore.QAbstractTableModel):
         """
         self.__cancel.cancel()
 
+    @tester._member_logger
+    def reset_cancel(self):
+        """
+        Clear the cancellation of the previous run before starting the next one.
+
+        The caller resets the token on its own thread before handing the run to a worker, so a
+        stop requested while the worker is starting is not lost.
+        """
+        self.__cancel.reset()
+
     @tester._member_logger
     def print_test_list(self):
         """
@@ -744,6 +948,5 @@ class TestSequence(QtCore.QAbstractTableModel):
         self.SerialNumber = ""
         self.StartTime = None
         self.Status = "Idle"
-        self.__cancel.reset()
         for _test in self.__tests:
             _test.reset()
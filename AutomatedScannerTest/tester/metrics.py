@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+"""
+Host-side analysis of waveforms captured by the oscilloscope.
+
+All functions operate on NumPy arrays whose last axis is time, so a single waveform, the
+frames of a segmented recording or any other stack of segments are handled in one pass.
+Functions that depend on time take the sample interval, e.g. the xincrement of the preamble.
+"""
+import numpy as np
+
+
+def outlier_frames(frames: np.ndarray, threshold: float = 3.5) -> np.ndarray:
+    """
+    Find the frames that differ from the typical frame by much more than the others do.
+
+    The distance of every frame to the point-wise median frame is compared with the median
+    of those distances using a robust z-score based on the median absolute deviation.
+
+    Args:
+        frames (np.ndarray): The frames, one per row.
+        threshold (float, optional): The robust z-score above which a frame is an outlier. Defaults to 3.5.
+
+    Returns:
+        np.ndarray: A boolean mask that is True for the outlier frames.
+    """
+    _frames = np.asarray(frames, dtype=np.float64)
+    _distance = np.sqrt(np.mean(np.square(_frames - np.median(_frames, axis=0)), axis=-1))
+    _median = np.median(_distance)
+    _deviation = np.median(np.abs(_distance - _median))
+    if _deviation == 0:
+        return np.zeros(_distance.shape, dtype=bool)
+    return 0.6745 * (_distance - _median) / _deviation > threshold
+
+
+def average_frames(frames: np.ndarray, keep: np.ndarray = None) -> np.ndarray:
+    """
+    Average frames point by point.
+
+    Args:
+        frames (np.ndarray): The frames, one per row.
+        keep (np.ndarray, optional): A boolean mask of the frames to include. Defaults to
+            all frames that are not outliers.
+
+    Returns:
+        np.ndarray: The averaged frame.
+    """
+    _frames = np.asarray(frames, dtype=np.float64)
+    if keep is None:
+        keep = ~outlier_frames(_frames)
+    return _frames[keep].mean(axis=0)
+
+
+def _stroke_direction(position: np.ndarray, window: int) -> np.ndarray:
+    """
+    Get the direction of motion of every point, smoothing over a window to ignore noise.
+
+    Args:
+        position (np.ndarray): The position waveforms.
+        window (int): The number of points the position change is taken over.
+
+    Returns:
+        np.ndarray: +1 where the position increases, -1 where it decreases and 0 at the edges.
+    """
+    _direction = np.zeros(position.shape, dtype=np.int8)
+    _half = window // 2
+    _change = position[..., window:] - position[..., :-window]
+    _direction[..., _half : _half + _change.shape[-1]] = np.sign(_change)
+    return _direction
+
+
+def stroke_statistics(position: np.ndarray, current: np.ndarray, window: int = None) -> dict:
+    """
+    Split every frame into its forward and backward strokes and compare their mean current.
+
+    Friction opposes the motion, so half the difference between the forward and backward
+    mean currents is the friction, and their mean is the current needed regardless of the
+    direction, e.g. to hold against the spring or gravity.
+
+    Args:
+        position (np.ndarray): The position waveforms, one frame per row.
+        current (np.ndarray): The current waveforms, aligned with the position.
+        window (int, optional): The number of points the direction is determined over.
+            Defaults to 1% of the frame.
+
+    Returns:
+        dict: The "forward", "backward", "friction" and "offset" current of each frame.
+    """
+    _position = np.asarray(position, dtype=np.float64)
+    _current = np.asarray(current, dtype=np.float64)
+    if window is None:
+        window = max(1, _position.shape[-1] // 100)
+    _direction = _stroke_direction(_position, window)
+    _forward = _direction > 0
+    _backward = _direction < 0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        _forward_mean = np.sum(_current * _forward, axis=-1) / np.sum(_forward, axis=-1)
+        _backward_mean = np.sum(_current * _backward, axis=-1) / np.sum(_backward, axis=-1)
+    return {
+        "forward": _forward_mean,
+        "backward": _backward_mean,
+        "friction": (_forward_mean - _backward_mean) / 2,
+        "offset": (_forward_mean + _backward_mean) / 2,
+    }
+
+
+def standard_error(values: np.ndarray) -> float:
+    """
+    Get the standard error of the mean of a set of values.
+
+    Args:
+        values (np.ndarray): The values, e.g. a per-frame statistic.
+
+    Returns:
+        float: The standard error, or infinity for fewer than two values.
+    """
+    _values = np.asarray(values, dtype=np.float64)
+    _values = _values[np.isfinite(_values)]
+    if _values.size < 2:
+        return float("inf")
+    return float(np.std(_values, ddof=1) / np.sqrt(_values.size))
+
+
+def segments(data: np.ndarray, length: int, step: int = None) -> np.ndarray:
+    """
+    Split waveforms into segments of equal length along the last axis without copying.
+
+    Args:
+        data (np.ndarray): The waveforms.
+        length (int): The number of points per segment.
+        step (int, optional): The number of points between the starts of two segments.
+            Defaults to the length, i.e. adjacent segments; points left over at the end are dropped.
+
+    Returns:
+        np.ndarray: A read-only view with a new second to last axis of segments.
+    """
+    assert length >= 1, "Segment length must be at least 1."
+    if step is None:
+        step = length
+    _data = np.asarray(data)
+    return np.lib.stride_tricks.sliding_window_view(_data, length, axis=-1)[..., ::step, :]
+
+
+def rms(data: np.ndarray) -> np.ndarray:
+    """
+    Get the root mean square of waveforms.
+
+    Args:
+        data (np.ndarray): The waveforms.
+
+    Returns:
+        np.ndarray: The RMS of each waveform.
+    """
+    _data = np.asarray(data, dtype=np.float64)
+    return np.sqrt(np.einsum("...i,...i->...", _data, _data) / _data.shape[-1])
+
+
+def mean(data: np.ndarray) -> np.ndarray:
+    """
+    Get the mean of waveforms.
+
+    Args:
+        data (np.ndarray): The waveforms.
+
+    Returns:
+        np.ndarray: The mean of each waveform.
+    """
+    return np.mean(data, axis=-1, dtype=np.float64)
+
+
+def peak_to_peak(data: np.ndarray) -> np.ndarray:
+    """
+    Get the difference between the largest and the smallest point of waveforms.
+
+    Args:
+        data (np.ndarray): The waveforms.
+
+    Returns:
+        np.ndarray: The peak-to-peak value of each waveform.
+    """
+    _data = np.asarray(data)
+    return np.max(_data, axis=-1).astype(np.float64) - np.min(_data, axis=-1)
+
+
+def frequency(data: np.ndarray, sample_interval: float) -> np.ndarray:
+    """
+    Estimate the fundamental frequency of waveforms from their spectrum.
+
+    The strongest non-DC bin of the Hann-windowed spectrum is refined by fitting a parabola
+    through the log magnitudes of it and its neighbours, which resolves a small fraction of
+    a bin as long as the waveform spans a few periods.
+
+    Args:
+        data (np.ndarray): The waveforms.
+        sample_interval (float): The time between two points in seconds.
+
+    Returns:
+        np.ndarray: The frequency of each waveform in hertz.
+    """
+    _data = np.asarray(data, dtype=np.float64)
+    _points = _data.shape[-1]
+    _data = _data - _data.mean(axis=-1, keepdims=True)
+    _magnitude = np.abs(np.fft.rfft(_data * np.hanning(_points), axis=-1))
+    _magnitude[..., 0] = 0
+    _peak = np.argmax(_magnitude, axis=-1)
+    _inner = np.clip(_peak, 1, _magnitude.shape[-1] - 2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        _left, _center, _right = (
+            np.log(np.take_along_axis(_magnitude, (_inner + _offset)[..., None], axis=-1)[..., 0])
+            for _offset in (-1, 0, 1)
+        )
+        _shift = 0.5 * (_left - _right) / (_left - 2 * _center + _right)
+    _shift = np.where(np.isfinite(_shift) & (_peak == _inner), _shift, 0.0)
+    return (_peak + _shift) / (_points * sample_interval)
+
+
+def phase(data: np.ndarray, sample_interval: float, frequency_: np.ndarray = None) -> np.ndarray:
+    """
+    Get the phase of the fundamental of waveforms at their first point.
+
+    The phase is that of a cosine, so a sine starting at zero has a phase of -pi/2. It is
+    found by a least-squares fit of a cosine, a sine and an offset at the frequency, which
+    stays exact when the waveform does not span a whole number of periods.
+
+    Args:
+        data (np.ndarray): The waveforms.
+        sample_interval (float): The time between two points in seconds.
+        frequency_ (np.ndarray, optional): The frequency of the fundamental in hertz, one for
+            all waveforms or one per waveform. Defaults to the estimate of frequency().
+
+    Returns:
+        np.ndarray: The phase of each waveform in radians, between -pi and pi; nan for a
+            waveform without a fundamental, e.g. a flat one, whose frequency is zero.
+    """
+    _data = np.asarray(data, dtype=np.float64)
+    if frequency_ is None:
+        frequency_ = frequency(_data, sample_interval)
+    _angle = (
+        2 * np.pi * np.asarray(frequency_, dtype=np.float64)[..., None]
+        * (sample_interval * np.arange(_data.shape[-1]))
+    )
+    _basis = np.stack(np.broadcast_arrays(np.cos(_angle), np.sin(_angle), np.ones_like(_angle)), axis=-1)
+    _gram = np.einsum("...ni,...nj->...ij", _basis, _basis)
+    _projection = np.einsum("...ni,...n->...i", _basis, _data)
+    # A pseudo-inverse keeps the stack solvable when a basis degenerates, e.g. at zero frequency.
+    _coefficients = np.einsum("...ij,...j->...i", np.linalg.pinv(_gram), _projection)
+    _phase = np.arctan2(-_coefficients[..., 1], _coefficients[..., 0])
+    return np.where(np.broadcast_to(np.asarray(frequency_) > 0, _phase.shape), _phase, np.nan)
+
+
+def waveform_metrics(data: np.ndarray, sample_interval: float) -> dict:
+    """
+    Compute every waveform metric of this module in one pass over the data.
+
+    Args:
+        data (np.ndarray): The waveforms, e.g. the segments of one deep capture.
+        sample_interval (float): The time between two points in seconds.
+
+    Returns:
+        dict: The "rms", "mean", "peak_to_peak", "frequency" and "phase" of each waveform.
+    """
+    _data = np.asarray(data, dtype=np.float64)
+    _frequency = frequency(_data, sample_interval)
+    return {
+        "rms": rms(_data),
+        "mean": mean(_data),
+        "peak_to_peak": peak_to_peak(_data),
+        "frequency": _frequency,
+        "phase": phase(_data, sample_interval, _frequency),
+    }
@@ -14,6 +14,8 @@ import importlib
 import logging
 import os
 from pathlib import Path
+import threading
+import time
 
 import tester
 from tester.manager.devices import DeviceManager
@@ -22,30 +24,75 @@ from tester.manager.report import TestReport
 
 class CancelToken:
     """
-    A simple token class to signal cancellation of an operation.
+    A token to signal cancellation of an operation across threads.
+
+    Long operations wait on the token instead of sleeping, so they wake up as soon as
+    cancellation is requested, and call raise_if_cancelled at their checkpoints.
 
     Attributes:
         cancelled (bool): Indicates whether the operation has been cancelled.
     """
-    __slots__ = ("cancelled",)
+    __slots__ = ("__event", "__requested")
 
     def __init__(self):
         """
         Initializes the CancelToken with cancelled set to False.
         """
-        self.cancelled = False
+        self.__event = threading.Event()
+        self.__requested = None
+
+    @property
+    def cancelled(self) -> bool:
+        """
+        Whether cancellation has been requested.
+        """
+        return self.__event.is_set()
 
     def cancel(self):
         """
         Sets the cancelled flag to True, indicating the operation should be cancelled.
         """
-        self.cancelled = True
+        if not self.__event.is_set():
+            self.__requested = time.perf_counter()
+            self.__event.set()
 
     def reset(self):
         """
         Resets the cancelled flag to False, allowing reuse of the token.
         """
-        self.cancelled = False
+        self.__event.clear()
+        self.__requested = None
+
+    def elapsed(self) -> float:
+        """
+        Gets the time since cancellation was requested.
+
+        Returns:
+            float: The time in seconds, or 0 if cancellation has not been requested.
+        """
+        return 0.0 if self.__requested is None else time.perf_counter() - self.__requested
+
+    def wait(self, timeout: float = None) -> bool:
+        """
+        Waits until cancellation is requested or the timeout expires, in place of a sleep.
+
+        Args:
+            timeout (float, optional): The maximum time to wait in seconds. Defaults to no limit.
+
+        Returns:
+            bool: True if cancellation has been requested.
+        """
+        return self.__event.wait(timeout)
+
+    def raise_if_cancelled(self):
+        """
+        Raises if cancellation has been requested.
+
+        Raises:
+            tester.OperationCancelled: If cancellation has been requested.
+        """
+        if self.__event.is_set():
+            raise tester.OperationCancelled("Cancellation was requested.")
 
 
 def _test_list() -> list:
@@ -58,7 +105,7 @@ def _test_list() -> list:
     _tests = []
     _test_module = importlib.import_module(Test.__module__)
     _test_folder = os.path.dirname(_test_module.__file__)
-    py_files = [f for f in os.listdir(_test_folder) if f.endswith(".py") and not f.startswith("__")]
+    py_files = sorted(f for f in os.listdir(_test_folder) if f.endswith(".py") and not f.startswith("__"))
     for _filename in py_files:
         _module_name = f"tester.tests.{_filename[:-3]}"
         try:
@@ -96,8 +143,19 @@ class Test(QtCore.QObject):
         serialNumberChanged(str): Emitted when the serial number changes.
         startTimeChanged(str): Emitted when the start time changes.
         statusChanged(str): Emitted when the status changes.
+
+    Attributes:
+        InstrumentState (dict): The MSO5000 state the test runs in, as accepted by
+            MSO5000.apply_state, or None if the test configures the oscilloscope itself
+            after a reset.
+        RunsAfter (tuple): The names of the tests that must run before this one when they
+            run in the same sequence; otherwise the sequence orders the tests to minimize
+            the reconfiguration of the oscilloscope between them.
     """
 
+    InstrumentState = None
+    RunsAfter = ()
+
     parameterChanged = QtCore.Signal(str, object)
     durationChanged = QtCore.Signal(str)
     endTimeChanged = QtCore.Signal(str)
@@ -318,10 +376,53 @@ class Test(QtCore.QObject):
         """
         return datetime.now(self.__timezone)
 
+    @staticmethod
+    def _to_points(data: list) -> list:
+        """
+        Converts (x, y) pairs to the points of a chart series.
+
+        Args:
+            data (list): The (x, y) pairs.
+
+        Returns:
+            list: The QPointF points.
+        """
+        return [QtCore.QPointF(_x, _y) for _x, _y in data]
+
+    @tester._member_logger
+    def acquire(self, serial_number: str, devices: DeviceManager):
+        """
+        Runs the instrument part of the test: setup, run and teardown.
+
+        Teardown runs even if setup or run fail or are cancelled, so the instruments are
+        always left in a safe state. The end time and duration cover the acquisition only,
+        so they stay the same when the analysis runs later on another thread.
+
+        Args:
+            serial_number (str): The serial number of the device under test.
+            devices (DeviceManager): The device manager for hardware interaction.
+
+        Raises:
+            tester.OperationCancelled: If cancellation was requested during the acquisition.
+        """
+        self._logger.info(
+            f"Starting {self.Name} for {serial_number} on station {devices.ComputerName}..."
+        )
+        try:
+            self.setup(serial_number, devices)
+            self.run(serial_number, devices)
+        finally:
+            self.teardown(devices)
+            self.EndTime = self._get_time()
+            if self.StartTime is not None:
+                self.Duration = (self.EndTime - self.StartTime).total_seconds()
+
     @tester._member_logger
     def analyze_results(self, serial_number: str) -> bool:
         """
-        Analyzes the test results and updates the end time, duration, and status.
+        Analyzes the test results and updates the status.
+
+        Analysis must not use the devices, so it can run while the next test acquires.
 
         Args:
             serial_number (str): The serial number of the device under test.
@@ -330,11 +431,19 @@ class Test(QtCore.QObject):
             bool: True if analysis is successful.
         """
         self._logger.info(f"Analyzing {self.Name} results for {serial_number}...")
-        self.EndTime = self._get_time()
-        self.Duration = (self.EndTime - self.StartTime).total_seconds()
         self.Status = "Pass"
         return True
 
+    def get_instrument_state(self) -> dict:
+        """
+        Gets the MSO5000 state the test runs in with the current settings.
+
+        Returns:
+            dict: The state as accepted by MSO5000.apply_state, or None if the test configures
+                the oscilloscope itself after a reset.
+        """
+        return self.InstrumentState
+
     @tester._member_logger
     def load_ui(self, widget: QtWidgets.QWidget):
         """
@@ -421,14 +530,20 @@ class Test(QtCore.QObject):
             self._set_parameter(_key, _value)
 
     @tester._member_logger
-    def on_save(self):
+    def on_save(self, write_data: bool = True):
         """
         Returns a dictionary of the current test parameters.
 
+        Args:
+            write_data (bool, optional): Whether to write the data files of the test first;
+                False if save_data already wrote them. Defaults to True.
+
         Returns:
             dict: The current parameters.
         """
         self._logger.info(f"Saving parameters for {self.Name}...")
+        if write_data:
+            self.save_data()
         return dict(self.__parameters)
 
     @tester._member_logger
@@ -443,12 +558,7 @@ class Test(QtCore.QObject):
         Returns:
             bool: True if the test and analysis succeed.
         """
-        self._logger.info(
-            f"Starting {self.Name} for {serial_number} on station {devices.ComputerName}..."
-        )
-        self.setup(serial_number, devices)
-        self.run(serial_number, devices)
-        self.teardown(devices)
+        self.acquire(serial_number, devices)
         return self.analyze_results(serial_number)
 
     @tester._member_logger
@@ -486,6 +596,12 @@ class Test(QtCore.QObject):
             f"Running {self.Name} for {serial_number} on station {devices.ComputerName}..."
         )
 
+    @tester._member_logger
+    def save_data(self):
+        """
+        Writes the data files of the test, e.g. a CSV of the acquired data, to its data directory.
+        """
+
     @tester._member_logger
     def set_data_directory(self, root_directory: Path):
         """
@@ -510,7 +626,7 @@ class Test(QtCore.QObject):
         self._logger.info(f"Setup {self.Name} for {serial_number}...")
         self.SerialNumber = serial_number
         self.StartTime = self._get_time()
-        devices.test_setup()
+        devices.test_setup(self.get_instrument_state(), self.Name)
 
     @tester._member_logger
     def teardown(self, devices: DeviceManager):
@@ -1,10 +1,11 @@
 # -*- coding: utf-8 -*-
 from PySide6 import QtCore, QtWidgets, QtCharts
-import time
+import numpy as np
 
 import tester
 from tester.devices.mso5000 import MSO5000
 from tester.manager.devices import DeviceManager
+import tester.metrics
 import tester.tests
 
 
@@ -17,6 +18,32 @@ class BearingTest(tester.tests.Test):
     frictionDataChanged = QtCore.Signal(list)
     """Signal emitted when the friction data is updated."""
 
+    InstrumentState = {
+        "acquire_settings": {
+            "memory_depth": MSO5000.MemoryDepth._10K,
+            "type_": MSO5000.AcquireType.Normal,
+        },
+        "channel_settings": {
+            1: {"scale": 2, "display": True},
+            2: {"scale": 2, "display": True, "bandwidth_limit": MSO5000.BandwidthLimit._20M},
+            3: {"scale": 2, "display": True, "bandwidth_limit": MSO5000.BandwidthLimit._20M},
+        },
+        "timebase_settings": {"offset": 2, "scale": 0.2, "href_mode": MSO5000.HrefMode.Trigger},
+        "trigger_edge": {"nreject": True, "sweep": MSO5000.TriggerSweep.Normal},
+        "function_generator_ramp": {
+            1: {
+                "frequency": 0.5,
+                "phase": 270,
+                "amplitude": 5,
+                "output_impedance": MSO5000.SourceOutputImpedance.Fifty,
+            },
+        },
+        "function_generator_square": {
+            2: {"frequency": 0.5, "phase": 270, "amplitude": 5},
+        },
+    }
+    """The oscilloscope configuration the bearing test runs in."""
+
     def __init__(self, settings: QtCore.QSettings, cancel: tester.tests.CancelToken):
         """
         Initialize the BearingTest instance.
@@ -76,7 +103,7 @@ class BearingTest(tester.tests.Test):
         chart.setObjectName("chartFriction")
         line_series = QtCharts.QLineSeries()
         if self.FrictionData:
-            line_series.replace(self.FrictionData)
+            line_series.replace(self._to_points(self.FrictionData))
         chart.addSeries(line_series)
 
         axis_x = QtCharts.QValueAxis()
@@ -99,7 +126,7 @@ class BearingTest(tester.tests.Test):
         chart_view.setSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding)
         self.layoutTestData.addWidget(chart_view)
 
-        self.frictionDataChanged.connect(line_series.replace)
+        self.frictionDataChanged.connect(self._show_friction_data)
 
         # Store references
         self.chartFriction = chart
@@ -108,6 +135,18 @@ class BearingTest(tester.tests.Test):
         self.axisY = axis_y
         self.chartViewFriction = chart_view
 
+    @QtCore.Slot(list)
+    def _show_friction_data(self, value: list):
+        """
+        Show the friction data in the plot; a slot of the test, so it runs on the GUI thread
+        when the sequence runs on a worker thread.
+
+        Args:
+            value (list): The friction data as a list of (position, current) tuples.
+        """
+        if self.widgetTestMain is not None:
+            self.lineSeriesFriction.replace(self._to_points(value))
+
     @tester._member_logger
     def on_generate_report(self, report):
         """
@@ -132,12 +171,9 @@ class BearingTest(tester.tests.Test):
         )
 
     @tester._member_logger
-    def on_save(self):
+    def save_data(self):
         """
-        Save the friction data to a CSV file.
-
-        Returns:
-            Any: The result of the save operation from the base class.
+        Write the friction data to a CSV file.
         """
         try:
             with self.dataFilePath.open("w") as _handle:
@@ -148,7 +184,6 @@ class BearingTest(tester.tests.Test):
                 )
         except Exception:
             pass
-        return super().on_save()
 
     @tester._member_logger
     def run(self, serial_number: str, devices: DeviceManager):
@@ -158,6 +193,9 @@ class BearingTest(tester.tests.Test):
         Args:
             serial_number (str): The serial number of the device under test.
             devices (DeviceManager): The device manager containing connected devices.
+
+        Raises:
+            AssertionError: If the Frames setting is less than 1.
         """
         super().run(serial_number, devices)
         mso = devices.MSO5000
@@ -165,29 +203,38 @@ class BearingTest(tester.tests.Test):
         mso.function_generator_state(2, True)
         mso.phase_align(2)
         mso.clear()
-        mso.single()
-        time.sleep(10)
-        get_waveform = mso.get_waveform
-        _positions_raw = get_waveform(
-            source=MSO5000.Source.Channel2,
-            mode=MSO5000.WaveformMode.Raw,
-            format_=MSO5000.WaveformFormat.Ascii,
-            stop=10000,
-        )
-        _currents_raw = get_waveform(
-            source=MSO5000.Source.Channel3,
-            mode=MSO5000.WaveformMode.Raw,
-            format_=MSO5000.WaveformFormat.Ascii,
-            stop=10000,
-        )
+        _sources = [MSO5000.Source.Channel2, MSO5000.Source.Channel3]
+        _frames = int(self._get_setting("Frames", 16))
+        assert _frames >= 1, "Frames must be at least 1."
+        _group = max(1, int(self._get_setting("FramesPerRecord", 4)))
+        _tolerance = float(self._get_setting("FrictionTolerance", 1.0))
+        _positions = []
+        _currents = []
+        _friction = np.empty(0)
+        while len(_positions) < _frames:
+            self._cancel.raise_if_cancelled()
+            _count = min(_group, _frames - len(_positions))
+            mso.record(_count, timeout=10 + 5 * _count)
+            _waveforms = mso.get_record_frames(_sources, stop=10000)
+            _positions.extend(_waveforms[MSO5000.Source.Channel2].volts)
+            _currents.extend(_waveforms[MSO5000.Source.Channel3].volts)
+            _friction = tester.metrics.stroke_statistics(
+                np.asarray(_positions), np.asarray(_currents)
+            )["friction"]
+            if 100 * tester.metrics.standard_error(_friction) < _tolerance:
+                break
+        mso.function_generator_state(1, False)
+        mso.function_generator_state(2, False)
+        _positions = np.asarray(_positions)
+        _currents = np.asarray(_currents)
+        _keep = ~tester.metrics.outlier_frames(_currents)
+        self._set_parameter("StrokeFriction", (100 * _friction).tolist())
         self.FrictionData = list(
             zip(
-                (4.5 * x for x in _positions_raw),
-                (100 * x for x in _currents_raw),
+                (4.5 * tester.metrics.average_frames(_positions, _keep)).tolist(),
+                (100 * tester.metrics.average_frames(_currents, _keep)).tolist(),
             )
         )
-        mso.function_generator_state(1, False)
-        mso.function_generator_state(2, False)
 
     @tester._member_logger
     def set_data_directory(self, root_directory):
@@ -212,33 +259,6 @@ class BearingTest(tester.tests.Test):
         """
         super().setup(serial_number, devices)
         mso = devices.MSO5000
-        mso.acquire_settings(
-            averages=16,
-            memory_depth=MSO5000.MemoryDepth._10K,
-            type_=MSO5000.AcquireType.Averages,
-        )
+        # The whole declared state is already applied, so this is the rate of the 0.2 s/div
+        # record itself rather than of whatever timebase was left over from the previous test.
         self.SampleRate = mso.get_sample_rate()
-        mso.channel_settings(1, scale=2, display=True)
-        mso.channel_settings(
-            2, scale=2, display=True, bandwidth_limit=MSO5000.BandwidthLimit._20M
-        )
-        mso.channel_settings(
-            3,
-            scale=2,
-            display=True,
-            bandwidth_limit=MSO5000.BandwidthLimit._20M,
-        )
-        mso.timebase_settings(
-            offset=2, scale=0.2, href_mode=MSO5000.HrefMode.Trigger
-        )
-        mso.trigger_edge(nreject=True)
-        mso.function_generator_ramp(
-            1,
-            frequency=0.5,
-            phase=270,
-            amplitude=5,
-            output_impedance=MSO5000.SourceOutputImpedance.Fifty,
-        )
-        mso.function_generator_square(
-            2, frequency=0.5, phase=270, amplitude=5
-        )
@@ -1,9 +1,11 @@
 ﻿# -*- coding: utf-8 -*-
+from enum import StrEnum
 from PySide6 import QtCore, QtWidgets, QtCharts
-import time
+import numpy as np
 
 import tester
 from tester.devices.mso5000 import MSO5000
+import tester.metrics
 import tester.tests
 
 
@@ -19,6 +21,49 @@ class TorqueCenterTest(tester.tests.Test):
     torqueCenterChanged = QtCore.Signal(float)
     """Signal emitted when the torque center value changes."""
 
+    class SweepMode(StrEnum):
+        """
+        Enumeration of the ways the generator offsets are swept.
+
+        Attributes:
+            Steps: The offset is set one at a time and the oscilloscope's RMS measurement is read.
+            Capture: All offsets are output as one arbitrary waveform and captured in a single
+                acquisition, which is split into one window per offset on the host.
+        """
+
+        Steps = "Steps"
+        Capture = "Capture"
+
+    # The most and the fewest points per sine cycle of the arbitrary waveform output in Capture
+    # mode; fewer are used when the whole sweep would not fit in the generator's trace memory.
+    _trace_points_per_cycle = 64
+    _trace_points_per_cycle_min = 8
+
+    # How long the generator output is left to settle after each offset change in Steps mode,
+    # before a fresh acquisition is taken.
+    _step_settle = 0.04
+
+    MeasureItems = [(MSO5000.Measurement.VoltageRms, MSO5000.Source.Channel2)]
+    """The measurement items read together at every offset."""
+
+    InstrumentState = {
+        "acquire_settings": {},
+        "channel_settings": {
+            2: {"scale": 2, "display": True, "bandwidth_limit": MSO5000.BandwidthLimit._20M},
+        },
+        "timebase_settings": {"offset": 2, "scale": 0.02, "href_mode": MSO5000.HrefMode.Trigger},
+        "trigger_edge": {},
+        "function_generator_sinusoid": {
+            1: {
+                "frequency": 10,
+                "amplitude": 0.5,
+                "output_impedance": MSO5000.SourceOutputImpedance.Fifty,
+            },
+        },
+        "set_measure_item": MeasureItems,
+    }
+    """The oscilloscope configuration the torque center test runs in."""
+
     def __init__(self, settings: QtCore.QSettings, cancel: tester.tests.CancelToken):
         """
         Initialize the TorqueCenterTest.
@@ -128,7 +173,7 @@ class TorqueCenterTest(tester.tests.Test):
         chart.setObjectName("chartTorqueCenter")
         line_series = QtCharts.QLineSeries()
         line_series.setObjectName("lineSeriesTorqueCenter")
-        line_series.replace(self.TorqueData)
+        line_series.replace(self._to_points(self.TorqueData))
         chart.addSeries(line_series)
 
         # X Axis
@@ -162,7 +207,7 @@ class TorqueCenterTest(tester.tests.Test):
                 widget.setLayout(layout)
             layout.addWidget(chart_view)
 
-        self.torqueDataChanged.connect(line_series.replace)
+        self.torqueDataChanged.connect(self._show_torque_data)
 
         # Store references
         self.chartTorqueCenter = chart
@@ -181,7 +226,7 @@ class TorqueCenterTest(tester.tests.Test):
         text_box_torque_center = QtWidgets.QLineEdit(f"{self.TorqueCenter:.2f}", widget_torque_center)
         text_box_torque_center.setObjectName("textBoxTorqueCenter")
         text_box_torque_center.setEnabled(False)
-        self.torqueCenterChanged.connect(lambda value: text_box_torque_center.setText(f"{value:.2f}"))
+        self.torqueCenterChanged.connect(self._show_torque_center)
         layout_torque_center.addWidget(text_box_torque_center)
 
         if layout_test_data is not None:
@@ -194,6 +239,29 @@ class TorqueCenterTest(tester.tests.Test):
         self.labelTorqueCenterName = label_torque_center_name
         self.textBoxTorqueCenter = text_box_torque_center
 
+    @QtCore.Slot(float)
+    def _show_torque_center(self, value: float):
+        """
+        Show the torque center in the UI; a slot of the test, so it runs on the GUI thread
+        when the sequence runs on a worker thread.
+
+        Args:
+            value (float): The torque center in degrees.
+        """
+        if self.widgetTestMain is not None:
+            self.textBoxTorqueCenter.setText(f"{value:.2f}")
+
+    @QtCore.Slot(list)
+    def _show_torque_data(self, value: list):
+        """
+        Show the torque data in the plot; see _show_torque_center.
+
+        Args:
+            value (list): The torque data as a list of (offset, rms current) tuples.
+        """
+        if self.widgetTestMain is not None:
+            self.lineSeriesTorqueCenter.replace(self._to_points(value))
+
     @tester._member_logger
     def on_generate_report(self, report):
         """
@@ -218,15 +286,12 @@ class TorqueCenterTest(tester.tests.Test):
         report.writeLine(f"Torque Center: {self.TorqueCenter:.2f} deg")
 
     @tester._member_logger
-    def on_save(self):
+    def save_data(self):
         """
-        Save torque data to a CSV file if the data directory attribute exists.
+        Write the torque data to a CSV file.
 
         Writes a header row followed by time-indexed position and torque current data
         from the TorqueData attribute to the file specified by dataFilePath.
-
-        Returns:
-            The result of the superclass's on_save method.
         """
         try:
             with self.dataFilePath.open("w") as _handle:
@@ -236,12 +301,16 @@ class TorqueCenterTest(tester.tests.Test):
                 )
         except Exception:
             pass
-        return super().on_save()
 
     @tester._member_logger
     def run(self, serial_number, devices):
         """
-        Run the torque center test by iteratively adjusting the source offset and collecting RMS measurements.
+        Run the torque center test by sweeping the source offset and collecting RMS measurements.
+
+        The "SweepMode" setting selects a Capture mode sweep of every offset in one acquisition,
+        the default, or a Steps mode sweep that sets each offset, lets the output settle and
+        reads the measurement of a fresh single acquisition. Both find the same torque center
+        on the simulated oscilloscope, as checked by tester.checks.check_sweep_modes.
 
         Args:
             serial_number (str): The serial number of the device under test.
@@ -249,58 +318,161 @@ class TorqueCenterTest(tester.tests.Test):
         """
         super().run(serial_number, devices)
         mso = devices.MSO5000
+        if self.__get_sweep_mode() == TorqueCenterTest.SweepMode.Capture:
+            self.__run_capture(mso)
+            return
         mso.function_generator_state(1, True)
-        mso.run()
         _data = []
         offsets = [i / 10 for i in range(-25, 26)]
         for _offset in offsets:
+            self._cancel.raise_if_cancelled()
             mso.set_source_offset(1, _offset)
-            time.sleep(0.04)
+            self._cancel.wait(TorqueCenterTest._step_settle)
+            self._cancel.raise_if_cancelled()
+            mso.single()
+            mso.wait_for_acquisition()
             try:
-                _rms = mso.get_measure_item(
-                    MSO5000.Measurement.VoltageRms, MSO5000.Source.Channel2
-                )
-                _data.append((_offset * 4.5, _rms * 100))
+                (_rms,) = mso.get_measure_items(self.MeasureItems)
             except Exception:
-                pass
+                continue
+            if np.isfinite(_rms):
+                _data.append((_offset * 4.5, float(_rms) * 100))
         self.TorqueData = _data
+        mso.run()
         mso.function_generator_state(1, False)
 
-    @tester._member_logger
-    def setup(self, serial_number, devices):
+    def __get_sweep_mode(self) -> "TorqueCenterTest.SweepMode":
         """
-        Set up the test environment for the torque center test using the provided serial number and devices.
+        Get the sweep mode from the "SweepMode" setting.
 
-        Configures the MSO5000 oscilloscope and its function generator with specific settings.
+        Returns:
+            TorqueCenterTest.SweepMode: The sweep mode, Capture unless set otherwise.
+        """
+        return TorqueCenterTest.SweepMode(str(self._get_setting("SweepMode", TorqueCenterTest.SweepMode.Capture.value)))
 
-        Args:
-            serial_number (str): The serial number of the device under test.
-            devices: An object containing device interfaces, including MSO5000.
+    def __get_sweep(self) -> tuple:
         """
-        super().setup(serial_number, devices)
-        mso = devices.MSO5000
-        mso.timebase_settings(
-            offset=2, scale=0.02, href_mode=MSO5000.HrefMode.Trigger
-        )
-        mso.function_generator_sinusoid(
-            1,
-            frequency=10,
-            amplitude=0.5,
-            output_impedance=MSO5000.SourceOutputImpedance.Fifty,
+        Get the parameters of the Capture mode sweep.
+
+        The offsets are those of Steps mode. The sine is made smaller at the offsets where it
+        would take the output beyond the generator's +/-2.5 V; the RMS there is dominated by
+        the offset, so it differs from that of Steps mode by well under one percent.
+
+        Returns:
+            tuple: The offsets in volts, the sine frequency, the peak-to-peak amplitude of the
+                sine at every offset, the settle and measure cycles per offset, the points per
+                sine cycle of the arbitrary waveform, and the timebase scale that captures one
+                full sweep plus one offset.
+
+        Raises:
+            AssertionError: If the "SweepSettleCycles" setting is negative, or the settle and
+                measure cycles are too many to fit the sweep in the generator's trace memory.
+        """
+        _sine = TorqueCenterTest.InstrumentState["function_generator_sinusoid"][1]
+        _frequency, _amplitude = _sine["frequency"], _sine["amplitude"]
+        _offsets = np.array([i / 10 for i in range(-25, 26)])
+        _amplitudes = np.minimum(_amplitude, 2 * (2.5 - np.abs(_offsets)))
+        _settle = int(self._get_setting("SweepSettleCycles", 1))
+        _measure = max(1, int(self._get_setting("SweepMeasureCycles", 1)))
+        assert _settle >= 0, "Sweep settle cycles must not be negative."
+        _points_per_cycle = min(
+            self._trace_points_per_cycle,
+            MSO5000._trace_points_max // (len(_offsets) * (_settle + _measure)),
         )
-        mso.channel_settings(
-            1,
-            display=False,
+        assert _points_per_cycle >= self._trace_points_per_cycle_min, (
+            "Too many sweep settle and measure cycles for the arbitrary waveform."
         )
-        mso.channel_settings(
-            2,
-            scale=2,
-            display=True,
-            bandwidth_limit=MSO5000.BandwidthLimit._20M,
+        _span = (len(_offsets) + 1) * (_settle + _measure) / _frequency
+        _scale = next(
+            _mantissa * 10.0**_exponent
+            for _exponent in range(-3, 3)
+            for _mantissa in (1, 2, 5)
+            if 10 * _mantissa * 10.0**_exponent >= _span
         )
-        mso.set_measure_item(
-            MSO5000.Measurement.VoltageRms, MSO5000.Source.Channel2
+        return _offsets, _frequency, _amplitudes, _settle, _measure, _points_per_cycle, _scale
+
+    def __get_capture_state(self) -> dict:
+        """
+        Get the oscilloscope configuration of the Capture mode sweep.
+
+        Channel 1 captures the generator output, which locates the sweep in the acquisition.
+
+        Returns:
+            dict: The state for MSO5000.apply_state.
+        """
+        _scale = self.__get_sweep()[-1]
+        _channels = TorqueCenterTest.InstrumentState["channel_settings"]
+        return {
+            "acquire_settings": {"memory_depth": MSO5000.MemoryDepth._100K},
+            "channel_settings": {1: {"scale": 1, "display": True}, **_channels},
+            "timebase_settings": {"offset": 5 * _scale, "scale": _scale, "href_mode": MSO5000.HrefMode.Trigger},
+            "trigger_edge": {},
+        }
+
+    def __run_capture(self, mso: MSO5000):
+        """
+        Sweep every offset in one acquisition and compute the RMS current of each on the host.
+
+        The generator outputs a staircase of the offsets with the sine on top as one arbitrary
+        waveform. The acquisition spans a whole sweep plus one offset, so every offset is
+        captured completely at least once, wherever the sweep starts in the acquisition;
+        offsets whose window still falls outside the capture are dropped.
+
+        Args:
+            mso (MSO5000): The oscilloscope.
+        """
+        _offsets, _frequency, _amplitudes, _settle, _measure, _points_per_cycle, _scale = self.__get_sweep()
+        _cycles = _settle + _measure
+        _phase = np.arange(_cycles * _points_per_cycle) / _points_per_cycle
+        _wave = (_offsets[:, None] + _amplitudes[:, None] / 2 * np.sin(2 * np.pi * _phase)).ravel()
+        _peak = float(np.abs(_wave).max())
+        _period = len(_offsets) * _cycles / _frequency
+        mso.function_generator_arbitrary(
+            1,
+            _wave / _peak,
+            frequency=1 / _period,
+            amplitude=2 * _peak,
+            output_impedance=MSO5000.SourceOutputImpedance.Fifty,
         )
+        mso.function_generator_state(1, True)
+        mso.single()
+        mso.wait_for_acquisition(timeout=10 * _scale + 30)
+        _waveforms = mso.get_waveforms([MSO5000.Source.Channel1, MSO5000.Source.Channel2])
+        mso.function_generator_state(1, False)
+        _command = _waveforms[MSO5000.Source.Channel1].volts
+        _current = _waveforms[MSO5000.Source.Channel2].volts
+        _interval = _waveforms[MSO5000.Source.Channel2].preamble.xincrement
+        _cycle = 1 / (_frequency * _interval)
+        # The sweep restarts where the generator output drops from the highest to the lowest
+        # offset; averaging over one sine cycle leaves the staircase, whose only fall is there.
+        _length = max(1, int(round(_cycle)))
+        _staircase = np.convolve(_command, np.ones(_length) / _length, mode="valid")
+        _start = np.argmin(_staircase[_length:] - _staircase[:-_length]) + _length
+        _first = _start + (np.arange(len(_offsets)) * _cycles + _settle) * _cycle
+        _points = int(round(_measure * _cycle))
+        _period_points = _period / _interval
+        _first = np.where(_first + _points > _current.size, _first - _period_points, _first)
+        _windows = np.round(_first).astype(np.intp)[:, None] + np.arange(_points)
+        # An offset whose window is not wholly inside the capture cannot be measured.
+        _inside = (_windows[:, 0] >= 0) & (_windows[:, -1] < _current.size)
+        if not _inside.all():
+            self._logger.warning(f"{np.count_nonzero(~_inside)} offsets fell outside the capture and were dropped.")
+        _rms = tester.metrics.rms(_current[_windows[_inside]])
+        self.TorqueData = list(zip((4.5 * _offsets[_inside]).tolist(), (100 * _rms).tolist()))
+
+    def get_instrument_state(self) -> dict:
+        """
+        Get the oscilloscope configuration of the selected sweep mode.
+
+        The MSO5000 oscilloscope and its function generator are configured from InstrumentState
+        for a Steps mode sweep, or from the capture state derived from it for a Capture mode sweep.
+
+        Returns:
+            dict: The state for MSO5000.apply_state.
+        """
+        if self.__get_sweep_mode() == TorqueCenterTest.SweepMode.Capture:
+            return self.__get_capture_state()
+        return TorqueCenterTest.InstrumentState
 
     @tester._member_logger
     def set_data_directory(self, root_directory):